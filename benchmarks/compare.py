@@ -0,0 +1,54 @@
+''' Compare two sets of benchmark results from benchmarks/run.py
+
+        python3 benchmarks/compare.py baseline.json results.json
+
+    Prints the ratio of the new to the baseline time for each scenario and exits
+    with status 1 if any scenario is slower than the baseline by more than the
+    threshold.
+'''
+import argparse
+import json
+import sys
+
+
+def compare(baseline, results, statistic, threshold):
+    regressions = []
+    print('{0:<20} {1:>14} {2:>14} {3:>8}'.format('scenario', 'baseline', 'new', 'ratio'))
+    for name in sorted(set(baseline['results']) | set(results['results'])):
+        if name not in baseline['results'] or name not in results['results']:
+            print('{0:<20} {1}'.format(name, 'missing from baseline' if name not in baseline['results'] else 'missing from results'))
+            continue
+        if statistic not in baseline['results'][name] or statistic not in results['results'][name]:
+            print('{0:<20} {1} missing'.format(name, statistic))
+            continue
+        old = baseline['results'][name][statistic]
+        new = results['results'][name][statistic]
+        ratio = new / old if old > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' REGRESSION'
+            regressions.append(name)
+        print('{0:<20} {1:>14.6f} {2:>14.6f} {3:>8.3f}{4}'.format(name, old, new, ratio, flag))
+    if baseline.get('config') != results.get('config'):
+        print('warning: the results were generated with different inventory configurations')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare nodeclass benchmark results')
+    parser.add_argument('baseline', type=str, help='baseline results json file')
+    parser.add_argument('results', type=str, help='new results json file')
+    parser.add_argument('--statistic', type=str, default='min', choices=[ 'min', 'median', 'mean', 'peak_bytes', 'retained_bytes' ],
+        help='timing (or with run.py --memory, memory) statistic to compare')
+    parser.add_argument('--threshold', type=float, default=0.1, help='fractional slow down reported as a regression')
+    args = parser.parse_args()
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.results) as file:
+        results = json.load(file)
+    if compare(baseline, results, args.statistic, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
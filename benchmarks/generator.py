@@ -0,0 +1,135 @@
+''' Deterministic generator of synthetic nodeclass inventories
+
+    The generated inventory is written as a yaml_fs data directory:
+
+        <directory>/classes/common.yml
+        <directory>/classes/role<R>/level<D>.yml
+        <directory>/nodes/<environment>/node<N>.yml
+        <directory>/config.json          (the generator options)
+        <directory>/nodeclass-config.yml (for the nodeclass command line)
+
+    Each node includes the deepest class of one role. Each role is a chain of
+    classes, level<D> including level<D-1> and level0 including common, and every
+    class sets fanout parameters in both a shared and a role specific
+    dictionary so the classes have to be merged. The common class holds a chain
+    of references of the given length, and each node makes the given number of
+    inventory queries against the role exports of the other nodes.
+'''
+import argparse
+import json
+import os
+import random
+import yaml
+
+from typing import NamedTuple
+
+
+class InventoryConfig(NamedTuple):
+    nodes: 'int' = 100
+    roles: 'int' = 10
+    environments: 'int' = 2
+    class_depth: 'int' = 4
+    fanout: 'int' = 20
+    reference_chain: 'int' = 20
+    queries: 'int' = 2
+    all_envs: 'int' = 1
+    seed: 'int' = 0
+
+
+def _dump(data, filename):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as file:
+        yaml.safe_dump(data, file, default_flow_style=False)
+
+
+def _common_class(config):
+    parameters = {
+        'shared': { 'p{0}'.format(i): 'common' for i in range(config.fanout) },
+        'chain': { 'c0': 0 },
+        'settings': {
+            'name': '${_auto_:name:short}',
+            'environment': '${_auto_:environment}',
+            'description': 'node ${_auto_:name:short} in ${_auto_:environment}',
+        },
+    }
+    for i in range(1, config.reference_chain):
+        parameters['chain']['c{0}'.format(i)] = '${{chain:c{0}}}'.format(i - 1)
+    return { 'parameters': parameters }
+
+
+def _role_class(config, role, level):
+    classes = [ 'common' ] if level == 0 else [ 'role{0}.level{1}'.format(role, level - 1) ]
+    parameters = {
+        'shared': { 'p{0}'.format(i): 'role{0} level{1}'.format(role, level) for i in range(config.fanout) },
+        'role{0}'.format(role): {
+            'level{0}'.format(level): {
+                'p{0}'.format(i): '${{shared:p{0}}} ${{chain:c{1}}}'.format(i, config.reference_chain - 1)
+                for i in range(config.fanout) },
+        },
+        'packages': [ 'role{0}-level{1}'.format(role, level) ],
+    }
+    klass = { 'classes': classes, 'applications': [ 'role{0}'.format(role) ], 'parameters': parameters }
+    if level == 0:
+        klass['exports'] = {
+            'role': 'role{0}'.format(role),
+            'host': '${settings:name}',
+            'level': level,
+        }
+    return klass
+
+
+def _node(config, rng, index):
+    role = rng.randrange(config.roles)
+    environment = 'env{0}'.format(index % config.environments)
+    parameters = { 'index': index }
+    for query in range(config.queries):
+        target = 'role{0}'.format((role + query) % config.roles)
+        options = '+AllEnvs ' if query < config.all_envs else ''
+        parameters['query{0}'.format(query)] = '$[ {0}exports:host if exports:role == {1} ]'.format(options, target)
+    return {
+        'environment': environment,
+        'classes': [ 'role{0}.level{1}'.format(role, config.class_depth - 1) ],
+        'parameters': parameters,
+    }
+
+
+def generate(directory: 'str', config: 'InventoryConfig'):
+    ''' Write a synthetic inventory to the directory. The same config always gives
+        the same inventory.
+    '''
+    rng = random.Random(config.seed)
+    _dump(_common_class(config), os.path.join(directory, 'classes', 'common.yml'))
+    for role in range(config.roles):
+        for level in range(config.class_depth):
+            _dump(_role_class(config, role, level), os.path.join(directory, 'classes', 'role{0}'.format(role), 'level{0}.yml'.format(level)))
+    for index in range(config.nodes):
+        node = _node(config, rng, index)
+        _dump(node, os.path.join(directory, 'nodes', node['environment'], 'node{0}.yml'.format(index)))
+    with open(os.path.join(directory, 'config.json'), 'w') as file:
+        json.dump(config._asdict(), file, sort_keys=True, indent=1)
+    # a config file for running the nodeclass command line over the inventory
+    uri = { 'classes': 'yaml_fs:{0}'.format(os.path.abspath(os.path.join(directory, 'classes'))),
+            'nodes': 'yaml_fs:{0}'.format(os.path.abspath(os.path.join(directory, 'nodes'))) }
+    _dump({ 'uri': uri }, os.path.join(directory, 'nodeclass-config.yml'))
+
+
+def add_config_arguments(parser: 'argparse.ArgumentParser'):
+    defaults = InventoryConfig()
+    for field in InventoryConfig._fields:
+        parser.add_argument('--{0}'.format(field.replace('_', '-')), type=int, default=getattr(defaults, field), metavar='N')
+
+
+def config_from_args(args: 'argparse.Namespace') -> 'InventoryConfig':
+    return InventoryConfig(**{ field: getattr(args, field) for field in InventoryConfig._fields })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic nodeclass inventory')
+    parser.add_argument('directory', type=str, help='directory to write the inventory to')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    generate(args.directory, config_from_args(args))
+
+
+if __name__ == '__main__':
+    main()
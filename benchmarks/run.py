@@ -0,0 +1,205 @@
+''' Timed benchmark scenarios over a synthetic inventory
+
+    Run from the repository root:
+
+        python3 benchmarks/run.py --output results.json
+
+    The results are written as json, and can be compared with the results of
+    another run using benchmarks/compare.py.
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import yaml
+
+# use the nodeclass in this repository, as for nodeclass-test.py
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(1, os.path.dirname(os.path.abspath(__file__)))
+
+import nodeclass.core as core
+from generator import add_config_arguments, config_from_args, generate
+from nodeclass.__version__ import __version__
+from nodeclass.context import CONTEXT, nodeclass_set_context
+from nodeclass.interpolator.interpolator import Interpolator
+from nodeclass.item.parser import parse
+from nodeclass.node.node import Node
+from nodeclass.settings import Settings
+from nodeclass.storage.factory import Factory as StorageFactory
+from nodeclass.storage.uri import Uri
+from nodeclass.value.hierarchy import Hierarchy
+
+
+def make_uri(directory):
+    return Uri({ 'classes': 'yaml_fs:{0}'.format(os.path.join(directory, 'classes')),
+                 'nodes': 'yaml_fs:{0}'.format(os.path.join(directory, 'nodes')) }, 'benchmark')
+
+
+def first_node(uri):
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    nodename = sorted(node_loader.nodenames())[0]
+    return nodename, klass_loader, node_loader
+
+
+def scenario_nodeinfo(uri):
+    nodename, _, _ = first_node(uri)
+    return lambda: core.nodeinfo(nodename, uri)
+
+
+def scenario_nodeinfo_all(uri):
+    def run():
+        _, exceptions = core.nodeinfo_all(uri)
+        if exceptions:
+            raise exceptions[0]
+    return run
+
+
+def scenario_inventory_memory(uri):
+    # the rendered data of every node held in memory, as by a long running master
+    def run():
+        nodeinfos, exceptions = core.nodeinfo_all(uri)
+        if exceptions:
+            raise exceptions[0]
+        return nodeinfos
+    return run
+
+
+def scenario_merge_multiple(uri):
+    nodename, klass_loader, node_loader = first_node(uri)
+    node = Node(node_loader.primary(nodename, env_override=None), klass_loader)
+    parameters = [ klass.parameters for klass in node.all_klasses ]
+    return lambda: Hierarchy.merge_multiple(parameters, 'parameters')
+
+
+def scenario_merge_all(uri):
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    nodes = [ Node(node_loader.primary(nodename, env_override=None), klass_loader) for nodename in node_loader.nodenames() ]
+    return lambda: [ Hierarchy.merge_multiple([ klass.parameters for klass in node.all_klasses ], 'parameters') for node in nodes ]
+
+
+def scenario_parse(uri):
+    # every string value in the class and node files, parsed without the item cache
+    strings = []
+    def collect(data):
+        if isinstance(data, dict):
+            for value in data.values():
+                collect(value)
+        elif isinstance(data, list):
+            for value in data:
+                collect(value)
+        elif isinstance(data, str):
+            strings.append(data)
+    for path in [ uri.classes_uri['path'], uri.nodes_uri['path'] ]:
+        for dirpath, _, filenames in sorted(os.walk(path)):
+            for filename in sorted(filenames):
+                with open(os.path.join(dirpath, filename)) as file:
+                    collect(yaml.safe_load(file))
+    def run():
+        CONTEXT.item_parse_cache.clear()
+        for string in strings:
+            parse(string)
+    return run
+
+
+def scenario_inventory_result(uri):
+    nodename, klass_loader, node_loader = first_node(uri)
+    node = Node(node_loader.primary(nodename, env_override=None), klass_loader)
+    parameters = Hierarchy.merge_multiple([ klass.parameters for klass in node.all_klasses ], 'parameters')
+    queries = parameters.inventory_queries()
+    def run():
+        interpolator = Interpolator()
+        interpolator.inventory.result(queries, node.inv_query_env, node_loader, klass_loader)
+    return run
+
+
+SCENARIOS = {
+    'nodeinfo': scenario_nodeinfo,
+    'nodeinfo_all': scenario_nodeinfo_all,
+    'inventory_memory': scenario_inventory_memory,
+    'merge_multiple': scenario_merge_multiple,
+    'merge_all': scenario_merge_all,
+    'parse': scenario_parse,
+    'inventory_result': scenario_inventory_result,
+}
+
+
+def time_scenario(run, repeat, number):
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def memory_scenario(run, nodes):
+    ''' Return the memory allocated during one run of the scenario and the memory
+        still held at the end of the run, including the returned data
+    '''
+    tracemalloc.start()
+    try:
+        result = run()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return { 'peak_bytes': peak, 'retained_bytes': retained, 'retained_bytes_per_node': retained // nodes }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the nodeclass benchmarks')
+    parser.add_argument('--output', type=str, metavar='PATH', help='write the json results to PATH instead of standard output')
+    parser.add_argument('--repeat', type=int, default=5, metavar='N', help='number of timed repeats of each scenario')
+    parser.add_argument('--number', type=int, default=1, metavar='N', help='number of runs of each scenario per repeat')
+    parser.add_argument('--scenario', type=str, action='append', choices=sorted(SCENARIOS), help='scenario to run (default all)')
+    parser.add_argument('--memory', action='store_true', help='also measure the memory used by each scenario')
+    parser.add_argument('--memory-budget', type=int, metavar='BYTES', help='with --memory, fail if the memory per node held by '
+        'the inventory_memory scenario is over BYTES')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    config = config_from_args(args)
+    nodeclass_set_context(Settings())
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        generate(directory, config)
+        uri = make_uri(directory)
+        for name in args.scenario or SCENARIOS:
+            run = SCENARIOS[name](uri)
+            results[name] = time_scenario(run, args.repeat, args.number)
+            if args.memory:
+                results[name].update(memory_scenario(run, config.nodes))
+    output = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config._asdict(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, sort_keys=True, indent=1)
+    else:
+        json.dump(output, sys.stdout, sort_keys=True, indent=1)
+        print()
+    if args.memory and args.memory_budget and 'inventory_memory' in results:
+        per_node = results['inventory_memory']['retained_bytes_per_node']
+        if per_node > args.memory_budget:
+            print('inventory_memory: {0} bytes per node, over the budget of {1} bytes'.format(per_node, args.memory_budget), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,11 @@
+import json
 import logging
+import threading
 from .. import __name__ as adapter_name
-from ..core import nodeinfo as core_nodeinfo, node as core_node
 from ..cli.exceptions import NoInventoryUri
 from ..config_file import split_settings_location
-from ..context import nodeclass_set_context
-from ..exceptions import UnknownConfigSetting
+from ..exceptions import InvalidConfigSettingValue, UnknownConfigSetting
+from ..service import Service
 from ..settings import Settings
 from ..storage.uri import Uri
 
@@ -16,33 +17,37 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# Services are kept between calls so the parsed classes and nodes are reused
+# by every minion using the same configuration
+_services: 'Dict[str, Service]' = {}
+_services_lock = threading.Lock()
+
+
+def _service(config: 'ConfigDict', location: 'str') -> 'Service':
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _services_lock:
+        if key not in _services:
+            settings_config, uri_config = split_settings_location(config)
+            try:
+                settings = Settings(settings_config)
+            except (InvalidConfigSettingValue, UnknownConfigSetting) as exception:
+                exception.location = location
+                raise
+            if uri_config is None:
+                raise NoInventoryUri()
+            uri = Uri(uri_config, 'salt settings')
+            _services[key] = Service(settings, uri)
+        return _services[key]
+
 
 def ext_pillar(minion_id: 'str', pillar: 'Dict', config: 'ConfigDict') -> 'Dict':
-    settings_config, uri_config = split_settings_location(config)
-    try:
-        settings = Settings(settings_config)
-    except UnknownConfigSetting as exception:
-        exception.location = 'pillar configuration for {0}'.format(adapter_name)
-        raise
-    if uri_config is None:
-        raise NoInventoryUri()
-    uri = Uri(uri_config, 'salt settings')
-    nodeclass_set_context(settings)
-    nodeinfo = core_nodeinfo(minion_id, uri)
+    service = _service(config, 'pillar configuration for {0}'.format(adapter_name))
+    nodeinfo = service.nodeinfo(minion_id)
     parameters = nodeinfo.as_dict().get('parameters', {})
     return parameters
 
 
 def top(minion_id: 'str', config: 'ConfigDict') -> 'Dict':
-    settings_config, uri_config = split_settings_location(config)
-    try:
-        settings = Settings(settings_config)
-    except UnknownConfigSetting as exception:
-        exception.location = 'top configuration of {0}'.format(adapter_name)
-        raise
-    if uri_config is None:
-        raise NoInventoryUri()
-    uri = Uri(uri_config, 'salt settings')
-    nodeclass_set_context(settings)
-    node = core_node(minion_id, uri)
+    service = _service(config, 'top configuration of {0}'.format(adapter_name))
+    node = service.node(minion_id)
     return { node.environment: node.applications }
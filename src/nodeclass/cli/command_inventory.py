@@ -1,22 +1,54 @@
-import yaml
+import contextlib
+import json
+import sys
 import nodeclass.core as core
 from ..context import nodeclass_set_context
-from ..exceptions import MultipleNodeErrors
+from ..exceptions import MultipleNodeErrors, ProcessError
 from ..storage.exceptions import InvalidUri
+from ..utils.dump import EXTENSIONS
 from .config import process_config_file_and_args
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     import argparse
+    from typing import Optional
     from ..storage.uri import Uri
 
 
-def nodeinfos(uri: 'Uri', directory: 'str'):
-    nodeinfos, exceptions = core.nodeinfo_all(uri)
-    for nodeinfo in nodeinfos:
-        filename = '{0}/{1}.yml'.format(directory, nodeinfo.name)
-        with open(filename, 'w') as file:
-            yaml.dump(nodeinfo.as_dict(), file, default_flow_style=False, Dumper=yaml.CSafeDumper)
+def _results(uri: 'Uri', jobs: 'int', dependency_map: 'Optional[str]'):
+    if dependency_map:
+        return core.nodeinfo_changed_iter(uri, dependency_map, workers=jobs)
+    return core.nodeinfo_all_iter(uri, workers=jobs)
+
+def nodeinfos(uri: 'Uri', directory: 'str', jobs: 'int' = 1, dependency_map: 'Optional[str]' = None, format: 'str' = 'yaml'):
+    # each node is written out as soon as it is finished and then dropped
+    results = _results(uri, jobs, dependency_map)
+    exceptions = []
+    for nodename, nodeinfo in results:
+        if isinstance(nodeinfo, ProcessError):
+            exceptions.append(nodeinfo)
+            continue
+        filename = '{0}/{1}.{2}'.format(directory, nodeinfo.name, EXTENSIONS[format])
+        with open(filename, 'wb') as file:
+            file.write(nodeinfo.dump(format))
+    if len(exceptions) > 0:
+        raise MultipleNodeErrors(exceptions)
+
+def nodeinfos_ndjson(uri: 'Uri', output: 'Optional[str]', jobs: 'int' = 1, dependency_map: 'Optional[str]' = None):
+    ''' Write all the nodes as a single stream of json lines, one node per line
+    '''
+    results = _results(uri, jobs, dependency_map)
+    exceptions = []
+    with contextlib.ExitStack() as stack:
+        file = stack.enter_context(open(output, 'w')) if output else sys.stdout
+        for nodename, nodeinfo in results:
+            if isinstance(nodeinfo, ProcessError):
+                exceptions.append(nodeinfo)
+                continue
+            data = { 'name': nodeinfo.name }
+            data.update(nodeinfo.as_dict())
+            file.write(json.dumps(data))
+            file.write('\n')
     if len(exceptions) > 0:
         raise MultipleNodeErrors(exceptions)
 
@@ -24,7 +56,10 @@ def command_inventory(args: 'argparse.Namespace'):
     settings, uri = process_config_file_and_args(args)
     nodeclass_set_context(settings)
     try:
-        nodeinfos(uri, args.output)
+        if args.format == 'ndjson':
+            nodeinfos_ndjson(uri, args.output, args.jobs, args.dependency_map)
+        else:
+            nodeinfos(uri, args.output or '.', args.jobs, args.dependency_map, args.format)
     except InvalidUri as exception:
         exception.location = uri.location
         raise
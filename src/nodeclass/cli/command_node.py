@@ -1,37 +1,78 @@
 import contextlib
 import sys
-import yaml
 import nodeclass.core as core
 from ..context import nodeclass_set_context
+from ..exceptions import MultipleNodeErrors, ProcessError
 from ..storage.exceptions import InvalidUri
+from ..utils.dump import dump
 from .config import process_config_file_and_args
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     import argparse
-    from typing import TextIO
+    from typing import BinaryIO, List
     from ..storage.uri import Uri
 
 
-def info(nodename: 'str', output: 'TextIO', uri: 'Uri'):
+def info(nodename: 'str', output: 'BinaryIO', uri: 'Uri', format: 'str' = 'yaml'):
     nodeinfo = core.nodeinfo(nodename, uri)
-    yaml.dump(nodeinfo.as_dict(), output, default_flow_style=False, Dumper=yaml.CSafeDumper)
+    output.write(nodeinfo.dump(format))
 
-def apps(nodename: 'str', output: 'TextIO', uri: 'Uri'):
+def apps(nodename: 'str', output: 'BinaryIO', uri: 'Uri', format: 'str' = 'yaml'):
     node = core.node(nodename, uri)
-    print('applications:', file=output)
-    yaml.dump(node.applications, output, default_flow_style=False, Dumper=yaml.CSafeDumper)
+    output.write(dump({ 'applications': node.applications }, format))
+
+def lookup(nodename: 'str', output: 'BinaryIO', uri: 'Uri', paths: 'List[str]', format: 'str' = 'yaml'):
+    values = core.lookup(nodename, uri, paths)
+    output.write(dump(values, format))
+
+def info_many(nodenames: 'List[str]', output: 'BinaryIO', uri: 'Uri', format: 'str' = 'yaml', apps: 'bool' = False):
+    ''' Write the data of several nodes as one dictionary of node name to node
+        data, loading the classes and nodes once for all of them
+    '''
+    data = {}
+    exceptions = []
+    for nodename, nodeinfo in core.nodeinfo_many_iter(nodenames, uri):
+        if isinstance(nodeinfo, ProcessError):
+            exceptions.append(nodeinfo)
+        elif apps:
+            data[nodename] = { 'applications': nodeinfo.applications }
+        else:
+            data[nodename] = nodeinfo.as_dict()
+    output.write(dump(data, format))
+    if len(exceptions) > 0:
+        raise MultipleNodeErrors(exceptions)
+
+def lookup_many(nodenames: 'List[str]', output: 'BinaryIO', uri: 'Uri', paths: 'List[str]', format: 'str' = 'yaml'):
+    data = {}
+    exceptions = []
+    for nodename, values in core.lookup_many(nodenames, uri, paths):
+        if isinstance(values, ProcessError):
+            exceptions.append(values)
+        else:
+            data[nodename] = values
+    output.write(dump(data, format))
+    if len(exceptions) > 0:
+        raise MultipleNodeErrors(exceptions)
 
 def command_node(args: 'argparse.Namespace'):
     settings, uri = process_config_file_and_args(args)
     nodeclass_set_context(settings)
     with contextlib.ExitStack() as stack:
-        output = stack.enter_context(open(args.output, 'w')) if args.output else sys.stdout
+        output = stack.enter_context(open(args.output, 'wb')) if args.output else sys.stdout.buffer
         try:
+            if len(args.node) > 1:
+                if args.path:
+                    lookup_many(args.node, output, uri, args.path, args.format)
+                else:
+                    info_many(args.node, output, uri, args.format, args.apps)
+                return
             if args.apps:
-                apps(args.node, output, uri)
+                apps(args.node[0], output, uri, args.format)
+            elif args.path:
+                lookup(args.node[0], output, uri, args.path, args.format)
             else:
-                info(args.node, output, uri)
+                info(args.node[0], output, uri, args.format)
         except InvalidUri as exception:
             exception.location = uri.location
             raise
@@ -1,6 +1,6 @@
 import collections
 from ..config_file import load_config_file
-from ..exceptions import UnknownConfigSetting
+from ..exceptions import InvalidConfigSettingValue, UnknownConfigSetting
 from ..settings import Settings
 from ..storage.uri import Uri
 from .exceptions import BadArguments, NoInventoryUri
@@ -26,7 +26,7 @@ def process_config_file_and_args(args: 'argparse.Namespace') -> 'Tuple[Settings,
     settings_config_args, uri_config_args = process_args(args)
     try:
         settings = Settings(collections.ChainMap(settings_config_args, settings_config_file))
-    except UnknownConfigSetting as exception:
+    except (InvalidConfigSettingValue, UnknownConfigSetting) as exception:
         if exception.name in settings_config_file:
             exception.location = filename
         elif exception.name in settings_config_args:
@@ -1,5 +1,6 @@
 import argparse
 from .. import __name__ as package_name
+from ..utils.dump import FORMATS
 
 CLI_DEFAULT_OPTS = {
     'log_level': 'WARNING',
@@ -30,6 +31,13 @@ def add_processing_options(parser):
     group.add_argument('--environment', type=str, metavar='ENV', help='Override the environment of the node during processing')
     return group
 
+def add_inventory_processing_options(parser):
+    group = parser.add_argument_group('Processing options')
+    group.add_argument('--jobs', type=int, metavar='N', default=1, help='number of worker processes to share the nodes between')
+    group.add_argument('--dependency-map', type=str, metavar='PATH', help='only write the nodes whose inputs have changed since the last run '
+        'using the dependency map file at PATH')
+    return group
+
 def add_param_output_options(parser):
     group = parser.add_argument_group('Output options')
     group.add_argument('--output', type=str, metavar='PATH', help='write output to file at PATH instead of standard output')
@@ -38,16 +46,24 @@ def add_param_output_options(parser):
 def add_inventory_sub_parser(sub_parsers):
     parser = sub_parsers.add_parser('inventory', help='output data for all nodes')
     group = add_output_options(parser)
-    group.add_argument('--output', type=str, metavar='PATH', default='.', help='write output in directory at PATH')
+    group.add_argument('--output', type=str, metavar='PATH', help='write output in directory at PATH (default the current directory), '
+        'or for ndjson to the file at PATH instead of standard output')
+    group.add_argument('--format', type=str, choices=FORMATS + ('ndjson',), default='yaml', help='output format (default yaml), '
+        'ndjson writes all the nodes as one stream of json lines instead of a file per node')
+    add_inventory_processing_options(parser)
     add_config_file_options(parser)
     add_data_location_options(parser)
     return
 
 def add_node_sub_parser(sub_parsers):
-    parser = sub_parsers.add_parser('node', help='output data for one node')
-    parser.add_argument('node', type=str, metavar='NODE', nargs='?', help='node')
+    parser = sub_parsers.add_parser('node', help='output data for one or more nodes')
+    parser.add_argument('node', type=str, metavar='NODE', nargs='+', help='node, if more than one node is given the output is a '
+        'dictionary of node name to node data')
     group = add_output_options(parser)
     group.add_argument('--output', type=str, metavar='PATH', help='write output to file at PATH instead of standard output')
+    group.add_argument('--format', type=str, choices=FORMATS, default='yaml', help='output format (default yaml)')
+    group.add_argument('--path', type=str, metavar='PARAM', action='append', help='output only the value of the parameter at PARAM, '
+        'resolving only the parameters it depends on (may be given more than once)')
     add_config_file_options(parser)
     add_data_location_options(parser)
     add_processing_options(parser)
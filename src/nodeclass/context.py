@@ -2,9 +2,16 @@ import contextlib
 import copy
 import re
 import threading
+from .item.scanner import make_scanner
 from .item.tokenizer import make_full_tokenizer, make_simple_tokenizer
+from .invquery.scanner import make_expression_scanner
 from .invquery.tokenizer import make_expression_tokenizer
 from .settings import Settings
+from .utils.lrucache import LRUCache
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict
 
 def nodeclass_set_context(settings: 'Settings'):
     CONTEXT.settings = copy.copy(settings)
@@ -13,8 +20,13 @@ def nodeclass_set_context(settings: 'Settings'):
     CONTEXT.prefixes = { settings.immutable_prefix, settings.overwrite_prefix }
     CONTEXT.full_tokenizer = make_full_tokenizer(CONTEXT.settings)
     CONTEXT.simple_tokenizer = make_simple_tokenizer(CONTEXT.settings)
+    CONTEXT.item_scanner = make_scanner(CONTEXT.settings)
     CONTEXT.expression_tokenizer = make_expression_tokenizer()
-    CONTEXT.item_parse_cache = {}
+    CONTEXT.expression_scanner = make_expression_scanner()
+    CONTEXT.item_parse_cache = LRUCache(settings.item_parse_cache_size)
+    CONTEXT.query_parse_cache = LRUCache(settings.query_parse_cache_size)
+    CONTEXT.path_intern = LRUCache(settings.intern_cache_size)
+    CONTEXT.scalar_intern = LRUCache(settings.intern_cache_size)
 
 @contextlib.contextmanager
 def nodeclass_context(settings: 'Settings'):
@@ -24,8 +36,13 @@ def nodeclass_context(settings: 'Settings'):
     old_prefixes = CONTEXT.prefixes
     old_full_tokenizer = CONTEXT.full_tokenizer
     old_simple_tokenizer = CONTEXT.simple_tokenizer
+    old_item_scanner = CONTEXT.item_scanner
     old_expression_tokenizer = CONTEXT.expression_tokenizer
+    old_expression_scanner = CONTEXT.expression_scanner
     old_item_parse_cache = CONTEXT.item_parse_cache
+    old_query_parse_cache = CONTEXT.query_parse_cache
+    old_path_intern = CONTEXT.path_intern
+    old_scalar_intern = CONTEXT.scalar_intern
     nodeclass_set_context(settings)
     yield
     CONTEXT.settings = old_settings
@@ -34,9 +51,43 @@ def nodeclass_context(settings: 'Settings'):
     CONTEXT.prefixes = old_prefixes
     CONTEXT.full_tokenizer = old_full_tokenizer
     CONTEXT.simple_tokenizer = old_simple_tokenizer
+    CONTEXT.item_scanner = old_item_scanner
     CONTEXT.expression_tokenizer = old_expression_tokenizer
+    CONTEXT.expression_scanner = old_expression_scanner
     CONTEXT.item_parse_cache = old_item_parse_cache
+    CONTEXT.query_parse_cache = old_query_parse_cache
+    CONTEXT.path_intern = old_path_intern
+    CONTEXT.scalar_intern = old_scalar_intern
     return
 
+def nodeclass_clear_caches():
+    ''' Empty the item and query parse caches and the path and scalar intern
+        tables of the current context
+    '''
+    CONTEXT.item_parse_cache.clear()
+    CONTEXT.query_parse_cache.clear()
+    CONTEXT.path_intern.clear()
+    CONTEXT.scalar_intern.clear()
+
+def nodeclass_context_state() -> 'Dict[str, Any]':
+    ''' Return a snapshot of the current thread's context
+
+        The snapshot shares the parse caches and the path and scalar intern
+        tables with the current context, so it can be reinstated with
+        nodeclass_restored_context in any thread without losing previously parsed
+        items.
+    '''
+    return dict(CONTEXT.__dict__)
+
+@contextlib.contextmanager
+def nodeclass_restored_context(state: 'Dict[str, Any]'):
+    old_state = dict(CONTEXT.__dict__)
+    CONTEXT.__dict__.update(state)
+    try:
+        yield
+    finally:
+        CONTEXT.__dict__.clear()
+        CONTEXT.__dict__.update(old_state)
+
 CONTEXT = threading.local()
 nodeclass_set_context(Settings())
@@ -1,13 +1,17 @@
+import multiprocessing
+import pickle
 from .context import CONTEXT
-from .exceptions import ProcessError
+from .dependencies import DependencyMap
+from .exceptions import ProcessError, UnpicklableProcessError
 from .interpolator.interpolator import Interpolator
+from .node.klass import KlassID
 from .node.node import Node
 from .storage.factory import Factory as StorageFactory
 from .utils.path import Path
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import List, Tuple
+    from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
     from .interpolator.interpolatednode import InterpolatedNode
     from .storage.loader import KlassLoader, NodeLoader
     from .storage.uri import Uri
@@ -30,19 +34,209 @@ def nodeinfo(nodename: 'str', uri: 'Uri') -> 'InterpolatedNode':
     return nodeinfo_inner(nodename, interpolator, klass_loader, node_loader)
 
 
-def nodeinfo_all(uri: 'Uri') -> 'Tuple[List[InterpolatedNode], List[ProcessError]]':
+def lookup(nodename: 'str', uri: 'Uri', paths: 'List[str]') -> 'Dict[str, Any]':
+    ''' Return a dictionary of the rendered values of the given parameter paths
+        of the named node.
+
+        Only the requested paths, and the parameters and inventory queries they
+        depend on, are resolved.
+    '''
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    interpolator = Interpolator()
+    parameter_paths = [ Path.fromstring(path) for path in paths ]
+    return lookup_inner(nodename, parameter_paths, interpolator, klass_loader, node_loader)
+
+
+def lookup_many(nodenames: 'Iterable[str]', uri: 'Uri', paths: 'List[str]') -> 'Iterator[Tuple[str, Union[Dict[str, Any], ProcessError]]]':
+    ''' Generate (node name, dictionary of the rendered parameter values or error)
+        for the named nodes, as for lookup. The nodes share one set of loaders
+        and one interpolator.
+    '''
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    interpolator = Interpolator()
+    parameter_paths = [ Path.fromstring(path) for path in paths ]
+    for nodename in nodenames:
+        try:
+            yield nodename, lookup_inner(nodename, parameter_paths, interpolator, klass_loader, node_loader)
+        except ProcessError as exception:
+            yield nodename, exception
+
+
+def lookup_inner(nodename: 'str', paths: 'List[Path]', interpolator: 'Interpolator', klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'Dict[str, Any]':
+    try:
+        proto_node = node_loader.primary(nodename, env_override=CONTEXT.settings.env_override)
+        node = Node(proto_node, klass_loader)
+        return interpolator.lookup(node, paths, node_loader, klass_loader)
+    except ProcessError as exception:
+        exception.node = nodename
+        raise
+
+
+def nodeinfo_all(uri: 'Uri', workers: 'Optional[int]' = None) -> 'Tuple[List[InterpolatedNode], List[ProcessError]]':
     ''' Return a list of the nodeinfo data of all nodes
+
+        workers: if greater than one, the number of worker processes to share
+                 the nodes between
+    '''
+    return _split_results(nodeinfo_all_iter(uri, workers=workers))
+
+
+def nodeinfo_all_iter(uri: 'Uri', workers: 'Optional[int]' = None) -> 'Iterator[Tuple[str, Union[InterpolatedNode, ProcessError]]]':
+    ''' Generate (node name, nodeinfo data or error) for all nodes, in node loader
+        order, as each node is finished. Nothing is kept once yielded, so callers
+        writing each node out hold only one node at a time.
+
+        workers: if greater than one, the number of worker processes to share
+                 the nodes between
     '''
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    nodenames = list(node_loader.nodenames())
+    yield from zip(nodenames, _nodeinfo_results(workers, nodenames, klass_loader, node_loader))
+
+
+def nodeinfo_many(nodenames: 'Iterable[str]', uri: 'Uri', workers: 'Optional[int]' = None) -> 'Tuple[List[InterpolatedNode], List[ProcessError]]':
+    ''' Return a list of the nodeinfo data of the named nodes, and a list of the
+        errors of the nodes which failed
+
+        The nodes share one set of loaders and one interpolator, so the node
+        list, classes and inventory are only loaded once for the batch.
+
+        workers: if greater than one, the number of worker processes to share
+                 the nodes between
+    '''
+    return _split_results(nodeinfo_many_iter(nodenames, uri, workers=workers))
+
+
+def nodeinfo_many_iter(nodenames: 'Iterable[str]', uri: 'Uri', workers: 'Optional[int]' = None) -> 'Iterator[Tuple[str, Union[InterpolatedNode, ProcessError]]]':
+    ''' The generator form of nodeinfo_many, as nodeinfo_all_iter
+    '''
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    nodenames = list(nodenames)
+    yield from zip(nodenames, _nodeinfo_results(workers, nodenames, klass_loader, node_loader))
+
+
+def nodeinfo_changed(uri: 'Uri', dependency_map: 'str', workers: 'Optional[int]' = None) -> 'Tuple[List[InterpolatedNode], List[ProcessError]]':
+    ''' As nodeinfo_all, but only return the nodes whose inputs (node file, classes
+        or the nodes answering its inventory queries) have changed since the last
+        call using the same dependency map file
+
+        dependency_map: file name of the persisted dependency map
+        workers: if greater than one, the number of worker processes to share
+                 the nodes between
+    '''
+    return _split_results(nodeinfo_changed_iter(uri, dependency_map, workers=workers))
+
+
+def nodeinfo_changed_iter(uri: 'Uri', dependency_map: 'str', workers: 'Optional[int]' = None) -> 'Iterator[Tuple[str, Union[InterpolatedNode, ProcessError]]]':
+    ''' The generator form of nodeinfo_changed, as nodeinfo_all_iter
+
+        The dependency map is only saved once all the changed nodes have been
+        generated.
+    '''
+    klass_loader, node_loader = StorageFactory.loaders(uri)
+    dependencies = DependencyMap(dependency_map, CONTEXT.settings, uri)
+    nodenames = dependencies.changed(klass_loader, node_loader)
+    for nodename, result in zip(nodenames, _nodeinfo_results(workers, nodenames, klass_loader, node_loader)):
+        if isinstance(result, ProcessError):
+            dependencies.discard(nodename)
+        else:
+            dependencies.record(result, klass_loader, node_loader)
+        yield nodename, result
+    dependencies.save()
+
+
+def _split_results(results: 'Iterator[Tuple[str, Union[InterpolatedNode, ProcessError]]]') -> 'Tuple[List[InterpolatedNode], List[ProcessError]]':
     exceptions = []
     nodeinfos = []
-    klass_loader, node_loader = StorageFactory.loaders(uri)
+    for _, result in results:
+        if isinstance(result, ProcessError):
+            exceptions.append(result)
+        else:
+            nodeinfos.append(result)
+    return nodeinfos, exceptions
+
+
+def _nodeinfo_results(workers: 'Optional[int]', nodenames: 'List[str]', klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'Iterator[Union[InterpolatedNode, ProcessError]]':
+    if CONTEXT.settings.class_load_threads > 1:
+        _prefetch(nodenames, klass_loader, node_loader)
+    if workers is not None and workers > 1:
+        return _nodeinfo_parallel(workers, nodenames, klass_loader, node_loader)
+    return _nodeinfo_serial(nodenames, klass_loader, node_loader)
+
+
+def _nodeinfo_serial(nodenames: 'List[str]', klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'Iterator[Union[InterpolatedNode, ProcessError]]':
     interpolator = Interpolator()
-    for nodename in node_loader.nodenames():
+    for nodename in nodenames:
         try:
-            nodeinfos.append(nodeinfo_inner(nodename, interpolator, klass_loader, node_loader))
+            yield nodeinfo_inner(nodename, interpolator, klass_loader, node_loader)
         except ProcessError as exception:
-            exceptions.append(exception)
-    return nodeinfos, exceptions
+            yield exception
+
+
+# State shared with forked worker processes, set in the parent process before
+# the worker pool is created.
+_worker_loaders: 'Optional[Tuple[KlassLoader, NodeLoader]]' = None
+_worker_interpolator: 'Optional[Interpolator]' = None
+
+
+def _nodeinfo_worker(nodename: 'str') -> 'Union[InterpolatedNode, ProcessError]':
+    global _worker_interpolator
+    assert _worker_loaders is not None
+    klass_loader, node_loader = _worker_loaders
+    if _worker_interpolator is None:
+        _worker_interpolator = Interpolator()
+    try:
+        return nodeinfo_inner(nodename, _worker_interpolator, klass_loader, node_loader)
+    except ProcessError as exception:
+        try:
+            pickle.dumps(exception)
+        except Exception:
+            return UnpicklableProcessError(exception)
+        return exception
+
+
+def _prefetch(nodenames: 'List[str]', klass_loader: 'KlassLoader', node_loader: 'NodeLoader'):
+    ''' Load the classes of the nodes in a pool of threads, before the nodes
+        are processed
+    '''
+    klass_ids = []
+    for nodename in nodenames:
+        try:
+            proto_node = node_loader.primary(nodename, env_override=CONTEXT.settings.env_override)
+        except ProcessError:
+            # errors are reported when the node is processed
+            continue
+        klass_ids.extend([ KlassID(name, proto_node.environment) for name in proto_node.klass.classes ])
+    klass_loader.prefetch(klass_ids, CONTEXT.settings.class_load_threads)
+
+
+def _preload(nodenames: 'List[str]', klass_loader: 'KlassLoader', node_loader: 'NodeLoader'):
+    ''' Load the nodes and their classes, so that forked worker processes
+        start with the parsed data instead of each loading it again
+    '''
+    for nodename in nodenames:
+        try:
+            Node(node_loader.primary(nodename, env_override=CONTEXT.settings.env_override), klass_loader)
+        except ProcessError:
+            # errors are reported when the node is processed by a worker
+            pass
+
+
+def _nodeinfo_parallel(workers: 'int', nodenames: 'List[str]', klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'Iterator[Union[InterpolatedNode, ProcessError]]':
+    ''' Interpolate the nodes in a pool of forked worker processes.
+
+        The results are returned in the same order as the serial version, regardless
+        of which worker processed a node.
+    '''
+    global _worker_loaders
+    _preload(nodenames, klass_loader, node_loader)
+    chunksize = max(1, len(nodenames) // (workers * 4))
+    _worker_loaders = (klass_loader, node_loader)
+    try:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            yield from pool.imap(_nodeinfo_worker, nodenames, chunksize=chunksize)
+    finally:
+        _worker_loaders = None
 
 
 def node(nodename: 'str', uri: 'Uri') -> 'Node':
@@ -51,10 +245,13 @@ def node(nodename: 'str', uri: 'Uri') -> 'Node':
         This is primarily to generate the salt top data for a node.
     '''
     klass_loader, node_loader = StorageFactory.loaders(uri)
+    return node_inner(nodename, klass_loader, node_loader)
+
+
+def node_inner(nodename: 'str', klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'Node':
     try:
         proto_node = node_loader.primary(nodename, env_override=CONTEXT.settings.env_override)
-        node = Node(proto_node, klass_loader)
-        return node
+        return Node(proto_node, klass_loader)
     except ProcessError as exception:
         exception.node = nodename
         raise
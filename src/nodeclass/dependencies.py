@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import tempfile
+from .__version__ import __version__
+from .exceptions import ProcessError
+from .node.klass import KlassID
+from .utils.misc import ensure_directory_present
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Set
+    from .interpolator.interpolatednode import InterpolatedNode
+    from .settings import Settings
+    from .storage.loader import KlassLoader, NodeLoader
+    from .storage.uri import Uri
+
+log = logging.getLogger(__name__)
+
+
+class DependencyMap:
+    ''' Record of the inputs used to render each node, persisted between runs
+
+        For each node the content ids (file hash or git blob id) of the node file
+        and of each class loaded are recorded. Nodes with inventory queries also
+        depend on the nodes which can answer the queries: they are rendered again
+        if any node in the environment queried (or in any environment for
+        +AllEnvs queries) changes, or if a node joins or leaves the environment.
+        The environment of each node file is recorded to find the changes in
+        environment membership.
+
+        The settings and uri are part of the map, a change to either discards all
+        the recorded nodes.
+    '''
+
+    def __init__(self, filename: 'str', settings: 'Settings', uri: 'Uri'):
+        self.filename = filename
+        self.fingerprint = json.dumps([ __version__, str(settings), uri.classes_uri, uri.nodes_uri ], sort_keys=True, default=str)
+        self.nodes: 'Dict[str, Dict[str, Any]]' = {}
+        self.node_files: 'Dict[str, Optional[str]]' = {}
+        # content ids read by changed, reused when recording the rendered nodes
+        self.node_ids: 'Dict[str, Optional[str]]' = {}
+        self.klass_ids: 'Dict[KlassID, Optional[str]]' = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as exception:
+            log.warning('ignoring unreadable dependency map {0}: {1}'.format(self.filename, exception))
+            return
+        if not isinstance(data, dict) or data.get('fingerprint', None) != self.fingerprint:
+            return
+        self.nodes = data['nodes']
+        self.node_files = data['node_files']
+
+    def save(self):
+        data = { 'fingerprint': self.fingerprint, 'nodes': self.nodes, 'node_files': self.node_files }
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        ensure_directory_present(directory)
+        # write to a temporary file and rename so an interrupted run never leaves
+        # a partially written map
+        fd, tmpname = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file, sort_keys=True, indent=1)
+            os.replace(tmpname, self.filename)
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+    def changed(self, klass_loader: 'KlassLoader', node_loader: 'NodeLoader') -> 'List[str]':
+        ''' Return the names of the nodes whose inputs have changed, or which are not
+            in the map, in node loader order
+        '''
+        nodenames = list(node_loader.nodenames())
+        self.node_ids = { name: self._node_id(node_loader, name) for name in nodenames }
+        self.klass_ids = {}
+        node_files = { name: self._node_environment(node_loader, name) for name in nodenames }
+        inputs_changed = { name for name in nodenames if self._inputs_changed(name, self.klass_ids, klass_loader) }
+        # the environments which have gained or lost a node, or which hold a node
+        # whose inputs have changed
+        environments_changed: 'Set[Optional[str]]' = set()
+        for name in set(self.node_files) | set(node_files):
+            if name in inputs_changed or name not in node_files or name not in self.node_files or node_files[name] != self.node_files[name]:
+                environments_changed.update(files[name] for files in (self.node_files, node_files) if name in files)
+        changed = []
+        for name in nodenames:
+            if name in inputs_changed:
+                changed.append(name)
+                continue
+            inventory = self.nodes[name]['inventory']
+            if inventory is None:
+                continue
+            if inventory['all_envs']:
+                if environments_changed:
+                    changed.append(name)
+            elif inventory['environment'] in environments_changed:
+                changed.append(name)
+        self.node_files = node_files
+        for name in list(self.nodes):
+            if name not in node_files:
+                del self.nodes[name]
+        return changed
+
+    def record(self, nodeinfo: 'InterpolatedNode', klass_loader: 'KlassLoader', node_loader: 'NodeLoader'):
+        ''' Record the inputs of a successfully rendered node
+        '''
+        inventory = None
+        if nodeinfo.inventory is not None:
+            environment, all_envs = nodeinfo.inventory
+            inventory = { 'environment': environment, 'all_envs': all_envs }
+        if nodeinfo.name not in self.node_ids:
+            self.node_ids[nodeinfo.name] = self._node_id(node_loader, nodeinfo.name)
+        self.nodes[nodeinfo.name] = {
+            'node': self.node_ids[nodeinfo.name],
+            'environment': nodeinfo.environment,
+            'classes': { name: self._klass_id(klass_loader, KlassID(name, nodeinfo.environment), self.klass_ids) for name in nodeinfo.classes },
+            'inventory': inventory,
+        }
+
+    def discard(self, name: 'str'):
+        ''' Remove a node, so it is rendered again on the next run
+        '''
+        self.nodes.pop(name, None)
+
+    def _inputs_changed(self, name: 'str', klass_ids: 'Dict[KlassID, Optional[str]]', klass_loader: 'KlassLoader') -> 'bool':
+        entry = self.nodes.get(name, None)
+        if entry is None or entry['node'] != self.node_ids[name] or entry['node'] is None:
+            return True
+        for klass_name, content_id in entry['classes'].items():
+            if self._klass_id(klass_loader, KlassID(klass_name, entry['environment']), klass_ids) != content_id:
+                return True
+        return False
+
+    def _node_environment(self, node_loader: 'NodeLoader', name: 'str') -> 'Optional[str]':
+        try:
+            return node_loader.environment(name)
+        except ProcessError:
+            return None
+
+    def _node_id(self, node_loader: 'NodeLoader', name: 'str') -> 'Optional[str]':
+        try:
+            return node_loader.content_id(name)
+        except ProcessError:
+            return None
+
+    def _klass_id(self, klass_loader: 'KlassLoader', klass_id: 'KlassID', cache: 'Dict[KlassID, Optional[str]]') -> 'Optional[str]':
+        if klass_id not in cache:
+            try:
+                cache[klass_id] = klass_loader.content_id(klass_id)
+            except ProcessError:
+                cache[klass_id] = None
+        return cache[klass_id]
@@ -7,10 +7,22 @@ if TYPE_CHECKING:
     MessageList = List[Any]
 
 
+def _rebuild_error(cls, state):
+    error = cls.__new__(cls)
+    error.__dict__.update(state)
+    return error
+
+
 class NodeclassError(Exception):
     def __init__(self):
         super().__init__()
 
+    def __reduce__(self):
+        # The default exception pickling calls the class with self.args, which does not
+        # match the constructors used here, so rebuild from the instance dictionary.
+        # Required to return errors from worker processes.
+        return (_rebuild_error, (self.__class__, self.__dict__))
+
     def __str__(self) -> 'str':
         mess = []
         indent = 0
@@ -64,6 +76,19 @@ class ProcessError(NodeclassError):
         return [ '--> {0}'.format(self.node), 2 ]
 
 
+class UnpicklableProcessError(ProcessError):
+    ''' Holds the message of a ProcessError which could not be pickled, for
+        returning errors from worker processes
+    '''
+    def __init__(self, exception: 'ProcessError'):
+        super().__init__()
+        self.node = exception.node
+        self.messages = [ m if m is None or isinstance(m, int) else str(m) for m in exception.message() ]
+
+    def message(self) -> 'MessageList':
+        return self.messages
+
+
 class InputError(ProcessError):
     def __init__(self):
         super().__init__()
@@ -149,3 +174,28 @@ class UnknownConfigSetting(ConfigError):
     def message(self) -> 'MessageList':
         return super().message() + \
                [ 'Unknown config setting: {0}, in {1}'.format(self.name, self.location) ]
+
+
+class InvalidConfigSettingValue(ConfigError):
+    def __init__(self, name, value, allowed, location=None):
+        super().__init__()
+        self.name = name
+        self.value = value
+        self.allowed = allowed
+        self.location = location
+
+    def message(self) -> 'MessageList':
+        return super().message() + \
+               [ 'Invalid value for config setting {0}: {1}, in {2}'.format(self.name, self.value, self.location),
+                 'Allowed values: {0}'.format(', '.join(self.allowed)) ]
+
+
+class OutputFormatUnavailable(ConfigError):
+    def __init__(self, format, module):
+        super().__init__()
+        self.format = format
+        self.module = module
+
+    def message(self) -> 'MessageList':
+        return super().message() + \
+               [ 'Output format {0} requires the {1} python module'.format(self.format, self.module) ]
@@ -112,3 +112,14 @@ class InventoryQueryError(InterpolationError):
                [ 'Failed inv query: {0}'.format(str(self.query)),
                  'at {0}, in {1}'.format(path, self.url) ] + \
                self.exception.message()
+
+
+class NoSuchParameter(InterpolationError):
+    def __init__(self, path, category=None):
+        super().__init__()
+        self.path = path
+        self.category = category
+
+    def msg(self) -> 'MessageList':
+        path = Path.fromstring(self.category) + self.path
+        return [ 'No such parameter {0}'.format(path) ]
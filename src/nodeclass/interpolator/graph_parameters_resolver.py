@@ -0,0 +1,152 @@
+from collections import defaultdict
+from ..value.exceptions import NoSuchPath
+from .exceptions import CircularReference, NoSuchReference
+from .parameters_resolver import ParametersResolver
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List
+    from ..utils.path import Path
+    from ..value.value import Value
+    ReferenceGraph = Dict[Path, Dict[Path, Path]]
+
+
+class GraphParametersResolver(ParametersResolver):
+    '''
+    Resolve parameters in dependency order
+
+    Before resolving anything a graph of the references between the unresolved
+    paths is built. A path depends on another unresolved path if one of its references
+    is the same path, an ancestor of it (the referenced path is inside an unresolved
+    value) or a descendant of it (the referenced value contains an unresolved value).
+
+    All circular references are reported up front, then each path is resolved once
+    in topological order, so the referenced paths are always already resolved and
+    there is no recursion through the references.
+
+    References only known once a value is partly resolved (for example nested
+    references such as ${foo${bar}}) and paths copied from referenced values are
+    resolved as in the ParametersResolver.
+    '''
+
+    def resolve_unresolved_paths(self):
+        graph = self.reference_graph(list(self.unresolved))
+        for component in self.strongly_connected_components(graph):
+            if len(component) > 1 or component[0] in graph[component[0]]:
+                self.record_circular_references(component, graph)
+            else:
+                path = component[0]
+                if path in self.unresolved:
+                    self.resolve_unresolved_path(path)
+        super().resolve_unresolved_paths()
+        return
+
+    def reference_graph(self, paths: 'List[Path]') -> 'ReferenceGraph':
+        '''
+        Return a dictionary of path to a dictionary of the paths it depends on, to
+        the reference which generates the dependency
+        '''
+        unresolved = set(paths)
+        descendants: 'Dict[Path, List[Path]]' = defaultdict(list)
+        for path in paths:
+            ancestor = path
+            while ancestor.last > 0:
+                ancestor = ancestor.parent()
+                descendants[ancestor].append(path)
+        graph: 'ReferenceGraph' = {}
+        for path in paths:
+            graph[path] = {}
+            for reference in self.value_references(path):
+                for dependency in self.matching_paths(reference, unresolved, descendants):
+                    if dependency not in graph[path]:
+                        graph[path][dependency] = reference
+        return graph
+
+    def value_references(self, path: 'Path') -> 'Iterable[Path]':
+        try:
+            if self.parameters.unresolved_ancestor(path):
+                return []
+            return sorted(self.parameters[path].references, key=str)
+        except Exception:
+            # leave any errors to be reported when the path is resolved
+            return []
+
+    def matching_paths(self, reference: 'Path', unresolved: 'Iterable[Path]', descendants: 'Dict[Path, List[Path]]') -> 'List[Path]':
+        matches = []
+        ancestor = reference
+        while ancestor.last >= 0:
+            if ancestor in unresolved:
+                matches.append(ancestor)
+            ancestor = ancestor.parent()
+        matches.extend(descendants.get(reference, []))
+        return matches
+
+    def strongly_connected_components(self, graph: 'ReferenceGraph') -> 'List[List[Path]]':
+        '''
+        Tarjan's algorithm, without recursion. Components are returned with the
+        components they depend on before them.
+        '''
+        index: 'Dict[Path, int]' = {}
+        lowlink: 'Dict[Path, int]' = {}
+        stack: 'List[Path]' = []
+        on_stack = set()
+        components = []
+        for root in graph:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [ (root, iter(graph[root])) ]
+            while work:
+                node, dependencies = work[-1]
+                for dependency in dependencies:
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = len(index)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(graph[dependency])))
+                        break
+                    elif dependency in on_stack:
+                        lowlink[node] = min(lowlink[node], index[dependency])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.reverse()
+                        components.append(component)
+        return components
+
+    def record_circular_references(self, component: 'List[Path]', graph: 'ReferenceGraph'):
+        members = set(component)
+        for path in component:
+            reference = next(reference for dependency, reference in graph[path].items() if dependency in members)
+            exception = CircularReference(self.parameters[path].url, path, reference)
+            exception.category = 'parameters'
+            self.interpolation_exceptions[path] = exception
+            del self.unresolved[path]
+        return
+
+    def resolve_reference(self, path: 'Path', value: 'Value', reference: 'Path'):
+        '''
+        Only resolve the referenced path if it, or an ancestor, is still unresolved.
+        In dependency order this is only the case for references which were not known
+        when the graph was built.
+        '''
+        if reference not in self.unresolved and not self.parameters.unresolved_ancestor(reference):
+            try:
+                referenced = self.parameters[reference]
+            except NoSuchPath:
+                raise NoSuchReference(value.url, path, reference)
+            if not referenced.unresolved:
+                return
+        super().resolve_reference(path, value, reference)
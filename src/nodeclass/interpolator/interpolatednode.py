@@ -1,13 +1,26 @@
+from ..utils.dump import dump
+
 class InterpolatedNode:
-    def __init__(self, name, applications, classes, environment, exports, parameters):
+    __slots__ = ('name', 'applications', 'classes', 'environment', 'exports', 'parameters', 'inventory')
+
+    def __init__(self, name, applications, classes, environment, exports, parameters, inventory=None):
         self.name = name
         self.applications = applications
         self.classes = classes
         self.environment = environment
         self.exports = exports
         self.parameters = parameters
+        # None for a node without inventory queries, otherwise the tuple of the
+        # environment queried and whether any query uses +AllEnvs
+        self.inventory = inventory
 
     def as_dict(self):
         return { 'applications': self.applications, 'classes': self.classes,
                  'environment': self.environment, 'exports': self.exports,
                  'parameters': self.parameters }
+
+    def dump(self, format: 'str' = 'yaml') -> 'bytes':
+        ''' Return the node data encoded in the output format, one of yaml, json
+            or msgpack
+        '''
+        return dump(self.as_dict(), format)
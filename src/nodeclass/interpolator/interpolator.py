@@ -1,10 +1,14 @@
+from ..context import CONTEXT
 from ..exceptions import ProcessError
 from ..value.hierarchy import Hierarchy
 from .exceptions import InventoryError, InventoryQueryError
 from .exports_resolver import ExportsResolver
+from .graph_parameters_resolver import GraphParametersResolver
 from .interpolatednode import InterpolatedNode
 from .inventory import Inventory
 from .inventory_resolver import InventoryResolver
+from .lookup_parameters_resolver import LookupParametersResolver
+from .merge_cache import MergeCache
 from .parameter_analyser import ParameterAnalyser
 from .parameters_resolver import ParametersResolver
 
@@ -15,9 +19,19 @@ class Interpolator:
 
     def __init__(self):
         self.exports_resolver = ExportsResolver()
-        self.parameters_resolver = ParametersResolver()
+        if CONTEXT.settings.parameter_resolver == 'graph':
+            self.parameters_resolver = GraphParametersResolver()
+        else:
+            self.parameters_resolver = ParametersResolver()
         self.inventory_resolver = InventoryResolver(self.parameters_resolver)
-        self.inventory = Inventory(self.inventory_resolver)
+        self.merge_cache = MergeCache()
+        self.inventory = Inventory(self.inventory_resolver, self.merge_cache)
+
+    def clear(self):
+        ''' Empty the merge and inventory caches
+        '''
+        self.merge_cache.clear()
+        self.inventory.clear()
 
     def parameter_analysis(self, parameter, node, node_loader, klass_loader):
         analyser = ParameterAnalyser(parameter)
@@ -27,12 +41,44 @@ class Interpolator:
     def interpolate(self, node, node_loader, klass_loader):
         return self._interpolate_node(node, node_loader, klass_loader, None)
 
+    def lookup(self, node, paths, node_loader, klass_loader):
+        '''
+        Return a dictionary of the rendered values of the given parameter paths. Only
+        the parameters required by the paths are resolved and the exports are not used.
+        '''
+        parameters_merged = self._merge_parameters(node)
+        inventory_result = lambda queries: self._inventory_result(queries, node, parameters_merged, node_loader, klass_loader)
+        resolver = LookupParametersResolver(inventory_result)
+        parameters_resolved = resolver.lookup(node.inv_query_env, parameters_merged, paths)
+        return { str(path): parameters_resolved[path].render_all() for path in paths }
+
+    def _merge_exports(self, node):
+        merged = self.merge_cache.merged(node.environment, node.klasses)
+        return Hierarchy.merge_multiple([ merged.exports, node.nodeklass.exports, node.autoklass.exports ], 'exports')
+
+    def _merge_parameters(self, node):
+        merged = self.merge_cache.merged(node.environment, node.klasses)
+        return Hierarchy.merge_multiple([ merged.parameters, node.nodeklass.parameters, node.autoklass.parameters ], 'parameters')
+
     def _interpolate_node(self, node, node_loader, klass_loader, analyser):
-        exports_merged = Hierarchy.merge_multiple([ klass.exports for klass in node.all_klasses ], 'exports')
-        parameters_merged = Hierarchy.merge_multiple([ klass.parameters for klass in node.all_klasses ], 'parameters', analyser=analyser)
+        exports_merged = self._merge_exports(node)
+        if analyser:
+            # the analyser records each class merge, so merge without the cache
+            parameters_merged = Hierarchy.merge_multiple([ klass.parameters for klass in node.all_klasses ], 'parameters', analyser=analyser)
+        else:
+            parameters_merged = self._merge_parameters(node)
         inventory_queries = parameters_merged.inventory_queries()
+        inventory_result = self._inventory_result(inventory_queries, node, parameters_merged, node_loader, klass_loader)
+        parameters_resolved = self.parameters_resolver.resolve(node.inv_query_env, parameters_merged, inventory_result)
+        exports_resolved = self.exports_resolver.resolve(exports_merged, parameters_resolved)
+        inventory = None
+        if inventory_queries:
+            inventory = (node.inv_query_env, any(query.all_envs for query in inventory_queries))
+        return InterpolatedNode(node.name, node.applications, node.classes, node.environment, exports_resolved.render_all(), parameters_resolved.render_all(), inventory)
+
+    def _inventory_result(self, inventory_queries, node, parameters_merged, node_loader, klass_loader):
         try:
-            inventory_result = self.inventory.result(inventory_queries, node.inv_query_env, node_loader, klass_loader)
+            return self.inventory.result(inventory_queries, node.inv_query_env, node_loader, klass_loader)
         except InventoryQueryError as exception:
             try:
                 exception.path = parameters_merged.find_matching_contents_path(exception.query)
@@ -43,6 +89,3 @@ class Interpolator:
             raise
         except ProcessError as exception:
             raise InventoryError(exception)
-        parameters_resolved = self.parameters_resolver.resolve(node.inv_query_env, parameters_merged, inventory_result)
-        exports_resolved = self.exports_resolver.resolve(exports_merged, parameters_resolved)
-        return InterpolatedNode(node.name, node.applications, node.classes, node.environment, exports_resolved.render_all(), parameters_resolved.render_all())
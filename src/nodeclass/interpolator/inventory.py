@@ -1,28 +1,54 @@
 import logging
 
-from collections import OrderedDict
-from typing import NamedTuple
+from ..context import CONTEXT
 from ..exceptions import ProcessError
+from ..invquery.exceptions import InventoryQueryValueNotRenderable
+from ..invquery.index import IndexedInventory
 from ..node.node import Node
+from ..utils.lrucache import LRUCache
 from ..value.hierarchy import Hierarchy
+from ..value.value import ValueType
 from .exceptions import InventoryQueryError
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Dict, Set
+    from typing import Any, Dict, Set
     from ..invquery.query import Query
+    from ..utils.path import Path
 
 log = logging.getLogger(__name__)
 
-class InventoryResult(NamedTuple):
-    environment: 'str'
-    exports: 'Hierarchy'
-    failed_queries: 'Set[Query]'
+class InventoryResult:
+    ''' The exports of a node needed to answer a set of inventory queries
 
+        The exports are frozen, so rendered export values are kept and each
+        export is rendered at most once however many queries test it.
+    '''
 
-class CachedMerge(NamedTuple):
-    exports: 'Hierarchy'
-    parameters: 'Hierarchy'
+    __slots__ = ('environment', 'exports', 'failed_queries', 'rendered')
+
+    def __init__(self, environment: 'str', exports: 'Hierarchy', failed_queries: 'Set[Query]'):
+        self.environment = environment
+        self.exports = exports
+        self.failed_queries = failed_queries
+        self.rendered: 'Dict[Path, Any]' = {}
+
+    def __repr__(self) -> 'str':
+        return '{0}({1}, {2}, {3})'.format(self.__class__.__name__, self.environment, repr(self.exports), self.failed_queries)
+
+    def render(self, path: 'Path') -> 'Any':
+        ''' Return the rendered value of the export at path
+        '''
+        try:
+            return self.rendered[path]
+        except KeyError:
+            pass
+        value = self.exports[path]
+        if not ValueType.is_renderable(value):
+            raise InventoryQueryValueNotRenderable(path, value)
+        rendered = value.render_all()
+        self.rendered[path] = rendered
+        return rendered
 
 
 if TYPE_CHECKING:
@@ -30,26 +56,36 @@ if TYPE_CHECKING:
 
 
 class Inventory:
-    def __init__(self, resolver):
+    def __init__(self, resolver, merge_cache):
         self.resolver = resolver
-        self.merge_cache = {}
+        self.merge_cache = merge_cache
+        # Inventory answers are shared between all nodes issuing the same set of
+        # queries from the same environment, and the exports of each node are only
+        # resolved once for each set of queries the node is required to answer.
+        self.result_cache = LRUCache(CONTEXT.settings.inventory_cache_size)
+        self.node_cache = LRUCache(CONTEXT.settings.inventory_cache_size)
 
-    def _cached_merge(self, node):
-        exports_merged = Hierarchy.merge_multiple([ klass.exports for klass in node.klasses ], 'exports')
-        exports_merged.freeze()
-        parameters_merged = Hierarchy.merge_multiple([ klass.parameters for klass in node.klasses ], 'parameters')
-        parameters_merged.freeze()
-        return CachedMerge(exports_merged, parameters_merged)
+    def clear(self):
+        self.result_cache.clear()
+        self.node_cache.clear()
 
     def result(self, queries, environment, node_loader, klass_loader):
         if not queries:
             return {}
+        result_id = (frozenset(queries), environment)
+        result = self.result_cache.get(result_id, None)
+        if result is None:
+            result = self._result(queries, environment, node_loader, klass_loader)
+            self.result_cache[result_id] = result
+        return result
+
+    def _result(self, queries, environment, node_loader, klass_loader):
         proto_nodes = self.proto_nodes(queries, environment, node_loader)
         inventory = {}
         for proto in proto_nodes.values():
             if proto.queries:
                 try:
-                    inventory[proto.name] = self.node_inventory(proto, klass_loader)
+                    inventory[proto.name] = self._cached_node_inventory(proto, klass_loader)
                 except InventoryQueryError as exception:
                     exception.exception.node = proto.name
                     raise
@@ -59,11 +95,17 @@ class Inventory:
                     else:
                         exception.node = proto.name
                         raise
-        inventory = OrderedDict(sorted(inventory.items()))
+        inventory = IndexedInventory(sorted(inventory.items()))
         return inventory
 
     def proto_nodes(self, queries, environment, node_loader):
-        proto_nodes = { proto.name: proto for proto in node_loader.nodes() }
+        # only nodes which can answer one of the queries are loaded, for queries
+        # without +AllEnvs the node environment is read without parsing the node
+        all_envs = any(query.all_envs for query in queries)
+        proto_nodes = {}
+        for name in node_loader.nodenames():
+            if all_envs or node_loader.environment(name) == environment:
+                proto_nodes[name] = node_loader[name]
         for proto in proto_nodes.values():
             proto.queries = []
             proto.exports_required = set()
@@ -76,15 +118,21 @@ class Inventory:
                         proto.ignore_errors = False
         return proto_nodes
 
+    def _cached_node_inventory(self, proto, klass_loader):
+        node_id = (proto.name, frozenset(proto.queries))
+        result = self.node_cache.get(node_id, None)
+        if result is None:
+            result = self.node_inventory(proto, klass_loader)
+            self.node_cache[node_id] = result
+        return result
+
     def node_inventory(self, proto, klass_loader):
         node = Node(proto, klass_loader)
-        classes = '\n'.join(node.classes)
-        klass_id = (node.environment, classes)
-        if klass_id not in self.merge_cache:
-            self.merge_cache[klass_id] = self._cached_merge(node)
-        exports_merged = Hierarchy.merge_multiple([ self.merge_cache[klass_id].exports, node.nodeklass.exports, node.autoklass.exports ], 'exports')
-        parameters_merged = Hierarchy.merge_multiple([ self.merge_cache[klass_id].parameters, node.nodeklass.parameters, node.autoklass.parameters ], 'parameters')
+        merged = self.merge_cache.merged(node.environment, node.klasses)
+        exports_merged = Hierarchy.merge_multiple([ merged.exports, node.nodeklass.exports, node.autoklass.exports ], 'exports')
+        parameters_merged = Hierarchy.merge_multiple([ merged.parameters, node.nodeklass.parameters, node.autoklass.parameters ], 'parameters')
         exports_resolved, queries_failed = self.resolver.resolve(exports_merged, parameters_merged, proto.queries, proto.name)
         paths_present = { path for path in proto.exports_required if path in exports_resolved }
         exports_pruned = exports_resolved.extract(paths_present)
+        exports_pruned.freeze()
         return InventoryResult(proto.inv_query_env, exports_pruned, queries_failed)
@@ -0,0 +1,79 @@
+import copy
+from collections import defaultdict
+from ..value.exceptions import NoSuchPath
+from .exceptions import MultipleInterpolationErrors, NoSuchParameter
+from .parameters_resolver import ParametersResolver
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterable, List, Set
+    from ..invquery.query import Query
+    from ..utils.path import Path
+    from ..value.hierarchy import Hierarchy
+    from ..value.value import Value
+    from .exceptions import MergableInterpolationError
+    from .inventory import InventoryDict
+
+
+class LookupParametersResolver(ParametersResolver):
+    '''
+    Resolve only the requested parameter paths
+
+    Only the requested paths, the unresolved paths below them and the paths they
+    reference (transitively) are resolved, the rest of the parameters are left as
+    merged. Inventory queries are evaluated when a Value using them is resolved, so
+    only the queries reachable from the requested paths are evaluated.
+    '''
+
+    def __init__(self, inventory_result: 'Callable[[Set[Query]], InventoryDict]'):
+        '''
+        inventory_result: function returning the inventory query answers for a set
+                          of queries
+        '''
+        self.inventory_result = inventory_result
+
+    def lookup(self, environment: 'str', parameters: 'Hierarchy', paths: 'List[Path]') -> 'Hierarchy':
+        '''
+        environment: Environment to resolve the parameters in
+        parameters: Hierarchy of already merged parameters
+        paths: paths to resolve
+        returns: Hierarchy of parameters with the requested paths resolved
+        '''
+        self.environment = environment
+        self.parameters = copy.copy(parameters)
+        self.inventory = {}
+        self.visit_count: 'Dict[Path, int]' = defaultdict(int)
+        self.unresolved = dict.fromkeys(self.required_paths(paths), False)
+        self.interpolation_exceptions: 'Dict[Path, MergableInterpolationError]' = {}
+        try:
+            self.resolve_unresolved_paths()
+        except NoSuchPath as exception:
+            raise NoSuchParameter(exception.missing_path, category='parameters')
+        if len(self.interpolation_exceptions) > 0:
+            raise MultipleInterpolationErrors(list(self.interpolation_exceptions.values()))
+        for path in paths:
+            if path not in self.parameters:
+                raise NoSuchParameter(path, category='parameters')
+        return self.parameters
+
+    def required_paths(self, paths: 'Iterable[Path]') -> 'List[Path]':
+        '''
+        Return the unresolved paths which have to be resolved to render the given paths.
+        A path inside an unresolved value is resolved along with the value (see
+        ParametersResolver.resolve_path).
+        '''
+        required = []
+        for path in paths:
+            if self.parameters.unresolved_ancestor(path):
+                required.append(path)
+            elif path in self.parameters:
+                required.extend(sorted(self.parameters[path].unresolved_paths(path), key=str))
+            else:
+                raise NoSuchParameter(path, category='parameters')
+        return required
+
+    def value_inventory(self, value: 'Value') -> 'InventoryDict':
+        queries = value.inventory_queries()
+        if queries:
+            return self.inventory_result(queries)
+        return self.inventory
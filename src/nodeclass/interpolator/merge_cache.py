@@ -0,0 +1,72 @@
+from typing import NamedTuple
+from ..context import CONTEXT
+from ..utils.lrucache import LRUCache
+from ..value.hierarchy import Hierarchy
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, List
+    from ..node.klass import Klass
+
+
+class CachedMerge(NamedTuple):
+    exports: 'Hierarchy'
+    parameters: 'Hierarchy'
+
+
+class MergeTrieNode:
+    __slots__ = ('children', 'merged')
+
+    def __init__(self, merged: 'CachedMerge'):
+        self.children: 'Dict[str, MergeTrieNode]' = {}
+        self.merged = merged
+
+
+class MergeCache:
+    ''' Cache of the merged exports and parameters of lists of classes
+
+        The cache is a trie over the class names, one for each environment, holding
+        the merged result of each prefix of the class lists seen. Nodes with class
+        lists sharing a common prefix reuse the merge of the prefix and only merge
+        their remaining classes.
+
+        The cached hierarchies are frozen, so must be merged into a copy
+        (for example with Hierarchy.merge_multiple) and not changed in place.
+
+        The merge_cache_size setting limits the number of environments with a
+        trie, the trie of the least recently used environment is discarded first.
+    '''
+
+    def __init__(self):
+        self.roots: 'LRUCache' = LRUCache(CONTEXT.settings.merge_cache_size)
+
+    def clear(self):
+        self.roots.clear()
+
+    def merged(self, environment: 'str', klasses: 'List[Klass]') -> 'CachedMerge':
+        ''' Return the merged exports and parameters of the classes
+        '''
+        trie_node = self.roots.get(environment, None)
+        if trie_node is None:
+            empty = CachedMerge(Hierarchy.merge_multiple([], 'exports'), Hierarchy.merge_multiple([], 'parameters'))
+            empty.exports.freeze()
+            empty.parameters.freeze()
+            trie_node = MergeTrieNode(empty)
+            self.roots[environment] = trie_node
+        for depth, klass in enumerate(klasses):
+            child = trie_node.children.get(klass.name, None)
+            if child is None:
+                child = MergeTrieNode(self._merge(trie_node.merged, klass, depth))
+                trie_node.children[klass.name] = child
+            trie_node = child
+        return trie_node.merged
+
+    def _merge(self, prefix: 'CachedMerge', klass: 'Klass', depth: 'int') -> 'CachedMerge':
+        if depth == 0:
+            # the class hierarchies are already frozen
+            return CachedMerge(klass.exports, klass.parameters)
+        exports = Hierarchy.merge_multiple([ prefix.exports, klass.exports ], 'exports')
+        exports.freeze()
+        parameters = Hierarchy.merge_multiple([ prefix.parameters, klass.parameters ], 'parameters')
+        parameters.freeze()
+        return CachedMerge(exports, parameters)
@@ -38,18 +38,25 @@ class ParametersResolver:
     def resolve_unresolved_paths(self):
         while len(self.unresolved) > 0:
             path = next(iter(self.unresolved))
-            try:
-                self.resolve_path(path)
-            except MergableInterpolationError as exception:
-                if exception.path in self.interpolation_exceptions:
-                    raise MultipleInterpolationErrors(list(self.interpolation_exceptions.values()))
-                else:
-                    exception.category = 'parameters'
-                    self.interpolation_exceptions[path] = exception
-                    del self.unresolved[path]
-            except InterpolationError as exception:
+            self.resolve_unresolved_path(path)
+        return
+
+    def resolve_unresolved_path(self, path: 'Path'):
+        '''
+        Resolve the path, recording any mergable interpolation errors
+        '''
+        try:
+            self.resolve_path(path)
+        except MergableInterpolationError as exception:
+            if exception.path in self.interpolation_exceptions:
+                raise MultipleInterpolationErrors(list(self.interpolation_exceptions.values()))
+            else:
                 exception.category = 'parameters'
-                raise
+                self.interpolation_exceptions[path] = exception
+                del self.unresolved[path]
+        except InterpolationError as exception:
+            exception.category = 'parameters'
+            raise
         return
 
     def resolve_path(self, path: 'Path'):
@@ -82,18 +89,9 @@ class ParametersResolver:
         error if the visit count threshold is exceeded.
         '''
         for reference in value.references:
-            if reference in self.unresolved:
-                if self.unresolved[reference] is True:
-                    # The referenced path has already been visited and is still unresolved
-                    # so we have a circular reference
-                    raise CircularReference(value.url, path, reference)
-            try:
-                self.resolve_path(reference)
-            except NoSuchPath:
-                del self.unresolved[reference]
-                raise NoSuchReference(value.url, path, reference)
+            self.resolve_reference(path, value, reference)
         try:
-            value = value.resolve(self.parameters, self.inventory, self.environment)
+            value = value.resolve(self.parameters, self.value_inventory(value), self.environment)
         except InterpolationError as exception:
             exception.path = path + Path.fromlist(exception.reverse_path[::-1])
             raise
@@ -106,3 +104,24 @@ class ParametersResolver:
                 # an error somewhere
                 raise ExcessivePathRevisits(value.url, path)
         return value
+
+    def value_inventory(self, value: 'Value') -> 'InventoryDict':
+        '''
+        Return the inventory query answers to use when resolving the Value
+        '''
+        return self.inventory
+
+    def resolve_reference(self, path: 'Path', value: 'Value', reference: 'Path'):
+        '''
+        Resolve the path referenced by the Value at the given path
+        '''
+        if reference in self.unresolved:
+            if self.unresolved[reference] is True:
+                # The referenced path has already been visited and is still unresolved
+                # so we have a circular reference
+                raise CircularReference(value.url, path, reference)
+        try:
+            self.resolve_path(reference)
+        except NoSuchPath:
+            del self.unresolved[reference]
+            raise NoSuchReference(value.url, path, reference)
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class Comparision:
+    __slots__ = ('op',)
+
     def __init__(self, token: 'Token'):
         if token.type != Tag.COMPARISION.value:
             raise InventoryQueryParseError('expected comparision operator, found: {0}'.format(token))
@@ -36,3 +38,7 @@ class Comparision:
 
     def compare(self, lhs: 'Any', rhs: 'Any') -> 'bool':
         return self.op(lhs, rhs)
+
+    @property
+    def is_equal(self) -> 'bool':
+        return self.op == operator.eq
@@ -6,12 +6,16 @@ from .operand import Operand
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from typing import Any, Set
+    from ..interpolator.inventory import InventoryResult
+    from .index import ExportIndex
     from .tokenizer import Token
     from ..utils.path import Path
     from ..value.hierarchy import Hierarchy
 
 
 class Conditional:
+    __slots__ = ('lhs', 'comparision', 'rhs', 'export', 'other')
+
     def __init__(self, lhs_token: 'Token', comp_token: 'Token', rhs_token: 'Token'):
         self.lhs = Operand.FromToken(lhs_token)
         self.comparision = Comparision(comp_token)
@@ -42,13 +46,10 @@ class Conditional:
     def __repr__(self) -> 'str':
         return '{0}({1} {2} {3})'.format(self.__class__.__name__, repr(self.lhs), repr(self.comparision), repr(self.rhs))
 
-    def evaluate(self, node_exports: 'Hierarchy', context: 'Hierarchy') -> 'bool':
-        if self.export.path not in node_exports:
+    def evaluate(self, node: 'InventoryResult', context: 'Hierarchy') -> 'bool':
+        if self.export.path not in node.exports:
             return False
-        value = node_exports[self.export.path]
-        if not ValueType.is_renderable(value):
-            raise InventoryQueryValueNotRenderable(self.export.path, value)
-        export = value.render_all()
+        export = node.render(self.export.path)
         if Operand.is_pathed(self.other):
             value = context[self.other.path]
             if not ValueType.is_renderable(value):
@@ -58,6 +59,28 @@ class Conditional:
             other = self.other.data
         return self.comparision.compare(export, other)
 
+    def select(self, index: 'ExportIndex', candidates: 'Set[str]', context: 'Hierarchy') -> 'Set[str]':
+        '''
+        Return the names of the candidate nodes for which the conditional is true,
+        raising the same errors as evaluate would for the candidates
+        '''
+        path_index = index.path(self.export.path)
+        present = path_index.present & candidates
+        if not present:
+            return set()
+        path_index.check_renderable(present, index.position)
+        if Operand.is_pathed(self.other):
+            value = context[self.other.path]
+            if not ValueType.is_renderable(value):
+                raise InventoryQueryValueNotRenderable(self.other.path, value)
+            other = value.render_all()
+        else:
+            other = self.other.data
+        equal = path_index.equal(other) & present
+        if self.comparision.is_equal:
+            return equal
+        return present - equal
+
     @property
     def exports(self) -> 'Set[Path]':
         return self.lhs.exports | self.rhs.exports
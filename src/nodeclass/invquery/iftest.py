@@ -1,15 +1,30 @@
 from .conditional import Conditional
 from .logical import Logical
+from .operand import Operand
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Any, List, Set
+    from typing import Any, List, Set, Tuple
+    from ..interpolator.inventory import InventoryResult
     from ..utils.path import Path
     from ..value.hierarchy import Hierarchy
+    from .index import ExportIndex
     from .tokenizer import Token
 
 
 class IfTest:
+    ''' The test of an if query, a list of conditionals joined by and/or
+
+        The test is compiled to groups of conditionals, the test being true if all
+        the conditionals of any group are true, so and binds tighter than or.
+        Evaluation stops at the first false conditional in a group and at the first
+        true group. In each group the equality tests, which usually pass for fewer
+        nodes, come before the inequality tests, and tests against fixed values
+        before tests against parameters.
+    '''
+
+    __slots__ = ('conditionals', 'logicals', 'groups')
+
     def __init__(self, tokens: 'List[Token]'):
         self.conditionals = []
         self.logicals = []
@@ -21,6 +36,17 @@ class IfTest:
             if pos < len(tokens):
                 self.logicals.append(Logical(tokens[pos]))
             pos += 1
+        groups = [ [ self.conditionals[0] ] ]
+        for logical, conditional in zip(self.logicals, self.conditionals[1:]):
+            if logical.is_and:
+                groups[-1].append(conditional)
+            else:
+                groups.append([ conditional ])
+        self.groups = tuple(tuple(sorted(group, key=self._selectivity)) for group in groups)
+
+    @staticmethod
+    def _selectivity(conditional: 'Conditional') -> 'Tuple[bool, bool]':
+        return (not conditional.comparision.is_equal, Operand.is_pathed(conditional.other))
 
     def __eq_(self, other: 'Any') -> 'bool':
         if self.__class__ == other.__class__:
@@ -43,12 +69,27 @@ class IfTest:
     def __repr__(self) -> 'str':
         return '{0}({1})'.format(self.__class__.__name__, repr(self.conditionals))
 
-    def evaluate(self, node_exports: 'Hierarchy', context: 'Hierarchy') -> 'bool':
-        if len(self.conditionals) == 1:
-            return self.conditionals[0].evaluate(node_exports, context)
-        result = self.conditionals[0].evaluate(node_exports, context)
-        for i, logical in enumerate(self.logicals):
-            result = logical.combine(result, self.conditionals[i+1].evaluate(node_exports, context))
+    def evaluate(self, node: 'InventoryResult', context: 'Hierarchy') -> 'bool':
+        for group in self.groups:
+            if all(conditional.evaluate(node, context) for conditional in group):
+                return True
+        return False
+
+    def select(self, index: 'ExportIndex', candidates: 'Set[str]', context: 'Hierarchy') -> 'Set[str]':
+        '''
+        Return the names of the candidate nodes passing the test. Each conditional
+        of a group only tests the nodes passing the conditionals before it, and
+        each group only the nodes not already selected, so the same nodes are
+        tested as by evaluate.
+        '''
+        result: 'Set[str]' = set()
+        for group in self.groups:
+            remaining = candidates - result
+            for conditional in group:
+                if not remaining:
+                    break
+                remaining = conditional.select(index, remaining, context)
+            result |= remaining
         return result
 
     @property
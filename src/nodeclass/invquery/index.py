@@ -0,0 +1,125 @@
+from collections import OrderedDict, defaultdict
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+    from ..interpolator.inventory import InventoryDict
+    from ..utils.path import Path
+    from .query import Query
+
+
+class IndexedInventory(OrderedDict):
+    ''' An inventory dictionary which keeps the export index built for it, so
+        the index is shared by all the queries evaluated against the inventory
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._export_index: 'Optional[ExportIndex]' = None
+
+    @property
+    def export_index(self) -> 'ExportIndex':
+        if self._export_index is None:
+            self._export_index = ExportIndex(self)
+        return self._export_index
+
+
+class PathIndex:
+    ''' The rendered values of one export path over all the nodes of an inventory
+
+        present: names of the nodes with the export path
+        values: rendered value to the names of the nodes with the value
+        unhashable: (name, rendered value) of the nodes with lists or dictionaries
+        errors: node name to the error raised when the value of the node cannot be rendered,
+                raised only if the node is tested by a query
+    '''
+
+    __slots__ = ('path', 'present', 'values', 'unhashable', 'errors')
+
+    def __init__(self, path: 'Path', inventory: 'InventoryDict'):
+        self.path = path
+        self.present: 'Set[str]' = set()
+        self.values: 'Dict[Any, Set[str]]' = defaultdict(set)
+        self.unhashable: 'List[Tuple[str, Any]]' = []
+        self.errors: 'Dict[str, Exception]' = {}
+        for name, node in inventory.items():
+            if path not in node.exports:
+                continue
+            self.present.add(name)
+            try:
+                rendered = node.render(path)
+            except Exception as exception:
+                self.errors[name] = exception
+                continue
+            try:
+                self.values[rendered].add(name)
+            except TypeError:
+                self.unhashable.append((name, rendered))
+
+    def equal(self, other: 'Any') -> 'Set[str]':
+        ''' Return the names of the nodes where the export is equal to other
+        '''
+        try:
+            matches = set(self.values.get(other, ()))
+        except TypeError:
+            matches = { name for value, names in self.values.items() if value == other for name in names }
+        matches.update(name for name, value in self.unhashable if value == other)
+        return matches
+
+    def check_renderable(self, names: 'Iterable[str]', position: 'Dict[str, int]'):
+        ''' Raise an error for the first of the named nodes with an unrenderable value
+        '''
+        failed = self.errors.keys() & set(names)
+        if failed:
+            name = min(failed, key=position.__getitem__)
+            raise self.errors[name]
+
+
+class ExportIndex:
+    ''' Index of the exports of the nodes in an inventory
+
+        Maps export paths to rendered values to the set of nodes with the value,
+        so equality tests in inventory queries are set look ups and the logical
+        operators are set unions and intersections, instead of each query
+        rendering the exports of every node. Path indexes are built on first use.
+    '''
+
+    def __init__(self, inventory: 'InventoryDict'):
+        self.inventory = inventory
+        self.position = { name: i for i, name in enumerate(inventory) }
+        self.all: 'FrozenSet[str]' = frozenset(self.position)
+        environments: 'Dict[str, Set[str]]' = defaultdict(set)
+        for name, node in inventory.items():
+            environments[node.environment].add(name)
+        self.environments = { environment: frozenset(names) for environment, names in environments.items() }
+        self.failed = [ (name, node.failed_queries) for name, node in inventory.items() if node.failed_queries ]
+        self.paths: 'Dict[Path, PathIndex]' = {}
+
+    @staticmethod
+    def of(inventory: 'InventoryDict') -> 'ExportIndex':
+        if isinstance(inventory, IndexedInventory):
+            return inventory.export_index
+        return ExportIndex(inventory)
+
+    def path(self, path: 'Path') -> 'PathIndex':
+        if path not in self.paths:
+            self.paths[path] = PathIndex(path, self.inventory)
+        return self.paths[path]
+
+    def candidates(self, query: 'Query', environment: 'str') -> 'Set[str]':
+        ''' Return the names of the nodes the query applies to, the same nodes
+            as pass Query._common_evaluate_checks
+        '''
+        if query.all_envs:
+            names = set(self.all)
+        else:
+            names = set(self.environments.get(environment, ()))
+        for name, failed_queries in self.failed:
+            if query in failed_queries:
+                names.discard(name)
+        return names
+
+    def ordered(self, names: 'Iterable[str]') -> 'List[str]':
+        ''' Return the names in inventory order
+        '''
+        return sorted(names, key=self.position.__getitem__)
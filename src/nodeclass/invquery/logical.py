@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class Logical:
+    __slots__ = ('op',)
+
     def __init__(self, token: 'Token'):
         if token.type != Tag.LOGICAL.value:
             raise InventoryQueryParseError('expected a logical operator, found: {0}'.format(token))
@@ -35,5 +37,6 @@ class Logical:
     def __repr__(self) -> 'str':
         return '{0}({1})'.format(self.__class__.__name__, str(self))
 
-    def combine(self, lhs: 'bool', rhs: 'bool') -> 'bool':
-        return self.op(lhs, rhs)
+    @property
+    def is_and(self) -> 'bool':
+        return self.op == operator.and_
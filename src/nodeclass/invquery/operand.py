@@ -16,6 +16,8 @@ if TYPE_CHECKING:
 
 
 class Operand:
+    __slots__ = ('type', 'data')
+
     @staticmethod
     def FromToken(token: 'Token') -> 'Operand':
         if token.type in [ Tag.EXPORT.value, Tag.PARAMETER.value ]:
@@ -70,6 +72,8 @@ class Operand:
 
 
 class OperandPathed(Operand):
+    __slots__ = ('path',)
+
     def __init__(self, token: 'Token'):
         super().__init__(token)
         if token.type not in [ Tag.EXPORT.value, Tag.PARAMETER.value ]:
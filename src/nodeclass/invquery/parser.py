@@ -2,6 +2,7 @@ import pyparsing
 
 from typing import Any, Dict, Type, Union
 from ..context import CONTEXT
+from ..item.scanner import ScanError
 from .exceptions import InventoryQueryParseError
 from .query import QueryOptions, IfQuery, ListIfQuery, ValueQuery
 from .tokenizer import Tag
@@ -19,9 +20,25 @@ QUERY_TYPE_LOOKUP: Dict[Any, Union[Type[IfQuery], Type[ListIfQuery], Type[ValueQ
 
 
 def parse(expression: 'str') -> 'Query':
+    ''' Return the query for an inventory query expression
+
+        Queries are cached by expression string, so each distinct expression is
+        only tokenized once. Queries are not changed once made, so can be shared.
+    '''
+    query = CONTEXT.query_parse_cache.get(expression, None)
+    if query is None:
+        query = _parse(expression)
+        CONTEXT.query_parse_cache[expression] = query
+    return query
+
+
+def _parse(expression: 'str') -> 'Query':
     try:
-        tokens = CONTEXT.expression_tokenizer.parseString(expression.strip())
-    except pyparsing.ParseException:
+        if CONTEXT.settings.query_tokenizer == 'scanner':
+            tokens = CONTEXT.expression_scanner.scan(expression.strip())
+        else:
+            tokens = CONTEXT.expression_tokenizer.parseString(expression.strip())
+    except (pyparsing.ParseException, ScanError):
         raise InventoryQueryParseError('tokenizer error', expression)
     try:
         options = QueryOptions()
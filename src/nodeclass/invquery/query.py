@@ -6,6 +6,7 @@ from ..value.plain import Plain
 from ..value.vlist import VList
 from .exceptions import InventoryQueryParseError
 from .iftest import IfTest
+from .index import ExportIndex
 from .operand import OperandPathed
 from .tokenizer import Tag
 
@@ -18,6 +19,9 @@ if TYPE_CHECKING:
     from .tokenizer import Token
 
 
+INVQUERY_URL = PseudoUrl('invquery', 'invquery')
+
+
 class QueryOptions:
     def __init__(self):
         self.all_envs = False
@@ -30,16 +34,22 @@ class QueryOptions:
             self.ignore_errors = True
 
 class Query(ABC):
+    __slots__ = ('all_envs', 'ignore_errors')
+
     def __init__(self, options: 'QueryOptions'):
         self.all_envs = options.all_envs
         self.ignore_errors = options.ignore_errors
 
-    def __eq_(self, other: 'Any') -> 'bool':
+    def __eq__(self, other: 'Any') -> 'bool':
+        # Queries with the same string representation are equivalent, this allows
+        # identical queries from different nodes to share inventory answers
         if self.__class__ == other.__class__:
-            if (self.all_envs, self.ignore_errors) == (other.all_envs, other.ignore_errors):
-                return True
+            return str(self) == str(other)
         return False
 
+    def __ne__(self, other: 'Any') -> 'bool':
+        return not self.__eq__(other)
+
     def __hash__(self) -> 'int':
         return hash(str(self))
 
@@ -83,6 +93,8 @@ class Query(ABC):
 
 
 class IfQuery(Query):
+    __slots__ = ('returned', 'test')
+
     def __init__(self, tokens: 'List[Token]', options: 'QueryOptions'):
         super().__init__(options)
         if tokens[0].type != Tag.EXPORT.value:
@@ -92,15 +104,6 @@ class IfQuery(Query):
         self.returned = OperandPathed(tokens[0])
         self.test = IfTest(tokens[2:])
 
-    def __eq_(self, other: 'Any') -> 'bool':
-        if self.__class__ == other.__class__:
-            if (self.returned, self.test) == (other.returned, other.test):
-                return super().__eq__(other)
-        return False
-
-    def __ne__(self, other: 'Any') -> 'bool':
-        return not self.__eq__(other)
-
     def __str__(self) -> 'str':
         return '{0}{1} if {2}'.format(self.options_str(), self.returned, self.test)
 
@@ -108,13 +111,12 @@ class IfQuery(Query):
         return '{0}({1}{2} if {3})'.format(self.__class__.__name__, self.options_str(), repr(self.returned), repr(self.test))
 
     def evaluate(self, context: 'Hierarchy', inventory: 'InventoryDict', environment: 'str') -> 'Dictionary':
+        index = ExportIndex.of(inventory)
+        candidates = index.candidates(self, environment) & index.path(self.returned.path).present
         answer = {}
-        for name, node in inventory.items():
-            if self._common_evaluate_checks(node, environment):
-                if self.returned.path in node.exports:
-                    if self.test.evaluate(node.exports, context):
-                        answer[name] = node.exports[self.returned.path]
-        return Dictionary(answer, PseudoUrl('invquery', 'invquery'), check_for_prefix=False)
+        for name in index.ordered(self.test.select(index, candidates, context)):
+            answer[name] = inventory[name].exports[self.returned.path]
+        return Dictionary(answer, INVQUERY_URL, check_for_prefix=False)
 
     @property
     def exports(self) -> 'Set[Path]':
@@ -126,21 +128,14 @@ class IfQuery(Query):
 
 
 class ListIfQuery(Query):
+    __slots__ = ('test',)
+
     def __init__(self, tokens: 'List[Token]', options: 'QueryOptions'):
         super().__init__(options)
         if tokens[0].type != Tag.IF.value:
             raise InventoryQueryParseError('list if queries begin with "if", found {0}'.format(tokens[0]))
         self.test = IfTest(tokens[1:])
 
-    def __eq_(self, other: 'Any') -> 'bool':
-        if self.__class__ == other.__class__:
-            if self.test == other.test:
-                return super().__eq__(other)
-        return False
-
-    def __ne__(self, other: 'Any') -> 'bool':
-        return not self.__eq__(other)
-
     def __str__(self) -> 'str':
         return '{0}if {1}'.format(self.options_str(), self.test)
 
@@ -148,12 +143,12 @@ class ListIfQuery(Query):
         return '{0}({1}if {2})'.format(self.__class__.__name__, self.options_str(), repr(self.test))
 
     def evaluate(self, context: 'Hierarchy', inventory: 'InventoryDict', environment: 'str') -> 'VList':
+        index = ExportIndex.of(inventory)
+        candidates = index.candidates(self, environment)
         answer = []
-        for name, node in inventory.items():
-            if self._common_evaluate_checks(node, environment):
-                if self.test.evaluate(node.exports, context):
-                    answer.append(Plain(Scalar(name), PseudoUrl('invquery', 'invquery')))
-        return VList(answer, PseudoUrl('invquery', 'invquery'))
+        for name in index.ordered(self.test.select(index, candidates, context)):
+            answer.append(Plain(Scalar.shared(name), INVQUERY_URL))
+        return VList(answer, INVQUERY_URL)
 
     @property
     def exports(self) -> 'Set[Path]':
@@ -165,21 +160,14 @@ class ListIfQuery(Query):
 
 
 class ValueQuery(Query):
+    __slots__ = ('returned',)
+
     def __init__(self, tokens: 'List[Token]', options: 'QueryOptions'):
         super().__init__(options)
         if tokens[0].type != Tag.EXPORT.value or len(tokens) > 1:
             raise InventoryQueryParseError('value queries consist of an export to return, found: {0}'.format(tokens))
         self.returned = OperandPathed(tokens[0])
 
-    def __eq_(self, other: 'Any') -> 'bool':
-        if self.__class__ == other.__class__:
-            if self.returned == other.returned:
-                return super().__eq__(other)
-        return False
-
-    def __ne__(self, other: 'Any') -> 'bool':
-        return not self.__eq__(other)
-
     def __str__(self) -> 'str':
         return '{0}{1}'.format(self.options_str(), self.returned)
 
@@ -189,7 +177,7 @@ class ValueQuery(Query):
             if self._common_evaluate_checks(node, environment):
                 if self.returned.path in node.exports:
                     answer[name] = node.exports[self.returned.path]
-        return Dictionary(answer, PseudoUrl('invquery', 'invquery'), check_for_prefix=False)
+        return Dictionary(answer, INVQUERY_URL, check_for_prefix=False)
 
     @property
     def exports(self) -> 'Set[Path]':
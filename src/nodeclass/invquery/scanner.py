@@ -0,0 +1,226 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of nodeclass
+#
+import re
+from ..item.scanner import ScanError
+from .tokenizer import Tag, Token, _FALSE, _TRUE
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple
+    ScanResult = Optional[Tuple[Token, int]]
+    ScanListResult = Optional[Tuple[List[Token], int]]
+
+
+class ExpressionScanner:
+    ''' Hand written replacement for the pyparsing inventory query expression tokenizer
+
+        Returns exactly the same tokens as the expression tokenizer (see
+        make_expression_tokenizer in tokenizer.py), by recursive descent over
+        the expression instead of building and matching a grammar. The comments
+        on each method give the pyparsing expression being reproduced.
+
+        As for pyparsing, whitespace is skipped before each element, keywords are
+        matched without checking for a word boundary, and the first alternative
+        which matches is taken without backtracking into the others. Quoted
+        strings are delimited by the two character quote '" (the quote used by
+        the tokenizer), and only the \\t, \\n, \\f, \\r and \\0 escapes in them are
+        converted.
+    '''
+
+    whitespace = ' \n\t\r'
+
+    options = ('+IGNOREERRORS', '+ALLENVS')
+    comparisions = ('==', '!=')
+    logicals = ('AND', 'OR')
+    parameters = ('SELF:', 'PARAMETERS:')
+    export = 'EXPORTS:'
+    begin_if = 'IF'
+    bools = (_TRUE.upper(), _FALSE.upper())
+
+    word = re.compile(r'[!-~]+')
+    integer = re.compile(r'-?[0-9]+(?![!-~])')
+    real = re.compile(r'-?(?:[0-9]+\.[0-9]+|\.[0-9]+|[0-9]+\.)')
+    quoted = re.compile(r'\'"((?:\'(?!")|[^\'\n\r])*)\'"')
+    escapes = re.compile(r'\\[tnfr0]')
+    escaped = { '\\t': '\t', '\\n': '\n', '\\f': '\f', '\\r': '\r', '\\0': '\0' }
+
+    def scan(self, input: 'str') -> 'List[Token]':
+        ''' Return the list of tokens for the expression
+
+            line = StringStart + options + (expr_test | expr_var | expr_list_test) + StringEnd
+        '''
+        input = input.expandtabs()
+        tokens = []
+        position = 0
+        while True:
+            result = self._option(input, position)
+            if result is None:
+                break
+            token, position = result
+            tokens.append(token)
+        result = self._expr(input, position)
+        if result is None:
+            raise ScanError(input, position)
+        token, position = result
+        tokens.append(token)
+        if self._skip_whitespace(input, position) != len(input):
+            raise ScanError(input, position)
+        return tokens
+
+    def _skip_whitespace(self, input: 'str', position: 'int') -> 'int':
+        end = len(input)
+        while position < end and input[position] in self.whitespace:
+            position += 1
+        return position
+
+    def _keyword(self, input: 'str', position: 'int', keywords: 'Tuple[str, ...]') -> 'Optional[Tuple[str, int]]':
+        # CaselessLiteral(keyword[0]) | CaselessLiteral(keyword[1]) ..., returning the
+        # keyword as given in the grammar
+        position = self._skip_whitespace(input, position)
+        for keyword in keywords:
+            if input[position:position+len(keyword)].upper() == keyword:
+                return keyword, position + len(keyword)
+        return None
+
+    def _option(self, input: 'str', position: 'int') -> 'ScanResult':
+        # option = (CaselessLiteral(_IGNORE_ERRORS) | CaselessLiteral(_ALL_ENVS)), lower cased
+        result = self._keyword(input, position, self.options)
+        if result is None:
+            return None
+        keyword, position = result
+        return Token(Tag.OPTION.value, keyword.lower()), position
+
+    def _expr(self, input: 'str', position: 'int') -> 'ScanResult':
+        # expr = Group(export + if_test) | Group(export) | Group(if_test)
+        result = self._export(input, position)
+        if result is not None:
+            export, position = result
+            test = self._if_test(input, position)
+            if test is None:
+                return Token(Tag.VALUE_QUERY.value, [ export ]), position
+            tokens, position = test
+            return Token(Tag.IF_QUERY.value, [ export ] + tokens), position
+        test = self._if_test(input, position)
+        if test is None:
+            return None
+        tokens, position = test
+        return Token(Tag.LIST_IF_QUERY.value, tokens), position
+
+    def _if_test(self, input: 'str', position: 'int') -> 'ScanListResult':
+        # if_test = begin_if + single_test + ZeroOrMore(operator_logical + single_test)
+        result = self._keyword(input, position, (self.begin_if,))
+        if result is None:
+            return None
+        keyword, position = result
+        tokens = [ Token(Tag.IF.value, keyword) ]
+        test = self._single_test(input, position)
+        if test is None:
+            return None
+        test_tokens, position = test
+        tokens.extend(test_tokens)
+        while True:
+            result = self._keyword(input, position, self.logicals)
+            if result is None:
+                break
+            keyword, additional_position = result
+            test = self._single_test(input, additional_position)
+            if test is None:
+                break
+            test_tokens, position = test
+            tokens.append(Token(Tag.LOGICAL.value, keyword))
+            tokens.extend(test_tokens)
+        return tokens, position
+
+    def _single_test(self, input: 'str', position: 'int') -> 'ScanListResult':
+        # single_test = expritem + operator_test + expritem
+        first = self._expritem(input, position)
+        if first is None:
+            return None
+        first_token, position = first
+        result = self._keyword(input, position, self.comparisions)
+        if result is None:
+            return None
+        keyword, position = result
+        second = self._expritem(input, position)
+        if second is None:
+            return None
+        second_token, position = second
+        return [ first_token, Token(Tag.COMPARISION.value, keyword), second_token ], position
+
+    def _expritem(self, input: 'str', position: 'int') -> 'ScanResult':
+        # expritem = bool | integer | real | quoted_string_tagged | export | parameter | string_tagged
+        position = self._skip_whitespace(input, position)
+        keyword_result = self._keyword(input, position, self.bools)
+        if keyword_result is not None:
+            keyword, position = keyword_result
+            return Token(Tag.BOOL.value, keyword == self.bools[0]), position
+        match = self.integer.match(input, position)
+        if match:
+            return Token(Tag.INT.value, int(match.group())), match.end()
+        match = self.real.match(input, position)
+        if match:
+            return Token(Tag.FLOAT.value, float(match.group())), match.end()
+        string_result = self._quoted(input, position)
+        if string_result is not None:
+            string, position = string_result
+            return Token(Tag.STRING.value, string), position
+        result = self._export(input, position)
+        if result is not None:
+            return result
+        result = self._parameter(input, position)
+        if result is not None:
+            return result
+        match = self.word.match(input, position)
+        if match:
+            return Token(Tag.STRING.value, match.group()), match.end()
+        return None
+
+    def _export(self, input: 'str', position: 'int') -> 'ScanResult':
+        # export = CaselessLiteral(_EXPORT).suppress() + (quoted_string | string)
+        result = self._keyword(input, position, (self.export,))
+        if result is None:
+            return None
+        _, position = result
+        result = self._string(input, position)
+        if result is None:
+            return None
+        string, position = result
+        return Token(Tag.EXPORT.value, string), position
+
+    def _parameter(self, input: 'str', position: 'int') -> 'ScanResult':
+        # parameter = (CaselessLiteral(_PARAMETER[0]) | CaselessLiteral(_PARAMETER[1])).suppress() + (quoted_string | string)
+        result = self._keyword(input, position, self.parameters)
+        if result is None:
+            return None
+        _, position = result
+        result = self._string(input, position)
+        if result is None:
+            return None
+        string, position = result
+        return Token(Tag.PARAMETER.value, string), position
+
+    def _string(self, input: 'str', position: 'int') -> 'Optional[Tuple[str, int]]':
+        # quoted_string | Word(printables)
+        position = self._skip_whitespace(input, position)
+        result = self._quoted(input, position)
+        if result is not None:
+            return result
+        match = self.word.match(input, position)
+        if match:
+            return match.group(), match.end()
+        return None
+
+    def _quoted(self, input: 'str', position: 'int') -> 'Optional[Tuple[str, int]]':
+        # QuotedString('\'"')
+        match = self.quoted.match(input, position)
+        if match is None:
+            return None
+        string = self.escapes.sub(lambda escape: self.escaped[escape.group()], match.group(1))
+        return string, match.end()
+
+
+def make_expression_scanner() -> 'ExpressionScanner':
+    return ExpressionScanner()
@@ -21,6 +21,8 @@ class InvQuery(Item):
     ''' Holds an inventory query
     '''
 
+    __slots__ = ()
+
     def __init__(self, inv_query: 'Query'):
         self.contents: Query
         super().__init__(inv_query)
@@ -11,6 +11,7 @@ from .exceptions import BadParseToken, ParseError
 from .invquery import InvQuery
 from .reference import Reference
 from .scalar import Scalar
+from .scanner import ScanError
 from .tokenizer import Tag
 
 
@@ -37,7 +38,7 @@ def parse(input):
 
     def process_token(tag, value):
         if tag == Tag.STR.value:
-            return Scalar(value)
+            return Scalar.shared(value)
         elif tag == Tag.REF.value:
             return process_reference(value)
         elif tag == Tag.INV.value:
@@ -51,8 +52,9 @@ def parse(input):
         except pyparsing.ParseException as e:
             raise ParseError(input, e.col)
 
-    if input in CONTEXT.item_parse_cache:
-        return CONTEXT.item_parse_cache[input]
+    item = CONTEXT.item_parse_cache.get(input, None)
+    if item is not None:
+        return item
 
     sentinel_count = input.count(CONTEXT.settings.reference_sentinels[0]) + \
                      input.count(CONTEXT.settings.inventory_query_sentinels[0])
@@ -61,7 +63,13 @@ def parse(input):
         # speed up: if there are no sentinels in the string then do not parse
         # the input string as the returned item must be a simple scalar item
         # containing the string
-        return Scalar(input)
+        return Scalar.shared(input)
+    elif CONTEXT.settings.item_tokenizer == 'scanner':
+        # the hand written scanner handles all inputs in a single pass
+        try:
+            tokens = CONTEXT.item_scanner.scan(input)
+        except ScanError as e:
+            raise ParseError(input, e.col)
     elif sentinel_count == 1:
         # speed up: if only a single sentinel is present then it is most likely
         # a simple reference so try the simpler and much faster single reference
@@ -3,6 +3,7 @@
 #
 # This file is part of nodeclass
 #
+from ..context import CONTEXT
 from .exceptions import ScalarResolveToValue
 from .item import Item
 
@@ -16,6 +17,27 @@ class Scalar(Item):
     ''' Holds either an int, float, bool or string
     '''
 
+    __slots__ = ()
+
+    @staticmethod
+    def shared(contents: 'RenderableValue') -> 'Scalar':
+        ''' Return a Scalar holding contents, shared with all the other shared
+            Scalars of the same contents and type in the current context
+        '''
+        # NaN is never equal to itself, so would never be found in the table
+        if contents != contents:
+            return Scalar(contents)
+        # the type is part of the key as True == 1 == 1.0
+        key = (contents.__class__, contents)
+        try:
+            scalar = CONTEXT.scalar_intern.get(key, None)
+        except TypeError:
+            return Scalar(contents)
+        if scalar is None:
+            scalar = Scalar(contents)
+            CONTEXT.scalar_intern[key] = scalar
+        return scalar
+
     def __init__(self, contents: 'RenderableValue'):
         super().__init__(contents)
 
@@ -0,0 +1,221 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of nodeclass
+#
+import re
+from .tokenizer import Tag, Token
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple
+    from ..settings import Settings
+    ScanResult = Optional[Tuple[Token, int]]
+
+
+class ScanError(Exception):
+    def __init__(self, input: 'str', location: 'int'):
+        super().__init__()
+        self.input = input
+        self.location = location
+        # one based column, as for pyparsing exceptions
+        self.col = location + 1
+
+
+class Scanner:
+    ''' Hand written replacement for the pyparsing full tokenizer
+
+        Returns exactly the same tokens as the full tokenizer (see make_full_tokenizer
+        in tokenizer.py) in a single pass over the input, without building and
+        matching a grammar. The comments on each method give the pyparsing
+        expression being reproduced.
+
+        The full tokenizer is built with leaveWhitespace, but this does not reach
+        the expressions inside the Forward used for nested references. So inside
+        a reference whitespace is skipped before each item, and before the closing
+        sentinel of a nested reference. The scanner does the same, and also
+        expands tabs in the input as pyparsing does.
+    '''
+
+    whitespace = ' \n\t\r'
+
+    def __init__(self, settings: 'Settings'):
+        escape = settings.escape_character
+        double_escape = escape + escape
+        self.ref_open, self.ref_close = settings.reference_sentinels
+        self.inv_open, self.inv_close = settings.inventory_query_sentinels
+        self.escape = escape
+        self.double_escape = double_escape
+        self.double_escape_before = (self.ref_open, self.ref_close, self.inv_open, self.inv_close)
+        self.ref_escape_open = escape + self.ref_open
+        self.ref_escape_close = escape + self.ref_close
+        self.inv_escape_open = escape + self.inv_open
+        self.inv_escape_close = escape + self.inv_close
+        self.ref_close_first = self.ref_close[0]
+        self.inv_close_first = self.inv_close[0]
+        self.string_stops = (self.ref_open, self.ref_escape_open, double_escape + self.ref_open,
+                             self.inv_open, self.inv_escape_open, double_escape + self.inv_open)
+        self.ref_string_stops = (self.ref_open, self.ref_escape_open, double_escape + self.ref_open,
+                                 self.ref_close, self.ref_escape_close, double_escape + self.ref_close)
+        self.inv_string_stops = (self.inv_close, self.inv_escape_close, double_escape + self.inv_close)
+        excludes = escape + self.ref_open + self.ref_close + self.inv_open + self.inv_close
+        ref_excludes = escape + self.ref_open + self.ref_close
+        self.text = re.compile('[^{0}]+'.format(re.escape(excludes)))
+        self.ref_text = re.compile('[^{0}]+'.format(re.escape(ref_excludes)))
+
+    def scan(self, input: 'str') -> 'List[Token]':
+        ''' Return the list of tokens for the input string
+
+            line = StringStart + (OneOrMore(reference | string) | inv_query) + StringEnd
+        '''
+        input = input.expandtabs()
+        tokens = []
+        position = 0
+        end = len(input)
+        while position < end:
+            result = None
+            if input.startswith(self.ref_open, position):
+                result = self._reference(input, position, False)
+            if result is None:
+                result = self._string(input, position)
+            if result is None:
+                break
+            token, position = result
+            tokens.append(token)
+        if len(tokens) == 0:
+            result = self._inventory_query(input, 0)
+            if result is not None:
+                token, position = result
+                tokens.append(token)
+        if len(tokens) == 0 or position != end:
+            raise ScanError(input, position)
+        return tokens
+
+    def _double_escape(self, input: 'str', position: 'int') -> 'ScanResult':
+        # double_escape = Combine(DOUBLE_ESCAPE + FollowedBy(any sentinel))
+        if input.startswith(self.double_escape, position):
+            if input.startswith(self.double_escape_before, position + len(self.double_escape)):
+                return Token(Tag.STR.value, self.escape), position + len(self.double_escape)
+        return None
+
+    def _string(self, input: 'str', position: 'int') -> 'ScanResult':
+        # string = double_escape | ref_escape_open | inv_escape_open | content
+        result = self._double_escape(input, position)
+        if result is not None:
+            return result
+        if input.startswith(self.ref_escape_open, position):
+            return Token(Tag.STR.value, self.ref_open), position + len(self.ref_escape_open)
+        if input.startswith(self.inv_escape_open, position):
+            return Token(Tag.STR.value, self.inv_open), position + len(self.inv_escape_open)
+        # content = Combine(OneOrMore(ref_not_open + inv_not_open + text))
+        start = position
+        end = len(input)
+        while position < end:
+            if input.startswith(self.string_stops, position):
+                break
+            match = self.text.match(input, position)
+            if match:
+                position = match.end()
+            else:
+                position += 1
+        if position == start:
+            return None
+        return Token(Tag.STR.value, input[start:position]), position
+
+    def _skip_whitespace(self, input: 'str', position: 'int') -> 'int':
+        end = len(input)
+        while position < end and input[position] in self.whitespace:
+            position += 1
+        return position
+
+    def _reference(self, input: 'str', position: 'int', nested: 'bool') -> 'ScanResult':
+        # reference = ref_open + Group(OneOrMore(reference | ref_string)) + ref_close
+        position += len(self.ref_open)
+        items = []
+        while True:
+            result = None
+            item_position = self._skip_whitespace(input, position)
+            if input.startswith(self.ref_open, item_position):
+                result = self._reference(input, item_position, True)
+            if result is None:
+                result = self._ref_string(input, item_position)
+            if result is None:
+                break
+            token, position = result
+            items.append(token)
+        if nested:
+            position = self._skip_whitespace(input, position)
+        if len(items) == 0 or not input.startswith(self.ref_close, position):
+            return None
+        return Token(Tag.REF.value, items), position + len(self.ref_close)
+
+    def _ref_string(self, input: 'str', position: 'int') -> 'ScanResult':
+        # ref_string = double_escape | ref_escape_open | ref_escape_close | ref_content
+        result = self._double_escape(input, position)
+        if result is not None:
+            return result
+        if input.startswith(self.ref_escape_open, position):
+            return Token(Tag.STR.value, self.ref_open), position + len(self.ref_escape_open)
+        if input.startswith(self.ref_escape_close, position):
+            return Token(Tag.STR.value, self.ref_close), position + len(self.ref_escape_close)
+        # ref_content = Combine(OneOrMore(ref_not_open + ref_not_close + ref_text))
+        start = position
+        end = len(input)
+        while position < end:
+            if input.startswith(self.ref_string_stops, position):
+                break
+            match = self.ref_text.match(input, position)
+            if match:
+                position = match.end()
+            elif input[position] != self.ref_close_first:
+                position += 1
+            else:
+                break
+        if position == start:
+            return None
+        return Token(Tag.STR.value, input[start:position]), position
+
+    def _inventory_query(self, input: 'str', position: 'int') -> 'ScanResult':
+        # inv_query = inv_open + Group(OneOrMore(inv_string)) + inv_close
+        if not input.startswith(self.inv_open, position):
+            return None
+        position += len(self.inv_open)
+        items = []
+        while True:
+            result = self._inv_string(input, position)
+            if result is None:
+                break
+            token, position = result
+            items.append(token)
+        if len(items) == 0 or not input.startswith(self.inv_close, position):
+            return None
+        return Token(Tag.INV.value, items), position + len(self.inv_close)
+
+    def _inv_string(self, input: 'str', position: 'int') -> 'ScanResult':
+        # inv_string = double_escape | inv_escape_open | inv_escape_close | inv_content
+        result = self._double_escape(input, position)
+        if result is not None:
+            return result
+        if input.startswith(self.inv_escape_open, position):
+            return Token(Tag.STR.value, self.inv_open), position + len(self.inv_escape_open)
+        if input.startswith(self.inv_escape_close, position):
+            return Token(Tag.STR.value, self.inv_close), position + len(self.inv_escape_close)
+        # inv_content = Combine(OneOrMore(inv_not_close + CharsNotIn(INV_CLOSE_FIRST)))
+        start = position
+        end = len(input)
+        while position < end:
+            if input.startswith(self.inv_string_stops, position):
+                break
+            next_close = input.find(self.inv_close_first, position)
+            if next_close == -1:
+                next_close = end
+            if next_close == position:
+                break
+            position = next_close
+        if position == start:
+            return None
+        return Token(Tag.STR.value, input[start:position]), position
+
+
+def make_scanner(settings: 'Settings') -> 'Scanner':
+    return Scanner(settings)
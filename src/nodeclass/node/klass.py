@@ -16,6 +16,8 @@ class Klass:
     ''' A nodeclass class.
     '''
 
+    __slots__ = ('name', 'applications', 'classes', 'exports', 'parameters', 'url')
+
     @staticmethod
     def from_class_dict(name: 'str', class_dict: 'Dict', url: 'Url') -> 'Klass':
         # It is possible for classes, applications, exports and parameters in the yaml
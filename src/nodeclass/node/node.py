@@ -10,10 +10,15 @@ if TYPE_CHECKING:
     from ..storage.loader import KlassLoader
     from .protonode import ProtoNode
 
+AUTO_URL = PseudoUrl('__auto__', '__auto__')
+
+
 class Node:
     ''' A nodeclass node
     '''
 
+    __slots__ = ('name', 'environment', 'inv_query_env', 'autoklass', 'nodeklass', 'klasses', 'applications', 'classes', 'all_klasses', 'all_classes')
+
     def __init__(self, proto: 'ProtoNode', klass_loader: 'KlassLoader'):
         '''
         proto: ProtoNode object
@@ -44,7 +49,7 @@ class Node:
 
     def _make_auto_class_dict(self) -> 'Klass':
         name = '__auto__'
-        url = PseudoUrl(name, name)
+        url = AUTO_URL
         if not CONTEXT.settings.automatic_parameters:
             return Klass.from_class_dict(name, {}, url)
         auto_klass_dict: 'Dict' = {
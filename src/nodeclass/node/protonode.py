@@ -8,8 +8,13 @@ class ProtoNode:
 
         Used by the inventory resolver to determine if the full node needs
         to be loaded.
+
+        queries, exports_required and ignore_errors are set by the inventory for
+        the queries the node has to answer.
     '''
 
+    __slots__ = ('name', 'environment', 'inv_query_env', 'klass', 'url', 'queries', 'exports_required', 'ignore_errors')
+
     def __init__(self, name: 'str', environment: 'str', klass: 'Klass', url: 'Url'):
         self.name = name
         self.environment = environment
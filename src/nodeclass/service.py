@@ -0,0 +1,114 @@
+import threading
+from .context import nodeclass_clear_caches, nodeclass_context_state, nodeclass_restored_context, nodeclass_set_context
+from .core import node_inner, nodeinfo_inner
+from .interpolator.interpolator import Interpolator
+from .storage.factory import Factory as StorageFactory
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional, Tuple
+    from .interpolator.interpolatednode import InterpolatedNode
+    from .node.node import Node
+    from .settings import Settings
+    from .storage.factory import StorageCache
+    from .storage.loader import KlassLoader, NodeLoader
+    from .storage.uri import Uri
+
+
+class Service:
+    ''' A long lived nodeclass instance for a single settings and uri pair
+
+        The class and node loaders, the interpolator caches and the parsed item
+        cache are kept between calls. Before each call the storages are checked
+        for changes (file modification times for file system storages, branch
+        heads for git storages) and all the cached data is discarded if anything
+        has changed. File system storages are checked at most once every
+        fingerprint_interval seconds (see settings) and git storages fetch from
+        the remote at most once every fetch_interval seconds. The storages are
+        kept when the loaders are rebuilt, so a change found by a fetch is not
+        fetched again.
+
+        All calls are serialised, so a Service can be shared between threads.
+    '''
+
+    def __init__(self, settings: 'Settings', uri: 'Uri'):
+        self.settings = settings
+        self.uri = uri
+        self.lock = threading.Lock()
+        self.context: 'Optional[Dict[str, Any]]' = None
+        self.loaders: 'Optional[Tuple[KlassLoader, NodeLoader]]' = None
+        self.interpolator: 'Optional[Interpolator]' = None
+        self.fingerprint: 'Optional[str]' = None
+        self.storage_cache: 'StorageCache' = {}
+
+    def _fingerprint(self) -> 'str':
+        assert self.loaders is not None
+        klass_loader, node_loader = self.loaders
+        return '{0}\n{1}'.format(klass_loader.fingerprint(), node_loader.fingerprint())
+
+    def _refresh(self):
+        fingerprint = None
+        if self.loaders is not None:
+            with nodeclass_restored_context(self.context):
+                fingerprint = self._fingerprint()
+            if fingerprint == self.fingerprint:
+                return
+        with nodeclass_restored_context({}):
+            nodeclass_set_context(self.settings)
+            self.context = nodeclass_context_state()
+        with nodeclass_restored_context(self.context):
+            self.loaders = StorageFactory.loaders(self.uri, self.storage_cache)
+            self.interpolator = Interpolator()
+            # the storages are kept in the storage cache, so a fingerprint taken
+            # before the loaders were rebuilt is also the fingerprint of the new loaders
+            self.fingerprint = fingerprint if fingerprint is not None else self._fingerprint()
+
+    def clear(self):
+        ''' Discard all the cached data, it is loaded again on the next call
+        '''
+        with self.lock:
+            if self.loaders is not None:
+                klass_loader, node_loader = self.loaders
+                klass_loader.clear()
+                node_loader.clear()
+            if self.interpolator is not None:
+                self.interpolator.clear()
+            if self.context is not None:
+                with nodeclass_restored_context(self.context):
+                    nodeclass_clear_caches()
+
+    def cache_stats(self) -> 'Dict[str, Dict[str, Any]]':
+        ''' Return the size, limit and hit, miss and eviction counts of each cache
+        '''
+        with self.lock:
+            stats = {}
+            if self.loaders is not None:
+                klass_loader, node_loader = self.loaders
+                stats['classes'] = klass_loader.cache.stats()
+                stats['nodes'] = node_loader.cache.stats()
+            if self.interpolator is not None:
+                stats['merge'] = self.interpolator.merge_cache.roots.stats()
+                stats['inventory_results'] = self.interpolator.inventory.result_cache.stats()
+                stats['inventory_nodes'] = self.interpolator.inventory.node_cache.stats()
+            if self.context is not None:
+                stats['item_parse'] = self.context['item_parse_cache'].stats()
+                stats['query_parse'] = self.context['query_parse_cache'].stats()
+                stats['path_intern'] = self.context['path_intern'].stats()
+                stats['scalar_intern'] = self.context['scalar_intern'].stats()
+            return stats
+
+    def nodeinfo(self, nodename: 'str') -> 'InterpolatedNode':
+        with self.lock:
+            self._refresh()
+            assert self.context is not None and self.loaders is not None and self.interpolator is not None
+            klass_loader, node_loader = self.loaders
+            with nodeclass_restored_context(self.context):
+                return nodeinfo_inner(nodename, self.interpolator, klass_loader, node_loader)
+
+    def node(self, nodename: 'str') -> 'Node':
+        with self.lock:
+            self._refresh()
+            assert self.context is not None and self.loaders is not None
+            klass_loader, node_loader = self.loaders
+            with nodeclass_restored_context(self.context):
+                return node_inner(nodename, klass_loader, node_loader)
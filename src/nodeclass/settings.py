@@ -3,7 +3,7 @@
 #
 # This file is part of nodeclass
 #
-from .exceptions import UnknownConfigSetting
+from .exceptions import InvalidConfigSettingValue, UnknownConfigSetting
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -15,25 +15,57 @@ class Settings:
         'allow_none_overwrite': True,
         'automatic_parameters': True,
         'automatic_parameters_name': '_auto_',
+        'class_cache_dir': None,
+        'class_cache_size': None,
+        'class_load_threads': 1,
         'delimiter': ':',
         'escape_character': '\\',
+        'fingerprint_interval': 5,
         'env_override': None,
         'immutable_prefix': '=',
+        'intern_cache_size': None,
+        'inventory_cache_size': None,
         'inventory_query_sentinels': ('$[', ']'),
+        'item_parse_cache_size': None,
+        'item_tokenizer': 'scanner',
+        'merge_cache_size': None,
+        'node_cache_size': None,
         'overwrite_prefix': '~',
+        'parameter_resolver': 'recursive',
+        'query_parse_cache_size': None,
+        'query_tokenizer': 'scanner',
         'reference_sentinels': ('${', '}')
     }
 
+    allowed_values = {
+        'item_tokenizer': ('pyparsing', 'scanner'),
+        'parameter_resolver': ('graph', 'recursive'),
+        'query_tokenizer': ('pyparsing', 'scanner'),
+    }
+
     def __init__(self, settings: 'Optional[ConfigDict]' = None):
         self.allow_none_overwrite: 'bool'
         self.automatic_parameters: 'bool'
         self.automatic_parameters_name: 'str'
+        self.class_cache_dir: 'Optional[str]'
+        self.class_cache_size: 'Optional[int]'
+        self.class_load_threads: 'int'
         self.delimiter: 'str'
         self.escape_character: 'str'
+        self.fingerprint_interval: 'int'
         self.env_override: 'Optional[str]'
         self.immutable_prefix: 'str'
+        self.intern_cache_size: 'Optional[int]'
+        self.inventory_cache_size: 'Optional[int]'
         self.inventory_query_sentinels: 'Tuple[str, str]'
+        self.item_parse_cache_size: 'Optional[int]'
+        self.item_tokenizer: 'str'
+        self.merge_cache_size: 'Optional[int]'
+        self.node_cache_size: 'Optional[int]'
         self.overwrite_prefix: 'str'
+        self.parameter_resolver: 'str'
+        self.query_parse_cache_size: 'Optional[int]'
+        self.query_tokenizer: 'str'
         self.reference_sentinels: 'Tuple[str, str]'
         settings = settings or {}
         self.allowed = set(self.default_settings)
@@ -46,6 +78,8 @@ class Settings:
     def update(self, settings: 'MutableMapping[str, Any]'):
         for name, value in settings.items():
             if name in self.allowed:
+                if name in self.allowed_values and value not in self.allowed_values[name]:
+                    raise InvalidConfigSettingValue(name, value, self.allowed_values[name])
                 setattr(self, name, value)
             else:
                 raise UnknownConfigSetting(name)
@@ -75,6 +75,18 @@ class InvalidUriOption(InvalidUri):
                [ 'uri:{0} - invalid option: {1}'.format(self.section, self.option) ]
 
 
+class InvalidUriOptionValue(InvalidUri):
+    def __init__(self, uri, option, value, allowed):
+        super().__init__(uri)
+        self.option = option
+        self.value = value
+        self.allowed = allowed
+
+    def message(self) -> 'MessageList':
+        return super().message() + \
+               [ 'uri:{0} - invalid value for option {1}: {2}, allowed values: {3}'.format(self.section, self.option, self.value, self.allowed) ]
+
+
 class RequiredUriOptionMissing(InvalidUri):
     def __init__(self, uri, option, section=None):
         super().__init__(uri, section=section)
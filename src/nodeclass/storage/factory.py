@@ -1,7 +1,9 @@
 from collections import namedtuple
+from ..context import CONTEXT
 from .exceptions import InvalidResource, InvalidUri
 from .filesystem import FileSystemClasses, FileSystemNodes
 from .gitrepo import GitRepoClasses, GitRepoNodes
+from .klasscache import KlassCache
 from .loader import KlassLoader, NodeLoader
 from .yaml import Yaml
 
@@ -56,7 +58,10 @@ class Factory:
         default_resource = get_resource(default_uri)
         default_storage = get_storage(default_resource, default_uri, cache)
         storages.append( ('*', default_storage) )
-        return KlassLoader(storages)
+        klass_cache = None
+        if CONTEXT.settings.class_cache_dir:
+            klass_cache = KlassCache(CONTEXT.settings.class_cache_dir, CONTEXT.settings)
+        return KlassLoader(storages, klass_cache)
 
     @classmethod
     def node_loader(cls, nodes_uri: 'ConfigDict', cache: 'Optional[StorageCache]' = None) -> 'NodeLoader':
@@ -72,10 +77,12 @@ class Factory:
         return NodeLoader(storage)
 
     @classmethod
-    def loaders(cls, uri: 'Uri') -> 'Tuple[KlassLoader, NodeLoader]':
+    def loaders(cls, uri: 'Uri', cache: 'Optional[StorageCache]' = None) -> 'Tuple[KlassLoader, NodeLoader]':
         ''' Make the class and node loader objects
 
             uri: location of classes and nodes data in several formats (see examples)
+            cache: storage objects shared between the loaders, pass the same cache to
+                   reuse the storages (and git repositories) of earlier loaders
             returns: tuple of a KlassLoader and a NodeLoader object
 
             ** Examples **
@@ -97,7 +104,8 @@ class Factory:
             NodeLoader(yaml_fs:/path/to/nodes)
         '''
 
-        cache: 'StorageCache' = {}
+        if cache is None:
+            cache = {}
         klass_loader = cls.klass_loader(uri.classes_uri, cache)
         node_loader = cls.node_loader(uri.nodes_uri, cache)
         return klass_loader, node_loader
@@ -1,6 +1,9 @@
 import collections
 import contextlib
+import hashlib
 import os
+import time
+from ..context import CONTEXT
 from ..utils.url import FileUrl
 from .exceptions import ClassNotFound, DuplicateClass, DuplicateNode, FileParsingError, InvalidUriOption, NodeNotFound, RequiredUriOptionMissing
 
@@ -52,6 +55,7 @@ class FileSystem:
 
     def __init__(self, path: 'str'):
         self.basedir = os.path.abspath(path)
+        self.last_fingerprint: 'Optional[Tuple[float, str]]' = None
 
     def __contains__(self, path: 'str') -> 'bool':
         fullpath = os.path.join(self.basedir, path)
@@ -68,6 +72,34 @@ class FileSystem:
         with open(fullpath) as file:
             return file.read()
 
+    def fingerprint(self) -> 'str':
+        ''' Return a digest of the names, sizes and modification times of all the
+            files and directories under the base directory
+
+            The directory tree is walked at most once every fingerprint_interval
+            seconds (see settings), in between the last digest is returned. An
+            interval of 0 walks the tree on every call.
+        '''
+        interval = CONTEXT.settings.fingerprint_interval
+        now = time.monotonic()
+        if interval and self.last_fingerprint is not None and now - self.last_fingerprint[0] < interval:
+            return self.last_fingerprint[1]
+        digest = hashlib.sha1()
+        for (dirpath, dirnames, filenames) in os.walk(self.basedir):
+            for name in [ dirpath ] + [ os.path.join(dirpath, file) for file in filenames ]:
+                try:
+                    stat = os.stat(name)
+                except FileNotFoundError:
+                    continue
+                digest.update('{0}\0{1}\0{2}\n'.format(name, stat.st_mtime_ns, stat.st_size).encode('utf-8'))
+        self.last_fingerprint = (now, digest.hexdigest())
+        return self.last_fingerprint[1]
+
+    def digest(self, path: 'str') -> 'str':
+        fullpath = os.path.join(self.basedir, path)
+        with open(fullpath, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
     @contextlib.contextmanager
     def open(self, path: 'str') -> 'Generator[TextIO, None, None]':
         fullpath = os.path.join(self.basedir, path)
@@ -133,6 +165,18 @@ class FileSystemClasses:
             exception.url = self._path_url(name, path)
             raise
 
+    def fingerprint(self) -> 'str':
+        return self.file_system.fingerprint()
+
+    def content_id(self, name: 'str', environment: 'str') -> 'str':
+        ''' Return an id for the current contents of the class file
+        '''
+        path = self.name_to_path(name)
+        try:
+            return '{0}:{1}'.format(path, self.file_system.digest(path))
+        except FileNotFoundError:
+            raise ClassNotFound(name, [ self._path_url(name, path) ])
+
 
 class FileSystemNodes:
     '''
@@ -154,10 +198,14 @@ class FileSystemNodes:
         self.resource = nodes_uri['resource']
         self.path = nodes_uri['path']
         self.node_map = self._make_node_map()
+        self.environments: 'Dict[str, Optional[str]]' = {}
 
     def __str__(self) -> 'str':
         return '{0}:{1}'.format(self.resource, self.file_system)
 
+    def fingerprint(self) -> 'str':
+        return self.file_system.fingerprint()
+
     def _make_node_map(self) -> 'Dict[str, List[str]]':
         node_map = collections.defaultdict(list)
         for (dirpath, dirnames, filenames) in os.walk(self.path):
@@ -171,6 +219,23 @@ class FileSystemNodes:
     def _path_url(self, name: 'str', path: 'str') -> 'FileUrl':
         return FileUrl(name, self.resource, os.path.join(self.path, path))
 
+    def _node_path(self, name: 'str') -> 'str':
+        if name not in self.node_map:
+            raise NodeNotFound(name, str(self))
+        elif len(self.node_map[name]) != 1:
+            duplicates = [ self._path_url(name, duplicate) for duplicate in self.node_map[name] ]
+            raise DuplicateNode(name, str(self), duplicates)
+        return self.node_map[name][0]
+
+    def content_id(self, name: 'str') -> 'str':
+        ''' Return an id for the current contents of the node file
+        '''
+        path = self._node_path(name)
+        try:
+            return '{0}:{1}'.format(path, self.file_system.digest(path))
+        except FileNotFoundError:
+            raise NodeNotFound(name, str(self))
+
     def get(self, name: 'str') -> 'Tuple[Dict, FileUrl]':
         if name not in self.node_map:
             raise NodeNotFound(name, str(self))
@@ -189,3 +254,17 @@ class FileSystemNodes:
         except FileParsingError as exception:
             exception.url = self._path_url(name, path)
             raise
+
+    def environment(self, name: 'str') -> 'Optional[str]':
+        ''' Return the environment of a node without loading all of the node file
+        '''
+        if name not in self.environments:
+            path = self._node_path(name)
+            try:
+                self.environments[name] = self.format.environment(self.file_system.get(path))
+            except FileNotFoundError:
+                raise NodeNotFound(name, str(self))
+            except FileParsingError as exception:
+                exception.url = self._path_url(name, path)
+                raise
+        return self.environments[name]
@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Dict, List, TextIO, Union
+    from typing import Dict, List, Optional, TextIO, Union
 
 
 class Format(ABC):
@@ -42,7 +42,16 @@ class Format(ABC):
 
     @classmethod
     @abstractmethod
-    def process(cls, string: 'str') -> 'Dict':
-        ''' process input string and return dictionary of data
+    def process(cls, string: 'Union[str, bytes]') -> 'Dict':
+        ''' process input string or bytes and return dictionary of data
         '''
         pass
+
+    @classmethod
+    def environment(cls, string: 'Union[str, bytes]') -> 'Optional[str]':
+        ''' Return the environment set in the node data in the input string
+
+            Formats may override this with a scan cheaper than processing the
+            whole string
+        '''
+        return cls.process(string).get('environment', None)
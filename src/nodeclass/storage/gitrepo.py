@@ -1,11 +1,15 @@
 import collections
+import json
+import logging
 import os
+import tempfile
+import time
 from packaging.version import Version
 from typing import NamedTuple
 from ..utils.holdlock import HoldLock
 from ..utils.misc import ensure_directory_present
 from ..utils.url import GitUrl
-from .exceptions import BadNodeBranch, ClassNotFound, DuplicateClass, DuplicateNode, FileParsingError, InvalidUriOption, NodeNotFound, NoMatchingBranch, PygitConfigError, RequiredUriOptionMissing
+from .exceptions import BadNodeBranch, ClassNotFound, DuplicateClass, DuplicateNode, FileParsingError, InvalidUriOption, InvalidUriOptionValue, NodeNotFound, NoMatchingBranch, PygitConfigError, RequiredUriOptionMissing
 
 try:
     # NOTE: in some distros pygit2 could require special effort to acquire.
@@ -23,6 +27,9 @@ if TYPE_CHECKING:
     from .format import Format
 
 
+log = logging.getLogger(__name__)
+
+
 class GitFileMetaData(NamedTuple):
     name: 'str'
     path: 'str'
@@ -40,7 +47,13 @@ class GitRepo:
 
     ignored_options = [ 'resource', 'branch', 'path' ]
     required_options = [ 'repo' ]
-    valid_options = [ 'cache_dir', 'lock_dir', 'pubkey', 'privkey', 'password' ] + required_options
+    valid_options = [ 'cache_dir', 'lock_dir', 'pubkey', 'privkey', 'password', 'fetch', 'fetch_interval', 'single_branch' ] + required_options
+    fetch_policies = [ 'always', 'interval', 'never' ]
+
+    # file in the cache directory recording the time of the last fetch
+    fetch_times_file = 'nodeclass_fetch_times.json'
+    # directory in the cache directory of the persisted file lists of trees
+    tree_index_dir = 'nodeclass_trees'
 
     @classmethod
     def validate_uri(cls, uri: 'ConfigDict') -> 'ConfigDict':
@@ -53,6 +66,15 @@ class GitRepo:
         for required in cls.required_options:
             if required not in options:
                 raise RequiredUriOptionMissing(uri, required)
+        if options.get('fetch', 'always') not in cls.fetch_policies:
+            raise InvalidUriOptionValue(uri, 'fetch', options['fetch'], ', '.join(cls.fetch_policies))
+        if 'fetch_interval' in options:
+            try:
+                options['fetch_interval'] = int(options['fetch_interval'])
+            except (TypeError, ValueError):
+                raise InvalidUriOptionValue(uri, 'fetch_interval', options['fetch_interval'], 'a number of seconds')
+        if options.get('single_branch', False) not in [ True, False ]:
+            raise InvalidUriOptionValue(uri, 'single_branch', options['single_branch'], 'true, false')
         return options
 
     @classmethod
@@ -63,14 +85,26 @@ class GitRepo:
     @classmethod
     def from_uri(cls, uri: 'ConfigDict', cache: 'Optional[StorageCache]') -> 'GitRepo':
         uri_valid = cls.validate_uri(uri)
+        name = 'git_repo {0}'.format(uri['repo'])
+        if uri_valid.get('single_branch', False):
+            # branch per environment classes need all the branches
+            branch = uri.get('branch', None) or 'master'
+            if branch != '__env__':
+                uri_valid['branch'] = branch
+                name = '{0} {1}'.format(name, branch)
         if cache is None:
             return cls(**uri_valid)
-        name = 'git_repo {0}'.format(uri['repo'])
         if name not in cache:
             cache[name] = cls(**uri_valid)
         return cache[name]
 
-    def __init__(self, repo: 'str', cache_dir: 'Optional[str]' = None, lock_dir: 'Optional[str]' = None, pubkey: 'Optional[str]' = None, privkey: 'Optional[str]' = None, password: 'Optional[str]' = None):
+    def __init__(self, repo: 'str', cache_dir: 'Optional[str]' = None, lock_dir: 'Optional[str]' = None, pubkey: 'Optional[str]' = None, privkey: 'Optional[str]' = None, password: 'Optional[str]' = None,
+                 fetch: 'str' = 'always', fetch_interval: 'int' = 60, single_branch: 'bool' = False, branch: 'Optional[str]' = None):
+        '''
+        fetch: when to fetch from the remote, always, never (except to populate a new cache)
+               or if no fetch has been made in the last fetch_interval seconds
+        branch: if set only fetch this branch
+        '''
         self._check_pygit2()
         self.transport, self.remote = repo.split('://', 1)
         self.id = self.remote.replace('/', '_')
@@ -82,11 +116,23 @@ class GitRepo:
             self.lock_file = '{0}/{1}'.format(lock_dir, self.id)
         else:
             self.lock_file = '{0}/{1}/{2}'.format(os.path.expanduser("~"), '.nodeclass/cache/lock', self.id)
+        self.fetch = fetch
+        self.fetch_interval = fetch_interval
+        self.branch = branch
+        self.file_lookups: 'Dict[Tuple[str, str], Optional[GitFileMetaData]]' = {}
+        self.tree_files: 'Dict[str, List[GitFileMetaData]]' = {}
         ensure_directory_present(os.path.dirname(self.lock_file))
         self.remotecallbacks = self._setup_remotecallbacks(pubkey, privkey, password)
-        with HoldLock(self.lock_file):
-            self._initialise()
-            self._fetch()
+        if os.path.exists(self.cache_dir) and not self._fetch_required():
+            # recent enough, use the cache without taking the lock
+            self.repo = pygit2.Repository(self.cache_dir)
+        else:
+            with HoldLock(self.lock_file):
+                new = not os.path.exists(self.cache_dir)
+                self._initialise()
+                # recheck, another process may have fetched while waiting for the lock
+                if new or self._fetch_required():
+                    self._fetch()
         self.branches = self.repo.listall_branches()
 
     def _check_pygit2(self):
@@ -119,19 +165,57 @@ class GitRepo:
             return remotecallbacks
         return None
 
+    def _fetch_scope(self) -> 'str':
+        return '*' if self.branch is None else self.branch
+
+    def _read_fetch_times(self) -> 'Dict[str, float]':
+        try:
+            with open(os.path.join(self.cache_dir, self.fetch_times_file)) as file:
+                fetch_times = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return fetch_times if isinstance(fetch_times, dict) else {}
+
+    def _record_fetch_time(self, fetch_time: 'float'):
+        fetch_times = self._read_fetch_times()
+        fetch_times[self._fetch_scope()] = fetch_time
+        fd, tmpname = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(fetch_times, file)
+            os.replace(tmpname, os.path.join(self.cache_dir, self.fetch_times_file))
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+    def _fetch_required(self, throttle: 'bool' = False) -> 'bool':
+        # with throttle set the always policy fetches at most once per fetch_interval
+        if self.fetch == 'always' and not throttle:
+            return True
+        elif self.fetch == 'never':
+            return False
+        fetch_times = self._read_fetch_times()
+        # a fetch of all branches also covers a single branch
+        last = max(fetch_times.get('*', 0), fetch_times.get(self._fetch_scope(), 0))
+        return time.time() - last >= self.fetch_interval
+
     def _fetch(self):
         origin = self.repo.remotes['origin']
         fetch_kwargs = {}
         if self.remotecallbacks is not None:
             fetch_kwargs['callbacks'] = self.remotecallbacks
+        if self.branch is not None:
+            fetch_kwargs['refspecs'] = [ '+refs/heads/{0}:refs/remotes/{1}/{0}'.format(self.branch, origin.name) ]
+        fetch_time = time.time()
         origin.fetch(**fetch_kwargs)
+        self._record_fetch_time(fetch_time)
         remote_branches = self.repo.listall_branches(pygit2.GIT_BRANCH_REMOTE)
         local_branches = self.repo.listall_branches()
         for remote_branch_name in remote_branches:
             _, _, local_branch_name = remote_branch_name.partition('/')
             remote_branch = self.repo.lookup_branch(remote_branch_name, pygit2.GIT_BRANCH_REMOTE)
             if local_branch_name not in local_branches:
-                local_branch = self.repo.create_branch(local_branch_name, self.repo[remote_branch.target.hex])
+                local_branch = self.repo.create_branch(local_branch_name, self.repo[str(remote_branch.target)])
                 local_branch.upstream = remote_branch
             else:
                 local_branch = self.repo.lookup_branch(local_branch_name)
@@ -145,31 +229,128 @@ class GitRepo:
                 local_branch = self.repo.lookup_branch(local_branch_name)
                 local_branch.delete()
 
+    def fingerprint(self) -> 'str':
+        ''' Fetch from the remote, if no fetch has been made in the last fetch_interval
+            seconds and the fetch policy is not never, and return the heads of all
+            the branches
+        '''
+        if self._fetch_required(throttle=True):
+            with HoldLock(self.lock_file):
+                if self._fetch_required(throttle=True):
+                    self._fetch()
+        self.branches = self.repo.listall_branches()
+        heads = [ '{0}:{1}'.format(branch, self.repo.lookup_branch(branch).target) for branch in sorted(self.branches) ]
+        return ' '.join(heads)
+
     def _files_in_tree(self, tree: 'pygit2.Tree', path: 'str') -> 'Generator[GitFileMetaData, None, None]':
         for entry in tree:
             if entry.filemode == pygit2.GIT_FILEMODE_TREE:
                 subtree = self.repo.get(entry.id)
+                if not isinstance(subtree, pygit2.Tree):
+                    raise KeyError(str(entry.id))
                 if path == '':
-                    subpath = entry.name
+                    subpath = str(entry.name)
                 else:
-                    subpath = '/'.join([path, entry.name])
+                    subpath = '/'.join([path, str(entry.name)])
                 yield from self._files_in_tree(subtree, subpath)
             else:
                 if path == '':
-                   relpath = entry.name
+                   relpath = str(entry.name)
                 else:
-                   relpath = '/'.join([path, entry.name])
-                yield GitFileMetaData(entry.name, relpath, entry.id)
+                   relpath = '/'.join([path, str(entry.name)])
+                yield GitFileMetaData(str(entry.name), relpath, str(entry.id))
 
-    def get(self, id: 'str') -> 'pygit2.Commit':
-        return self.repo.get(id)
+    def _tree_index_file(self, tree_id: 'str') -> 'str':
+        return os.path.join(self.cache_dir, self.tree_index_dir, tree_id[:2], tree_id[2:])
 
-    def files_in_branch(self, branch: 'str') -> 'Generator[GitFileMetaData, None, None]':
+    def _read_tree_index(self, tree_id: 'str') -> 'Optional[List[GitFileMetaData]]':
         try:
-            tree = self.repo.revparse_single(branch).tree
+            with open(self._tree_index_file(tree_id)) as file:
+                return [ GitFileMetaData(*file_meta) for file_meta in json.load(file) ]
+        except FileNotFoundError:
+            return None
+        except Exception as exception:
+            log.warning('ignoring unreadable git tree index {0}: {1}'.format(self._tree_index_file(tree_id), exception))
+            return None
+
+    def _write_tree_index(self, tree_id: 'str', files: 'List[GitFileMetaData]'):
+        filename = self._tree_index_file(tree_id)
+        try:
+            ensure_directory_present(os.path.dirname(filename))
+            fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(filename))
+            try:
+                with os.fdopen(fd, 'w') as file:
+                    json.dump([ list(file_meta) for file_meta in files ], file)
+                os.replace(tmpname, filename)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except Exception as exception:
+            log.warning('failed to write git tree index {0}: {1}'.format(filename, exception))
+
+    def get(self, id: 'str') -> 'Optional[pygit2.Blob]':
+        ''' Return the blob with the id, or None if there is no such blob
+        '''
+        blob = self.repo.get(id)
+        if not isinstance(blob, pygit2.Blob):
+            return None
+        return blob
+
+    def branch_commit(self, branch: 'str') -> 'str':
+        ''' Return the id of the commit at the head of the branch
+        '''
+        try:
+            return str(self.repo.revparse_single(branch).id)
         except KeyError:
             raise NoSuchBranch(branch)
-        return self._files_in_tree(tree, '')
+
+    def file_in_commit(self, commit_id: 'str', path: 'str') -> 'Optional[GitFileMetaData]':
+        ''' Return the file at the path in the commit, or None if there is no such file
+
+            Looks up the path directly in the commit tree, results are memoised per
+            (commit id, path)
+        '''
+        key = (commit_id, path)
+        if key not in self.file_lookups:
+            commit = self.repo.get(commit_id)
+            if not isinstance(commit, pygit2.Commit):
+                raise NoSuchBranch(commit_id)
+            try:
+                entry = commit.tree[path]
+            except KeyError:
+                self.file_lookups[key] = None
+            else:
+                if entry.filemode == pygit2.GIT_FILEMODE_TREE:
+                    self.file_lookups[key] = None
+                else:
+                    self.file_lookups[key] = GitFileMetaData(str(entry.name), path, str(entry.id))
+        return self.file_lookups[key]
+
+    def files_in_branch(self, branch: 'str') -> 'List[GitFileMetaData]':
+        ''' Return all the files in the branch
+
+            The file list of a tree never changes, so it is persisted in the cache
+            directory keyed by the tree id and branches whose tree is unchanged are
+            not walked again
+        '''
+        try:
+            commit = self.repo.revparse_single(branch)
+        except KeyError:
+            raise NoSuchBranch(branch)
+        if not isinstance(commit, pygit2.Commit):
+            raise NoSuchBranch(branch)
+        tree = commit.tree
+        tree_id = str(tree.id)
+        if tree_id not in self.tree_files:
+            files = self._read_tree_index(tree_id)
+            if files is None:
+                try:
+                    files = list(self._files_in_tree(tree, ''))
+                except KeyError:
+                    raise NoSuchBranch(branch)
+                self._write_tree_index(tree_id, files)
+            self.tree_files[tree_id] = files
+        return self.tree_files[tree_id]
 
 
 class GitRepoClasses:
@@ -199,50 +380,58 @@ class GitRepoClasses:
         self.branch = classes_uri.get('branch', None) or 'master'
         self.path = classes_uri.get('path', None)
         self.format = format
-        self.index_map: Dict[str, Dict[str, GitFileMetaData]] = {}
+        self.commits: 'Dict[str, str]' = {}
         if self.branch != '__env__':
-            self.index_map[self.branch] = self._make_index(self.branch)
+            self._commit(self.branch)
 
     def __str__(self) -> 'str':
         return '{0}:{1}'.format(self.resource, self.repo)
 
-    def _make_index(self, branch: 'str') -> 'Dict[str, GitFileMetaData]':
-        index: 'Dict[str, GitFileMetaData]' = {}
-        try:
-            files = self.git_repo.files_in_branch(branch)
-        except NoSuchBranch:
-            raise NoMatchingBranch(branch, self.repo)
-        for file in files:
-            name = self.format.mangle_name(file.name)
-            if name:
-                index[file.path] = file
-        return index
+    def fingerprint(self) -> 'str':
+        return self.git_repo.fingerprint()
 
-    def _name_to_meta(self, name: 'str', index: 'Dict[str, GitFileMetaData]') -> 'GitFileMetaData':
+    def _commit(self, branch: 'str') -> 'str':
+        # the head of each branch is fixed when first used, so all the classes
+        # of a branch are read from the same commit
+        if branch not in self.commits:
+            try:
+                self.commits[branch] = self.git_repo.branch_commit(branch)
+            except NoSuchBranch:
+                raise NoMatchingBranch(branch, self.repo)
+        return self.commits[branch]
+
+    def _name_to_meta(self, name: 'str', commit_id: 'str') -> 'GitFileMetaData':
         base = name.replace('.', '/')
         if self.path:
             base = os.path.join(self.path, base)
         paths = self.format.possible_class_paths(base)
-        present = [ path for path in paths if path in index ]
+        present = []
+        for path in paths:
+            meta = self.git_repo.file_in_commit(commit_id, path)
+            if meta is not None and self.format.mangle_name(meta.name):
+                present.append(meta)
         if len(present) == 1:
-            return index[present[0]]
+            return present[0]
         elif len(present) > 1:
-            duplicates = [ self._path_url(name, duplicate) for duplicate in present ]
+            duplicates = [ self._path_url(name, duplicate.path) for duplicate in present ]
             raise DuplicateClass(name, duplicates)
         raise ClassNotFound(name, [ self._path_url(name, path) for path in paths ])
 
     def _path_url(self, name: 'str', path: 'str') -> 'GitUrl':
         return GitUrl(name, self.resource, self.repo, self.branch, path)
 
-    def get(self, name: 'str', environment: 'str') -> 'Tuple[Dict, GitUrl]':
+    def _meta(self, name: 'str', environment: 'str') -> 'GitFileMetaData':
         if self.branch == '__env__':
-            if environment not in self.index_map:
-                self.index_map[environment] = self._make_index(environment)
-            index = self.index_map[environment]
+            commit_id = self._commit(environment)
         else:
-            index = self.index_map[self.branch]
-        meta = self._name_to_meta(name, index)
+            commit_id = self._commit(self.branch)
+        return self._name_to_meta(name, commit_id)
+
+    def get(self, name: 'str', environment: 'str') -> 'Tuple[Dict, GitUrl]':
+        meta = self._meta(name, environment)
         blob = self.git_repo.get(meta.id)
+        if blob is None:
+            raise ClassNotFound(name, [ self._path_url(name, meta.path) ])
         try:
            blob_data = self.format.process(blob.data)
            path_url = self._path_url(name, meta.path)
@@ -250,6 +439,12 @@ class GitRepoClasses:
             exception.url = self._path_url(name, meta.path)
         return blob_data, path_url
 
+    def content_id(self, name: 'str', environment: 'str') -> 'str':
+        ''' Return an id for the current contents of the class file, the git blob id
+        '''
+        meta = self._meta(name, environment)
+        return '{0}:{1}'.format(meta.path, meta.id)
+
 
 class GitRepoNodes:
     '''
@@ -273,10 +468,14 @@ class GitRepoNodes:
         self.path = nodes_uri.get('path', None)
         self.format = format
         self.node_map = self._make_node_map()
+        self.environments: 'Dict[str, Optional[str]]' = {}
 
     def __str__(self) -> 'str':
         return '{0}:{1}'.format(self.resource, self.repo)
 
+    def fingerprint(self) -> 'str':
+        return self.git_repo.fingerprint()
+
     def _make_node_map(self) -> 'Dict[str, List[GitFileMetaData]]':
         node_map = collections.defaultdict(list)
         try:
@@ -293,6 +492,20 @@ class GitRepoNodes:
     def _path_url(self, name: 'str', path: 'str') -> 'GitUrl':
         return GitUrl(name, self.resource, self.repo, self.branch, path)
 
+    def _node_meta(self, name: 'str') -> 'GitFileMetaData':
+        if name not in self.node_map:
+            raise NodeNotFound(name, '{0} branch {1}'.format(self.repo, self.branch))
+        elif len(self.node_map[name]) != 1:
+            duplicates = [ self._path_url(name, duplicate.path) for duplicate in self.node_map[name] ]
+            raise DuplicateNode(name, str(self), duplicates)
+        return self.node_map[name][0]
+
+    def content_id(self, name: 'str') -> 'str':
+        ''' Return an id for the current contents of the node file, the git blob id
+        '''
+        meta = self._node_meta(name)
+        return '{0}:{1}'.format(meta.path, meta.id)
+
     def get(self, name: 'str') -> 'Tuple[Dict, GitUrl]':
         if name not in self.node_map:
             raise NodeNotFound(name, '{0} branch {1}'.format(self.repo, self.branch))
@@ -301,9 +514,26 @@ class GitRepoNodes:
             raise DuplicateNode(name, str(self), duplicates)
         meta = self.node_map[name][0]
         blob = self.git_repo.get(meta.id)
+        if blob is None:
+            raise NodeNotFound(name, '{0} branch {1}'.format(self.repo, self.branch))
         try:
             blob_data = self.format.process(blob.data)
             path_url = self._path_url(name, meta.path)
         except FileParsingError as exception:
             exception.url = self._path_url(name, meta.path)
         return blob_data, path_url
+
+    def environment(self, name: 'str') -> 'Optional[str]':
+        ''' Return the environment of a node without loading all of the node file
+        '''
+        if name not in self.environments:
+            meta = self._node_meta(name)
+            try:
+                blob = self.git_repo.get(meta.id)
+                if blob is None:
+                    raise NodeNotFound(name, '{0} branch {1}'.format(self.repo, self.branch))
+                self.environments[name] = self.format.environment(blob.data)
+            except FileParsingError as exception:
+                exception.url = self._path_url(name, meta.path)
+                raise
+        return self.environments[name]
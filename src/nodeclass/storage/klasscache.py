@@ -0,0 +1,65 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from ..__version__ import __version__
+from ..node.klass import Klass
+from ..utils.misc import ensure_directory_present
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Optional
+    from ..settings import Settings
+
+log = logging.getLogger(__name__)
+
+
+class KlassCache:
+    ''' On disk cache of parsed classes
+
+        Parsed Klass objects are stored pickled, keyed by the storage, the class name
+        and the content id supplied by the storage (a hash of the file contents or
+        the git blob id). The nodeclass version and the settings which affect parsing
+        are also part of the key, so a change to either gives a new set of entries.
+    '''
+
+    def __init__(self, directory: 'str', settings: 'Settings'):
+        self.directory = os.path.abspath(directory)
+        self.fingerprint = '{0}\n{1}'.format(__version__, settings)
+
+    def _filename(self, storage: 'str', name: 'str', content_id: 'str') -> 'str':
+        key = '\n'.join([ self.fingerprint, storage, name, content_id ])
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def get(self, storage: 'str', name: 'str', content_id: 'str') -> 'Optional[Klass]':
+        filename = self._filename(storage, name, content_id)
+        try:
+            with open(filename, 'rb') as file:
+                klass = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as exception:
+            log.warning('ignoring unreadable class cache entry {0}: {1}'.format(filename, exception))
+            return None
+        if not isinstance(klass, Klass):
+            return None
+        return klass
+
+    def put(self, storage: 'str', name: 'str', content_id: 'str', klass: 'Klass'):
+        filename = self._filename(storage, name, content_id)
+        try:
+            ensure_directory_present(os.path.dirname(filename))
+            # write to a temporary file and rename so other processes never see a
+            # partially written entry
+            fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(filename))
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump(klass, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpname, filename)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except Exception as exception:
+            log.warning('failed to write class cache entry {0}: {1}'.format(filename, exception))
@@ -1,28 +1,33 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from ..context import CONTEXT, nodeclass_context_state, nodeclass_restored_context
 from ..exceptions import InputError
-from ..node.klass import Klass
+from ..node.klass import Klass, KlassID
 from ..node.protonode import ProtoNode
+from ..utils.lrucache import LRUCache
 from .exceptions import FileError, FileUnhandledError, InvalidNodeName
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from ..node.klass import KlassID
+    from typing import Iterable, Optional
+    from .klasscache import KlassCache
 
 class KlassLoader:
-    def __init__(self, storages):
+    def __init__(self, storages, klass_cache: 'Optional[KlassCache]' = None):
         self.storages = storages
-        self.cache = {}
+        self.klass_cache = klass_cache
+        self.cache = LRUCache(CONTEXT.settings.class_cache_size)
 
     def __getitem__(self, klass_id: 'KlassID') -> 'Klass':
         ''' Load/Get a class
 
             klass_id: KlassID namedtuple
         '''
-        name, environment = klass_id
-        if klass_id not in self.cache:
+        klass = self.cache.get(klass_id, None)
+        if klass is None:
+            name, environment = klass_id
             storage = self._match_storage(environment)
             try:
-                class_dict, url = storage.get(name, environment)
-                self.cache[klass_id] = Klass.from_class_dict(name, class_dict, url)
+                klass = self._load(name, environment, storage)
             except FileError as exception:
                 exception.environment = environment
                 exception.storage = str(storage)
@@ -31,7 +36,79 @@ class KlassLoader:
                 raise
             except Exception as exception:
                 raise FileUnhandledError(exception, environment=environment, storage=storage)
-        return self.cache[klass_id]
+            self.cache[klass_id] = klass
+        return klass
+
+    def prefetch(self, klass_ids: 'Iterable[KlassID]', threads: 'int' = 4):
+        ''' Load the classes, and all the classes they include, in a pool of threads
+
+            Warms the cache before nodes are built. Classes which fail to load are
+            left out of the cache, so the error is raised as usual when the class
+            is asked for.
+        '''
+        state = nodeclass_context_state()
+
+        def load(klass_id: 'KlassID') -> 'Klass':
+            name, environment = klass_id
+            # each thread has its own context, install a copy of the calling thread's
+            with nodeclass_restored_context(state):
+                return self._load(name, environment, self._match_storage(environment))
+
+        seen = set()
+        pending = {}
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            def submit(klass_ids: 'Iterable[KlassID]'):
+                stack = list(klass_ids)
+                while stack:
+                    klass_id = stack.pop()
+                    if klass_id in seen:
+                        continue
+                    seen.add(klass_id)
+                    cached = self.cache.get(klass_id, None)
+                    if cached is not None:
+                        stack.extend(KlassID(name, klass_id.environment) for name in cached.classes)
+                    else:
+                        pending[executor.submit(load, klass_id)] = klass_id
+
+            submit(KlassID(*klass_id) for klass_id in klass_ids)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    klass_id = pending.pop(future)
+                    try:
+                        klass = future.result()
+                    except Exception:
+                        continue
+                    self.cache[klass_id] = klass
+                    submit(KlassID(name, klass_id.environment) for name in klass.classes)
+
+    def clear(self):
+        ''' Empty the cache of loaded classes
+        '''
+        self.cache.clear()
+
+    def content_id(self, klass_id: 'KlassID') -> 'str':
+        ''' Return an id for the current contents of a class
+        '''
+        name, environment = klass_id
+        return self._match_storage(environment).content_id(name, environment)
+
+    def fingerprint(self) -> 'str':
+        ''' Return a string which changes when the contents of any of the storages changes
+        '''
+        return '\n'.join([ storage.fingerprint() for _, storage in self.storages ])
+
+    def _load(self, name: 'str', environment: 'str', storage) -> 'Klass':
+        if self.klass_cache is None:
+            class_dict, url = storage.get(name, environment)
+            return Klass.from_class_dict(name, class_dict, url)
+        content_id = storage.content_id(name, environment)
+        klass = self.klass_cache.get(str(storage), name, content_id)
+        if klass is None:
+            class_dict, url = storage.get(name, environment)
+            klass = Klass.from_class_dict(name, class_dict, url)
+            self.klass_cache.put(str(storage), name, content_id, klass)
+        return klass
 
     def __repr__(self) -> 'str':
         return '{0}({1})'.format(self.__class__.__name__, self.storages)
@@ -51,10 +128,11 @@ class KlassLoader:
 class NodeLoader:
     def __init__(self, storage):
         self.storage = storage
-        self.cache = {}
+        self.cache = LRUCache(CONTEXT.settings.node_cache_size)
 
     def __getitem__(self, name: 'str') -> 'ProtoNode':
-        if name not in self.cache:
+        proto = self.cache.get(name, None)
+        if proto is None:
             try:
                 # node names can not begin with a '.'
                 if name[0] == '.':
@@ -64,8 +142,9 @@ class NodeLoader:
             class_dict, url = self.storage.get(name)
             environment = class_dict.get('environment', None)
             klass = Klass.from_class_dict(name, class_dict, url)
-            self.cache[name] = ProtoNode(name, environment, klass, url)
-        return self.cache[name]
+            proto = ProtoNode(name, environment, klass, url)
+            self.cache[name] = proto
+        return proto
 
     def __repr__(self) -> 'str':
         return '{0}({1})'.format(self.__class__.__name__, self.storage)
@@ -73,6 +152,29 @@ class NodeLoader:
     def __str__(self) -> 'str':
         return '{0}'.format(self.storage)
 
+    def clear(self):
+        ''' Empty the cache of loaded nodes
+        '''
+        self.cache.clear()
+
+    def content_id(self, name: 'str') -> 'str':
+        ''' Return an id for the current contents of a node
+        '''
+        return self.storage.content_id(name)
+
+    def fingerprint(self) -> 'str':
+        ''' Return a string which changes when the contents of the storage changes
+        '''
+        return self.storage.fingerprint()
+
+    def environment(self, name: 'str') -> 'Optional[str]':
+        ''' Return the environment set in a node file, used for inventory queries,
+            without parsing the node if it is not already loaded
+        '''
+        if name in self.cache:
+            return self.cache[name].inv_query_env
+        return self.storage.environment(name)
+
     def nodes(self):
         for nodename in self.storage.node_map:
             yield self[nodename]
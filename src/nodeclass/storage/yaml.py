@@ -1,11 +1,12 @@
 import os
+import re
 import yaml
 from .exceptions import YamlParsingError
 from .format import Format
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Dict, List, TextIO, Union
+    from typing import Dict, List, Optional, TextIO, Union
 
 class Yaml(Format):
 
@@ -14,6 +15,13 @@ class Yaml(Format):
 
     name = 'yaml'
 
+    # a top level mapping key in block style and a plain scalar value which is
+    # loaded as a string
+    top_level_key = re.compile(r'([A-Za-z_][A-Za-z0-9_.\-]*)[ \t]*:(?:[ \t]|$)')
+    environment_value = re.compile(r'environment[ \t]*:[ \t]*([A-Za-z_][A-Za-z0-9_.\-]*)[ \t]*(?:#.*)?$')
+    sequence_entry = re.compile(r'-(?:[ \t]|$)')
+    not_strings = { 'y', 'n', 'yes', 'no', 'true', 'false', 'on', 'off', 'null' }
+
     @classmethod
     def mangle_name(cls, file_name: 'str') -> 'Union[str, None]':
         ''' Return class/node name from file name
@@ -48,7 +56,7 @@ class Yaml(Format):
         return data
 
     @classmethod
-    def process(cls, string: 'str') -> 'Dict':
+    def process(cls, string: 'Union[str, bytes]') -> 'Dict':
         try:
             data = yaml.load(string, Loader=cls.SafeLoader)
         except Exception as exception:
@@ -56,3 +64,44 @@ class Yaml(Format):
         if data == None:
             return {}
         return data
+
+    @classmethod
+    def environment(cls, string: 'Union[str, bytes]') -> 'Optional[str]':
+        ''' Return the environment set in the yaml node data
+
+            Only the top level keys are scanned for the environment. If the data uses
+            anything beyond block style mappings with simple keys at the top level,
+            or the environment value is not a plain string, the whole string is
+            loaded instead.
+        '''
+        if isinstance(string, bytes):
+            try:
+                text = string.decode('utf-8')
+            except UnicodeDecodeError:
+                return super().environment(string)
+        else:
+            text = string
+        environment = None
+        found = False
+        keys = False
+        for line in text.splitlines():
+            if line == '' or line[0] in ' \t#':
+                continue
+            if keys and cls.sequence_entry.match(line):
+                # an entry of a block sequence value of the previous key
+                continue
+            keys = True
+            key = cls.top_level_key.match(line)
+            if key is None:
+                return super().environment(string)
+            if line.startswith('environment'):
+                match = cls.environment_value.match(line)
+                if match is None:
+                    if key.group(1) == 'environment':
+                        return super().environment(string)
+                    continue
+                if found or match.group(1).lower() in cls.not_strings:
+                    return super().environment(string)
+                environment = match.group(1)
+                found = True
+        return environment
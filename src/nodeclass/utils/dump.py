@@ -0,0 +1,34 @@
+import json
+import yaml
+from ..exceptions import OutputFormatUnavailable
+
+try:
+    # msgpack is an optional dependency, only required for msgpack output
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any
+
+
+FORMATS = ('yaml', 'json', 'msgpack')
+
+EXTENSIONS = { 'yaml': 'yml', 'json': 'json', 'msgpack': 'msgpack' }
+
+YamlDumper = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
+
+
+def dump(data: 'Any', format: 'str' = 'yaml') -> 'bytes':
+    ''' Return the data encoded in the given output format
+    '''
+    if format == 'yaml':
+        return yaml.dump(data, default_flow_style=False, Dumper=YamlDumper, encoding='utf-8')
+    elif format == 'json':
+        return json.dumps(data).encode('utf-8') + b'\n'
+    elif format == 'msgpack':
+        if msgpack is None:
+            raise OutputFormatUnavailable(format, 'msgpack')
+        return msgpack.packb(data, use_bin_type=True)
+    raise ValueError('unknown output format: {0}'.format(format))
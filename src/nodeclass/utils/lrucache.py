@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional
+
+
+_missing = object()
+
+
+class LRUCache(OrderedDict):
+    ''' A dictionary holding at most maxsize entries, discarding the least recently
+        used entry when full. With a maxsize of None the cache is unbounded.
+
+        Look ups with get or [] count as hits or misses, and discarded entries
+        as evictions. Testing membership with in does not count as a look up.
+
+        Look ups and insertions hold a lock, so a cache shared between threads
+        never has an entry evicted between finding it and marking it as used.
+    '''
+
+    def __init__(self, maxsize: 'Optional[int]' = None):
+        super().__init__()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __getitem__(self, key: 'Any') -> 'Any':
+        with self.lock:
+            try:
+                value = super().__getitem__(key)
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+            if self.maxsize is not None:
+                self.move_to_end(key)
+            return value
+
+    def get(self, key: 'Any', default: 'Any' = None) -> 'Any':
+        with self.lock:
+            value = super().get(key, _missing)
+            if value is _missing:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.maxsize is not None:
+                self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: 'Any', value: 'Any'):
+        with self.lock:
+            super().__setitem__(key, value)
+            if self.maxsize is not None:
+                self.move_to_end(key)
+                while len(self) > self.maxsize:
+                    self.popitem(last=False)
+                    self.evictions += 1
+
+    def __reduce__(self):
+        return (self.__class__, (self.maxsize,), None, None, iter(self.items()))
+
+    def stats(self) -> 'Dict[str, Any]':
+        ''' Return the size, limit and hit, miss and eviction counts of the cache
+        '''
+        return { 'size': len(self), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -5,7 +5,7 @@
 #
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Any, List
+    from typing import Any, Iterable, Optional, Tuple
 
 import re
 from ..context import CONTEXT
@@ -26,30 +26,60 @@ class Path:
     >>> path = Path.fromlist(['foo', 'bar'])
     >>> str(path)
     'foo:bar'
+
+    Paths are immutable and interned: creating a path equal to one already made
+    in the current context returns the existing path. The keys are held as a
+    tuple, and the hash and string are only worked out once.
     '''
 
-    __slots__ = ('keys', 'last')
+    __slots__ = ('keys', 'last', '_hash', '_str')
+
+    keys: 'Tuple[str, ...]'
+    last: 'int'
+    _hash: 'int'
+    _str: 'Optional[str]'
 
     @classmethod
     def empty(cls) -> 'Path':
-        return cls([])
+        return cls(())
 
     @classmethod
-    def fromlist(cls, keys: 'List[Any]') -> 'Path':
-        return cls([ str(k) for k in keys])
+    def fromlist(cls, keys: 'Iterable[Any]') -> 'Path':
+        return cls(tuple([ str(k) for k in keys ]))
 
     @classmethod
     def fromstring(cls, string: 'str') -> 'Path':
-        return cls(re.split(CONTEXT.path_split, string))
-
-    def __init__(self, keys: 'List[str]'):
-        self.keys = keys
-        self.last = len(self.keys) - 1
+        # the intern table also maps path strings to paths, the tuples of keys
+        # used for interning paths can never be equal to a string
+        path = CONTEXT.path_intern.get(string, None)
+        if path is None:
+            path = cls(tuple(re.split(CONTEXT.path_split, string)))
+            CONTEXT.path_intern[string] = path
+        return path
+
+    def __new__(cls, keys: 'Iterable[str]'):
+        keys = tuple(keys)
+        path = CONTEXT.path_intern.get(keys, None)
+        if path is None:
+            path = super().__new__(cls)
+            path.keys = keys
+            path.last = len(keys) - 1
+            path._hash = hash(keys)
+            path._str = None
+            CONTEXT.path_intern[keys] = path
+        return path
+
+    def __reduce__(self):
+        # rebuild from the keys so unpickled paths are interned, and the hash is
+        # recalculated for the unpickling process
+        return (self.__class__, (self.keys,))
 
     def __add__(self, other: 'Path') -> 'Path':
         return type(self)(self.keys + other.keys)
 
     def __eq__(self, other: 'Any') -> 'bool':
+        if self is other:
+            return True
         if self.__class__ == other.__class__:
             return self.keys == other.keys
         return False
@@ -58,10 +88,12 @@ class Path:
         return self.keys[n]
 
     def __hash__(self) -> 'int':
-        return hash(self.__str__())
+        return self._hash
 
     def __str__(self) -> 'str':
-        return CONTEXT.delimiter.join(map(str, self.keys))
+        if self._str is None:
+            self._str = CONTEXT.delimiter.join(map(str, self.keys))
+        return self._str
 
     def __repr__(self) -> 'str':
         return '{0}({1})'.format(self.__class__.__name__, str(self))
@@ -73,4 +105,4 @@ class Path:
         return type(self)(self.keys[:-1])
 
     def subpath(self, key: 'Any') -> 'Path':
-        return type(self)(self.keys + [ str(key) ])
+        return type(self)(self.keys + (str(key),))
@@ -5,6 +5,14 @@ if TYPE_CHECKING:
     from typing import Any
 
 class Url(ABC):
+    ''' The location data was read from
+
+        Urls are immutable, so a single Url is shared by all the values read from
+        the same file.
+    '''
+
+    __slots__ = ('name',)
+
     def __init__(self, name: 'str'):
         self.name = name
 
@@ -18,6 +26,8 @@ class Url(ABC):
 
 
 class EmptyUrl(Url):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__('')
 
@@ -31,6 +41,8 @@ class EmptyUrl(Url):
 
 
 class PseudoUrl(Url):
+    __slots__ = ('location',)
+
     def __init__(self, name: 'str', location: 'str'):
         super().__init__(name)
         self.location = location
@@ -47,6 +59,8 @@ class PseudoUrl(Url):
 
 
 class FileUrl(Url):
+    __slots__ = ('resource', 'path')
+
     def __init__(self, name: 'str', resource: 'str', path: 'str'):
         super().__init__(name)
         self.resource = resource
@@ -64,6 +78,8 @@ class FileUrl(Url):
 
 
 class GitUrl(Url):
+    __slots__ = ('resource', 'repo', 'branch', 'path')
+
     def __init__(self, name: 'str', resource: 'str', repo: 'str', branch: 'str', path: 'str'):
         super().__init__(name)
         self.resource = resource
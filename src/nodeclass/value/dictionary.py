@@ -7,7 +7,7 @@ from .value import Value, ValueType
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Set, Union
+    from typing import Any, Dict, FrozenSet, List, Set, Union
     from ..interpolator.inventory import InventoryDict
     from ..invquery.query import Query
     from ..item.item import Item
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
     from .hierarchy import Hierarchy
 
 
+# Shared by all Dictionary objects without immutable or overwrite keys
+_NO_KEYS: 'FrozenSet[str]' = frozenset()
+
+
 class Dictionary(Value):
     '''
     Wrap a dict object
@@ -26,6 +30,9 @@ class Dictionary(Value):
 
     All keys for items contained in a Dictionary object are converted to strings, as references
     to keys always refer to the string representation of the key.
+
+    The sets of immutable and overwrite keys are frozen, so copies made when merging share
+    them instead of copying them. Most dictionaries have neither, and share one empty set.
     '''
 
     __slots__ = ('_dictionary', '_immutables', '_overwrites')
@@ -33,29 +40,32 @@ class Dictionary(Value):
     type = ValueType.DICTIONARY
 
     def __init__(self, input: 'Dict', url: 'Url', copy_on_change: 'bool' = True, check_for_prefix: 'bool' = True):
+        immutables: 'Set[str]' = set()
+        overwrites: 'Set[str]' = set()
+
         def process_key(key):
             if not check_for_prefix:
                 return key
             if key[0] in CONTEXT.prefixes:
                 if key[0] == CONTEXT.settings.overwrite_prefix:
                     key = key[1:]
-                    self._overwrites.add(key)
+                    overwrites.add(key)
                 elif key[0] == CONTEXT.settings.immutable_prefix:
                     key = key[1:]
-                    self._immutables.add(key)
+                    immutables.add(key)
             return key
 
         super().__init__(url=url, copy_on_change=copy_on_change)
-        self._immutables: 'Set[Path]' = set()
-        self._overwrites: 'Set[Path]' = set()
         self._dictionary = { process_key(str(k)): v for k, v in input.items() }
+        self._immutables: 'FrozenSet[str]' = frozenset(immutables) if immutables else _NO_KEYS
+        self._overwrites: 'FrozenSet[str]' = frozenset(overwrites) if overwrites else _NO_KEYS
 
     def __copy__(self):
         cls = self.__class__
         new = cls.__new__(cls)
         new.url = self.url
-        new._immutables = copy.copy(self._immutables)
-        new._overwrites = copy.copy(self._overwrites)
+        new._immutables = self._immutables
+        new._overwrites = self._overwrites
         new._dictionary = copy.copy(self._dictionary)
         new.copy_on_change = False
         return new
@@ -166,7 +176,8 @@ class Dictionary(Value):
                             raise
                 else:
                     merged._dictionary[k] = v
-                merged._immutables.update(other._immutables)
+            if other._immutables and not other._immutables <= merged._immutables:
+                merged._immutables = merged._immutables | other._immutables
             return merged
         elif other.type == ValueType.PLAIN:
             # if the Plain value is unresolved return a Merged object for later
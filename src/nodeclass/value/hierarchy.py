@@ -18,6 +18,9 @@ if TYPE_CHECKING:
     from ..utils.url import Url
     from .value import Value
 
+EMPTY_URL = PseudoUrl('', '')
+
+
 class Hierarchy:
     ''' The top level interface to nested group of dictionaries
     '''
@@ -36,7 +39,7 @@ class Hierarchy:
                     if isinstance(input, str):
                         item = parse_item(input)
                     else:
-                        item = Scalar(input)
+                        item = Scalar.shared(input)
                     return Plain(item, url)
             except InputError as exception:
                 exception.reverse_path.append(key)
@@ -53,7 +56,7 @@ class Hierarchy:
         # Check for an empty hierarchies list. This occurs during inventory queries
         # that include nodes with no included classes.
         if len(hierarchies) == 0:
-            return Hierarchy.from_dict({}, PseudoUrl('', ''), category)
+            return Hierarchy.from_dict({}, EMPTY_URL, category)
         result = copy.copy(hierarchies[0])
         try:
             for h in hierarchies[1:]:
@@ -1,5 +1,5 @@
 import pytest
-from nodeclass.exceptions import UnknownConfigSetting
+from nodeclass.exceptions import InvalidConfigSettingValue, UnknownConfigSetting
 from nodeclass.settings import Settings
 
 valid = { 'allow_none_overwrite': True,
@@ -26,3 +26,8 @@ def test_settings_invalid():
     with pytest.raises(UnknownConfigSetting) as info:
         Settings(invalid)
     assert(info.value.name == 'unknown')
+
+def test_settings_invalid_value():
+    with pytest.raises(InvalidConfigSettingValue) as info:
+        Settings({ 'item_tokenizer': 'unknown' })
+    assert(info.value.name == 'item_tokenizer')
@@ -0,0 +1,39 @@
+import pytest
+from nodeclass.interpolator.exceptions import CircularReference, MultipleInterpolationErrors
+from nodeclass.interpolator.graph_parameters_resolver import GraphParametersResolver
+from nodeclass.utils.path import Path
+from .test_parameters_resolver import resolve_parameters as resolve
+
+# The tests in test_parameters_resolver.py are run with both resolvers, these
+# tests are only for the graph resolver
+
+def resolve_parameters(*dicts):
+    return resolve(*dicts, resolver=GraphParametersResolver())
+
+def test_graph_parameters_resolver_long_chain():
+    # a chain of references too long for the recursive resolver
+    parameters = { 'p{0}'.format(i): '${{p{0}}}'.format(i + 1) for i in range(5000) }
+    parameters['p5000'] = 42
+    result = resolve_parameters(parameters)
+    assert result['p0'] == 42
+    assert result['p4999'] == 42
+
+def test_graph_parameters_resolver_all_circular_references():
+    with pytest.raises(MultipleInterpolationErrors) as info:
+        resolve_parameters({'a': '${b}', 'b': '${c}', 'c': '${a}', 'd': 1, 'e': '${d}'})
+    exceptions = { str(exception.path): exception for exception in info.value.exceptions }
+    assert set(exceptions) == { 'a', 'b', 'c' }
+    for path, reference in [ ('a', 'b'), ('b', 'c'), ('c', 'a') ]:
+        assert isinstance(exceptions[path], CircularReference)
+        assert exceptions[path].reference == Path.fromstring(reference)
+
+def test_graph_parameters_resolver_self_reference_in_dict():
+    with pytest.raises(MultipleInterpolationErrors) as info:
+        resolve_parameters({'a': {'b': 1, 'c': '${a}'}})
+    exception = info.value.exceptions[0]
+    assert isinstance(exception, CircularReference)
+    assert exception.path == Path.fromstring('a:c')
+
+def test_graph_parameters_resolver_reference_into_unresolved_value():
+    result = resolve_parameters({'a': '${b:x}', 'b': '${c}', 'c': {'x': '${d}'}, 'd': 3})
+    assert result == {'a': 3, 'b': {'x': 3}, 'c': {'x': 3}, 'd': 3}
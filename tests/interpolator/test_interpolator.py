@@ -120,3 +120,43 @@ def test_env_override_active_inv_query():
         },
     }
     assert result.parameters == expected
+
+def test_inventory_shared_between_nodes():
+    interpolator = Interpolator()
+    klass_loader, node_loader = StorageFactory.loaders(uri_env('003'))
+    calls = []
+    node_inventory = interpolator.inventory.node_inventory
+    def counted_node_inventory(proto, klass_loader):
+        calls.append(proto.name)
+        return node_inventory(proto, klass_loader)
+    interpolator.inventory.node_inventory = counted_node_inventory
+    results = {}
+    for nodename in node_loader.nodenames():
+        proto_node = node_loader.primary(nodename, env_override=None)
+        with nodeclass_context(Settings({'automatic_parameters': False})):
+            node = Node(proto_node, klass_loader)
+        results[nodename] = interpolator.interpolate(node, node_loader, klass_loader).parameters
+    assert sorted(calls) == [ 'node_1', 'node_2', 'node_3' ]
+    assert len(interpolator.inventory.result_cache) == 1
+    for nodename, parameters in results.items():
+        proto_node = node_loader.primary(nodename, env_override=None)
+        with nodeclass_context(Settings({'automatic_parameters': False})):
+            node = Node(proto_node, klass_loader)
+        assert Interpolator().interpolate(node, node_loader, klass_loader).parameters == parameters
+
+def test_merge_cache_shared_between_nodes_and_inventory():
+    interpolator = Interpolator()
+    klass_loader, node_loader = StorageFactory.loaders(uri_env('003'))
+    merges = []
+    merge = interpolator.merge_cache._merge
+    def counted_merge(prefix, klass, depth):
+        merges.append(klass.name)
+        return merge(prefix, klass, depth)
+    interpolator.merge_cache._merge = counted_merge
+    for nodename in node_loader.nodenames():
+        proto_node = node_loader.primary(nodename, env_override=None)
+        with nodeclass_context(Settings({'automatic_parameters': False})):
+            node = Node(proto_node, klass_loader)
+        interpolator.interpolate(node, node_loader, klass_loader)
+    # all the nodes, primary or answering inventory queries, share the one merge of their class list
+    assert merges == [ 'one' ]
@@ -0,0 +1,54 @@
+import pytest
+from nodeclass.context import nodeclass_context
+from nodeclass.interpolator.merge_cache import MergeCache
+from nodeclass.node.klass import Klass
+from nodeclass.settings import Settings
+from nodeclass.utils.url import PseudoUrl
+from nodeclass.value.exceptions import FrozenHierarchy
+from nodeclass.value.hierarchy import Hierarchy
+
+nodeclass_context(Settings())
+
+def klass(name, parameters, exports=None):
+    return Klass.from_class_dict(name, { 'parameters': parameters, 'exports': exports or {} }, PseudoUrl(name, name))
+
+a = klass('a', { 'alpha': 1, 'list': [ 'a' ], 'dict': { 'a': 1 } }, { 'e': 'a' })
+b = klass('b', { 'beta': 2, 'list': [ 'b' ], 'dict': { 'b': 2 } })
+c = klass('c', { 'alpha': 3, 'list': [ 'c' ] }, { 'e': 'c' })
+d = klass('d', { 'delta': 4, 'dict': { 'a': 4 } })
+
+def counted_cache():
+    cache = MergeCache()
+    calls = []
+    merge = cache._merge
+    def counted_merge(prefix, klass, depth):
+        calls.append(klass.name)
+        return merge(prefix, klass, depth)
+    cache._merge = counted_merge
+    return cache, calls
+
+def test_merge_cache_result():
+    cache = MergeCache()
+    for klasses in [ [], [ a ], [ a, b, c ], [ b, d, a ] ]:
+        merged = cache.merged('prod', klasses)
+        assert merged.parameters.render_all() == Hierarchy.merge_multiple([ k.parameters for k in klasses ], 'parameters').render_all()
+        assert merged.exports.render_all() == Hierarchy.merge_multiple([ k.exports for k in klasses ], 'exports').render_all()
+
+def test_merge_cache_shares_prefix():
+    cache, calls = counted_cache()
+    cache.merged('prod', [ a, b, c ])
+    assert calls == [ 'a', 'b', 'c' ]
+    cache.merged('prod', [ a, b, d ])
+    assert calls == [ 'a', 'b', 'c', 'd' ]
+    cache.merged('prod', [ a, b ])
+    assert calls == [ 'a', 'b', 'c', 'd' ]
+    cache.merged('dev', [ a, b ])
+    assert calls == [ 'a', 'b', 'c', 'd', 'a', 'b' ]
+
+def test_merge_cache_results_frozen():
+    cache = MergeCache()
+    merged = cache.merged('prod', [ a, b ])
+    with pytest.raises(FrozenHierarchy):
+        merged.parameters.merge(d.parameters)
+    Hierarchy.merge_multiple([ merged.parameters, d.parameters ], 'parameters')
+    assert cache.merged('prod', [ a, b ]).parameters.render_all() == { 'alpha': 1, 'beta': 2, 'list': [ 'a', 'b' ], 'dict': { 'a': 1, 'b': 2 } }
@@ -2,6 +2,7 @@ import copy
 import pytest
 from nodeclass.context import nodeclass_context
 from nodeclass.interpolator.exceptions import CircularReference, MultipleInterpolationErrors, NoSuchReference
+from nodeclass.interpolator.graph_parameters_resolver import GraphParametersResolver
 from nodeclass.interpolator.parameters_resolver import ParametersResolver
 from nodeclass.node.klass import Klass
 from nodeclass.settings import Settings
@@ -12,19 +13,25 @@ from nodeclass.value.hierarchy import Hierarchy
 parameters_resolver = ParametersResolver()
 settings = Settings()
 
+@pytest.fixture(autouse=True, params=[ ParametersResolver, GraphParametersResolver ])
+def resolver(request, monkeypatch):
+    # run every test with both parameter resolvers
+    monkeypatch.setitem(globals(), 'parameters_resolver', request.param())
+
 def kpar(parameters, index):
     class_dict = { 'exports': {}, 'parameters': parameters }
     return Klass.from_class_dict(name='', class_dict=class_dict, url='test_url_{0}'.format(index))
 
-def resolve_parameters(*dicts, inventory = None):
+def resolve_parameters(*dicts, inventory = None, resolver = None):
     '''
     dicts: one or more dicts to merge and resolve
     inventory: inventory to use during the resolve step
+    resolver: parameters resolver to use, default the module parameters_resolver
     '''
     klasses = [ kpar(k, i) for i, k in enumerate(dicts) ]
     inventory = None
     merged_parameters = Hierarchy.merge_multiple([ klass.parameters for klass in klasses ], 'parameters')
-    resolved_parameters = parameters_resolver.resolve(environment = None, parameters = merged_parameters, inventory = inventory)
+    resolved_parameters = (resolver or parameters_resolver).resolve(environment = None, parameters = merged_parameters, inventory = inventory)
     return resolved_parameters.render_all()
 
 
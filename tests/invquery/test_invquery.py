@@ -1,11 +1,17 @@
 import pyparsing
 import pytest
+import random
 import nodeclass.invquery.tokenizer as tokenizer
+from nodeclass.context import CONTEXT, nodeclass_context
 from nodeclass.invquery.exceptions import InventoryQueryParseError
 from nodeclass.invquery.parser import parse as parse_expression
+from nodeclass.invquery.scanner import make_expression_scanner
+from nodeclass.item.scanner import ScanError
+from nodeclass.settings import Settings
 from nodeclass.utils.path import Path
 
 expression_tokenizer = tokenizer.make_expression_tokenizer()
+expression_scanner = make_expression_scanner()
 
 VAQ = tokenizer.Tag.VALUE_QUERY.value
 IFQ = tokenizer.Tag.IF_QUERY.value
@@ -28,8 +34,10 @@ def clean(token):
     '''
     if isinstance(token, pyparsing.ParseResults):
         return [ clean(t) for t in token.asList() ]
+    elif isinstance(token, list):
+        return [ clean(t) for t in token ]
     elif isinstance(token, tokenizer.Token):
-        if isinstance(token.data, pyparsing.ParseResults):
+        if isinstance(token.data, (pyparsing.ParseResults, list)):
             return (token.type, clean(token.data))
     return (token.type, token.data)
 
@@ -118,14 +126,82 @@ def test_expression_tokenizer_exceptions(expression):
     with pytest.raises(pyparsing.ParseException):
         expression_tokenizer.parseString(expression)
 
+@pytest.mark.parametrize('expression, expected', tokenizer_test_data)
+def test_expression_scanner(expression, expected):
+    result = clean(expression_scanner.scan(expression))
+    assert result == expected
+
+@pytest.mark.parametrize('expression', invalid_tokenizer_expressions)
+def test_expression_scanner_exceptions(expression):
+    with pytest.raises(ScanError):
+        expression_scanner.scan(expression)
+
 @pytest.mark.parametrize('expression, exports, parameters', parser_test_data)
-def test_query(expression, exports, parameters):
-    query = parse_expression(expression)
+@pytest.mark.parametrize('query_tokenizer', [ 'pyparsing', 'scanner' ])
+def test_query(expression, exports, parameters, query_tokenizer):
+    with nodeclass_context(Settings({ 'query_tokenizer': query_tokenizer })):
+        query = parse_expression(expression)
     assert query.exports == exports
     assert query.references == parameters
 
 @pytest.mark.parametrize('expression', invalid_parser_expressions)
-def test_expression_parser_exceptions(expression):
-    with pytest.raises(InventoryQueryParseError) as info:
-        parse_expression(expression)
+@pytest.mark.parametrize('query_tokenizer', [ 'pyparsing', 'scanner' ])
+def test_expression_parser_exceptions(expression, query_tokenizer):
+    with nodeclass_context(Settings({ 'query_tokenizer': query_tokenizer })):
+        with pytest.raises(InventoryQueryParseError) as info:
+            parse_expression(expression)
     assert info.value.expression == expression
+
+def test_expression_parser_cache():
+    with nodeclass_context(Settings()):
+        query = parse_expression('exports:alpha if exports:beta == 1')
+        assert parse_expression('exports:alpha if exports:beta == 1') is query
+        assert CONTEXT.query_parse_cache.stats()['hits'] == 1
+    with nodeclass_context(Settings({ 'query_parse_cache_size': 1, 'item_parse_cache_size': 5 })):
+        parse_expression('exports:alpha if exports:beta == 1')
+        parse_expression('exports:alpha if exports:beta == 2')
+        assert CONTEXT.query_parse_cache.stats()['maxsize'] == 1
+        assert CONTEXT.query_parse_cache.stats()['evictions'] == 1
+
+fuzz_fragments = [ 'exports:', 'self:', 'parameters:', 'EXPORTS:', 'if', 'IF', 'and', 'Or', '==', '!=', '+AllEnvs', '+ignoreerrors',
+                   'true', 'False', '1', '-2', '3.5', '.5', '6.', '-', '.', 'a', 'b:c', "'", '"', '\'"', '\\t', '\\n', '\\',
+                   ' ', '  ', '\t', '\n', 'é', '=', '!' ]
+
+def test_expression_scanner_fuzz():
+    ''' Differential test of the scanner against the pyparsing expression tokenizer
+    '''
+    rng = random.Random(0)
+    for _ in range(5000):
+        expression = ''.join(rng.choice(fuzz_fragments) for _ in range(rng.randint(1, 12))).strip()
+        try:
+            expected = clean(expression_tokenizer.parseString(expression))
+        except pyparsing.ParseException:
+            expected = None
+        try:
+            result = clean(expression_scanner.scan(expression))
+        except ScanError:
+            result = None
+        assert result == expected, expression
+
+def test_expression_scanner_fuzz_queries():
+    ''' Differential test over well formed queries, which random fragments rarely make
+    '''
+    rng = random.Random(1)
+    operands = [ 'exports:a', 'exports:b:c', 'self:x', 'parameters:y:z', 'true', 'FALSE', '12', '-3', '4.5', "'\"q r'\"", 'word', 'é' ]
+    for _ in range(2000):
+        terms = []
+        for i in range(rng.randint(1, 4)):
+            if i > 0:
+                terms.append(rng.choice([ 'and', 'or', 'AND', 'OR' ]))
+            terms.extend([ rng.choice(operands), rng.choice([ '==', '!=' ]), rng.choice(operands) ])
+        head = rng.choice([ [], [ 'exports:r' ], [ '+AllEnvs', 'exports:r' ], [ '+IgnoreErrors', '+AllEnvs' ] ])
+        expression = rng.choice([ ' ', '  ', '\t' ]).join(head + [ 'if' ] + terms)
+        try:
+            expected = clean(expression_tokenizer.parseString(expression))
+        except pyparsing.ParseException:
+            expected = None
+        try:
+            result = clean(expression_scanner.scan(expression))
+        except ScanError:
+            result = None
+        assert result == expected, expression
@@ -0,0 +1,128 @@
+import random
+import pytest
+from nodeclass.interpolator.inventory import InventoryResult
+from nodeclass.invquery.exceptions import InventoryQueryValueNotRenderable
+from nodeclass.invquery.index import IndexedInventory
+from nodeclass.invquery.parser import parse as parse_expression
+from nodeclass.utils.path import Path
+from nodeclass.utils.url import PseudoUrl
+from nodeclass.value.hierarchy import Hierarchy
+from nodeclass.value.value import ValueType
+
+url = PseudoUrl('test', 'test')
+context = Hierarchy.from_dict({ 'role': 'web', 'number': 1, 'list': [ 1, 2 ] }, url, 'parameters')
+
+def linear_evaluate(query, context, inventory, environment):
+    ''' Evaluate the query node by node, without the export index
+    '''
+    if ValueType.is_dictionary(query.evaluate(context, {}, environment)):
+        answer = {}
+        for name, node in inventory.items():
+            if query._common_evaluate_checks(node, environment) and query.returned.path in node.exports:
+                if query.test.evaluate(node, context):
+                    answer[name] = node.exports[query.returned.path].render_all()
+        return answer
+    return [ name for name, node in inventory.items()
+             if query._common_evaluate_checks(node, environment) and query.test.evaluate(node, context) ]
+
+def make_inventory(rng, size):
+    inventory = {}
+    for n in range(size):
+        exports = {}
+        for key, values in [ ('role', [ 'web', 'db', 'mail' ]), ('number', [ 0, 1, 1.0, True, '1' ]),
+                             ('list', [ [ 1, 2 ], [ 2, 1 ], { 'a': 1 } ]), ('host', [ 'h{0}'.format(n) ]) ]:
+            if rng.random() < 0.8:
+                exports[key] = rng.choice(values)
+        environment = rng.choice([ 'prod', 'dev' ])
+        inventory['node{0:03d}'.format(n)] = InventoryResult(environment, Hierarchy.from_dict(exports, url, 'exports'), set())
+    return inventory
+
+expressions = [
+    'if exports:role == web',
+    'if exports:role != web',
+    'exports:host if exports:role == self:role',
+    'exports:host if exports:number == 1',
+    'exports:host if exports:number != self:number',
+    'if exports:list == self:list',
+    'if exports:list != self:list or exports:role == db',
+    '+AllEnvs exports:host if exports:role == web and exports:number == 1',
+    '+AllEnvs if exports:role == web or exports:role == db and exports:number != 0',
+    'exports:list if exports:role != mail and exports:role != db or exports:number == true',
+]
+
+@pytest.mark.parametrize('expression', expressions)
+def test_indexed_evaluation(expression):
+    rng = random.Random(expression)
+    query = parse_expression(expression)
+    for _ in range(20):
+        inventory = make_inventory(rng, rng.randrange(0, 30))
+        for environment in [ 'prod', 'dev' ]:
+            expected = linear_evaluate(query, context, inventory, environment)
+            for candidate in [ inventory, IndexedInventory(inventory) ]:
+                assert query.evaluate(context, candidate, environment).render_all() == expected
+
+def test_indexed_evaluation_failed_queries():
+    query = parse_expression('if exports:role == web')
+    inventory = IndexedInventory([
+        ('a', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'web' }, url, 'exports'), { query })),
+        ('b', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'web' }, url, 'exports'), set())),
+    ])
+    assert query.evaluate(context, inventory, 'prod').render_all() == [ 'b' ]
+
+def test_indexed_evaluation_unrenderable():
+    query = parse_expression('if exports:role == web')
+    exports = Hierarchy.merge_multiple([ Hierarchy.from_dict({ 'role': 'web', 'a': { 'b': 1 } }, url, 'exports'),
+                                         Hierarchy.from_dict({ 'role': 'web', 'a': '${c}' }, url, 'exports') ], 'exports')
+    inventory = IndexedInventory([ ('a', InventoryResult('prod', exports, set())) ])
+    assert query.evaluate(context, inventory, 'prod').render_all() == [ 'a' ]
+    with pytest.raises(InventoryQueryValueNotRenderable):
+        parse_expression('if exports:a == web').evaluate(context, inventory, 'prod')
+    with pytest.raises(InventoryQueryValueNotRenderable):
+        linear_evaluate(parse_expression('if exports:a == web'), context, inventory, 'prod')
+    # nodes from other environments are not tested
+    assert query.evaluate(context, inventory, 'dev').render_all() == []
+
+def test_index_shared_between_queries():
+    inventory = IndexedInventory([ ('a', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'web' }, url, 'exports'), set())) ])
+    parse_expression('if exports:role == web').evaluate(context, inventory, 'prod')
+    index = inventory.export_index
+    parse_expression('if exports:role == db').evaluate(context, inventory, 'prod')
+    assert inventory.export_index is index
+    assert list(index.paths) == [ parse_expression('if exports:role == db').test.conditionals[0].export.path ]
+
+def test_and_binds_tighter_than_or():
+    query = parse_expression('if exports:role == web or exports:role == db and exports:number == 1')
+    inventory = IndexedInventory([
+        ('a', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'web', 'number': 0 }, url, 'exports'), set())),
+        ('b', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'db', 'number': 0 }, url, 'exports'), set())),
+        ('c', InventoryResult('prod', Hierarchy.from_dict({ 'role': 'db', 'number': 1 }, url, 'exports'), set())),
+    ])
+    assert query.evaluate(context, inventory, 'prod').render_all() == [ 'a', 'c' ]
+    assert linear_evaluate(query, context, inventory, 'prod') == [ 'a', 'c' ]
+
+def test_short_circuit_skips_later_conditionals():
+    exports = Hierarchy.merge_multiple([ Hierarchy.from_dict({ 'role': 'web', 'a': { 'b': 1 } }, url, 'exports'),
+                                         Hierarchy.from_dict({ 'role': 'web', 'a': '${c}' }, url, 'exports') ], 'exports')
+    inventory = IndexedInventory([ ('a', InventoryResult('prod', exports, set())) ])
+    for expression in [ 'if exports:role == db and exports:a == web', 'if exports:role == web or exports:a == web' ]:
+        query = parse_expression(expression)
+        expected = linear_evaluate(query, context, inventory, 'prod')
+        assert query.evaluate(context, inventory, 'prod').render_all() == expected
+
+def test_conditionals_ordered_by_selectivity():
+    query = parse_expression('if exports:role != self:role and exports:number == self:number and exports:host == h1 or exports:role != db')
+    assert [ [ str(conditional) for conditional in group ] for group in query.test.groups ] == [
+        [ 'exports:host == h1', 'exports:number == parameters:number', 'exports:role != parameters:role' ], [ 'exports:role != db' ] ]
+    assert str(query.test).startswith('exports:role != parameters:role and')
+
+def test_exports_rendered_once():
+    node = InventoryResult('prod', Hierarchy.from_dict({ 'role': 'web', 'number': 1 }, url, 'exports'), set())
+    inventory = { 'a': node }
+    query = parse_expression('if exports:role == web and exports:number == 1')
+    assert linear_evaluate(query, context, inventory, 'prod') == [ 'a' ]
+    assert node.rendered == { Path.fromstring('role'): 'web', Path.fromstring('number'): 1 }
+    # later queries use the rendered values kept by the node
+    node.rendered[Path.fromstring('role')] = 'db'
+    query = parse_expression('if exports:role == db')
+    assert linear_evaluate(query, context, inventory, 'prod') == [ 'a' ]
+    assert query.evaluate(context, IndexedInventory(inventory), 'prod').render_all() == [ 'a' ]
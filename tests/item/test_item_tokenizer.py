@@ -1,7 +1,10 @@
 import pyparsing
 import pytest
+import random
 import nodeclass.item.tokenizer as tokenizer
+from nodeclass.context import nodeclass_context
 from nodeclass.item.parser import parse as parse_expression
+from nodeclass.item.scanner import ScanError, make_scanner
 from nodeclass.settings import Settings
 from nodeclass.utils.path import Path
 
@@ -12,6 +15,7 @@ if TYPE_CHECKING:
 settings = Settings()
 simple_tokenizer = tokenizer.make_simple_tokenizer(settings)
 full_tokenizer = tokenizer.make_full_tokenizer(settings)
+scanner = make_scanner(settings)
 
 INV = tokenizer.Tag.INV.value
 REF = tokenizer.Tag.REF.value
@@ -26,8 +30,10 @@ def clean(token):
     if isinstance(token, pyparsing.ParseResults):
         token = token.asList()
         return [ clean(t) for t in token ]
+    elif isinstance(token, list):
+        return [ clean(t) for t in token ]
     elif isinstance(token, tuple):
-        if isinstance(token[1], pyparsing.ParseResults):
+        if isinstance(token[1], (pyparsing.ParseResults, list)):
             return (token[0], clean(token[1]) )
     return token
 
@@ -189,7 +195,46 @@ def test_full_item_tokenizer_errors(expression):
     with pytest.raises(pyparsing.ParseException):
         full_tokenizer.parseString(expression)
 
+@pytest.mark.parametrize('expression, expected', tokenizer_full_test_data)
+def test_item_scanner(expression, expected):
+    result = clean(scanner.scan(expression))
+    assert result == expected
+
+@pytest.mark.parametrize('expression', full_tokenizer_test_errors)
+def test_item_scanner_errors(expression):
+    with pytest.raises(ScanError):
+        scanner.scan(expression)
+
 @pytest.mark.parametrize('expression, references', parser_test_data)
-def test_item_parser(expression, references):
-    query = parse_expression(expression)
+@pytest.mark.parametrize('item_tokenizer', [ 'pyparsing', 'scanner' ])
+def test_item_parser(expression, references, item_tokenizer):
+    with nodeclass_context(Settings({ 'item_tokenizer': item_tokenizer })):
+        query = parse_expression(expression)
     assert query.references == references
+
+fuzz_settings = [
+    Settings(),
+    Settings({ 'escape_character': '^', 'reference_sentinels': ('{{', '}}'), 'inventory_query_sentinels': ('<<', '>>') }),
+]
+
+fuzz_fragments = [ '$', '{', '}', '[', ']', '\\', '\\\\', '^', '^^', '<', '>', '<<', '>>', '{{', '}}',
+                   '${', '$[', ' ', '\t', '\n', 'a', 'foo:bar', 'exports:b == 2' ]
+
+@pytest.mark.parametrize('settings', fuzz_settings)
+def test_item_scanner_fuzz(settings):
+    ''' Differential test of the scanner against the pyparsing full tokenizer
+    '''
+    full_tokenizer = tokenizer.make_full_tokenizer(settings)
+    scanner = make_scanner(settings)
+    rng = random.Random(0)
+    for _ in range(2000):
+        expression = ''.join(rng.choice(fuzz_fragments) for _ in range(rng.randint(1, 16)))
+        try:
+            expected = clean(full_tokenizer.parseString(expression))
+        except pyparsing.ParseException:
+            expected = None
+        try:
+            result = clean(scanner.scan(expression))
+        except ScanError:
+            result = None
+        assert result == expected, expression
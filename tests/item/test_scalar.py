@@ -0,0 +1,21 @@
+from nodeclass.context import CONTEXT, nodeclass_context
+from nodeclass.item.parser import parse
+from nodeclass.item.scalar import Scalar
+from nodeclass.settings import Settings
+
+def test_scalar_shared():
+    assert Scalar.shared('a') is Scalar.shared('a')
+    assert Scalar.shared(1) is not Scalar.shared(True)
+    assert Scalar.shared(1) is not Scalar.shared(1.0)
+    assert Scalar.shared(1).render() == 1
+    assert parse('abc') is parse('abc')
+
+def test_scalar_shared_unhashable():
+    assert Scalar.shared([ 1 ]) == Scalar([ 1 ])
+
+def test_scalar_shared_nan_not_interned():
+    with nodeclass_context(Settings()):
+        size = len(CONTEXT.scalar_intern)
+        Scalar.shared(float('nan'))
+        Scalar.shared(float('nan'))
+        assert len(CONTEXT.scalar_intern) == size
@@ -109,3 +109,12 @@ def test_recursive_class_includes_single_class():
     assert info.value.classname == 'four'
     assert info.value.first.name == 'four'
     assert info.value.second.name == 'node_2'
+
+
+def test_node_objects_have_no_instance_dict():
+    with nodeclass_context(Settings()):
+        klass = Klass.from_class_dict(name='one', class_dict=nodes['one'], url=EmptyUrl())
+        proto = ProtoNode(name='one', environment=nodes['one']['environment'], klass=klass, url=EmptyUrl())
+        node = Node(proto, None)
+    for obj in [ proto, node, proto.url ] + node.all_klasses + [ klass.url for klass in node.all_klasses ]:
+        assert not hasattr(obj, '__dict__')
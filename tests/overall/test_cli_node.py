@@ -1,3 +1,4 @@
+import json
 import os
 import subprocess
 import yaml
@@ -24,3 +25,58 @@ def test_cli_node():
         process = subprocess.run([cmd_path, 'node', 'node_1', '--config-filename', 'nodeclass-config-001.yml'], capture_output=True)
     output = yaml.load(process.stdout, Loader=SafeLoader)
     assert(output == node_1)
+
+def test_cli_node_path():
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'node', 'node_1', '--config-filename', 'nodeclass-config-001.yml', '--path', 'kappa', '--path', 'delta:five'], capture_output=True)
+    output = yaml.load(process.stdout, Loader=SafeLoader)
+    assert(output == { 'kappa': 2, 'delta:five': 5 })
+
+def test_cli_inventory(tmp_path):
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'inventory', '--output', str(tmp_path), '--config-filename', 'nodeclass-config-001.yml'], capture_output=True)
+    assert(process.returncode == 0)
+    assert(sorted(os.listdir(tmp_path)) == [ 'node_1.yml', 'node_2.yml', 'node_3.yml', 'node_4.yml' ])
+    with open(tmp_path / 'node_1.yml') as file:
+        assert(yaml.load(file, Loader=SafeLoader) == node_1)
+
+def test_cli_node_format_json():
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'node', 'node_1', '--config-filename', 'nodeclass-config-001.yml', '--format', 'json'], capture_output=True)
+    assert(json.loads(process.stdout) == node_1)
+
+def test_cli_inventory_ndjson(tmp_path):
+    output = str(tmp_path / 'inventory.ndjson')
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'inventory', '--output', output, '--format', 'ndjson', '--config-filename', 'nodeclass-config-001.yml'], capture_output=True)
+    assert(process.returncode == 0)
+    with open(output) as file:
+        nodes = [ json.loads(line) for line in file ]
+    assert([ node.pop('name') for node in nodes ] == [ 'node_1', 'node_2', 'node_3', 'node_4' ])
+    assert(nodes[0] == node_1)
+
+def test_cli_node_many():
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'node', 'node_1', 'node_2', '--config-filename', 'nodeclass-config-001.yml'], capture_output=True)
+    assert(process.returncode == 0)
+    output = yaml.load(process.stdout, Loader=SafeLoader)
+    assert(sorted(output) == [ 'node_1', 'node_2' ])
+    assert(output['node_1'] == node_1)
+
+def test_cli_node_many_path():
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'node', 'node_1', 'node_1', '--config-filename', 'nodeclass-config-001.yml', '--path', 'kappa'], capture_output=True)
+    assert(process.returncode == 0)
+    assert(yaml.load(process.stdout, Loader=SafeLoader) == { 'node_1': { 'kappa': 2 } })
+
+def test_cli_node_requires_node():
+    with set_working_directory(directory):
+        cmd_path = os.path.abspath(os.path.join('../..', 'nodeclass-test.py'))
+        process = subprocess.run([cmd_path, 'node', '--config-filename', 'nodeclass-config-001.yml'], capture_output=True)
+    assert(process.returncode == 2)
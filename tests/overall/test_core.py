@@ -0,0 +1,128 @@
+import os
+import pytest
+import nodeclass.core as core
+from nodeclass.context import nodeclass_context
+from nodeclass.interpolator.exceptions import NoSuchParameter
+from nodeclass.interpolator.inventory import Inventory
+from nodeclass.settings import Settings
+from nodeclass.storage.uri import Uri
+from .node_1 import node_1
+
+directory = os.path.dirname(os.path.realpath(__file__))
+
+uri_config = {
+    'classes': {
+        'resource': 'yaml_fs',
+        'path': os.path.join(directory, 'data/001/env/prod/classes'),
+        'env_overrides': [
+            {
+                'dev': {
+                    'resource': 'yaml_fs',
+                    'path': os.path.join(directory, 'data/001/env/dev/classes'),
+                },
+            },
+        ],
+    },
+    'nodes': 'yaml_fs:{0}'.format(os.path.join(directory, 'data/001/nodes')),
+}
+
+
+def test_nodeinfo_all():
+    nodeinfos, exceptions = core.nodeinfo_all(Uri(uri_config, 'test'))
+    assert exceptions == []
+    assert sorted([ nodeinfo.name for nodeinfo in nodeinfos ]) == [ 'node_1', 'node_2', 'node_3', 'node_4' ]
+    results = { nodeinfo.name: nodeinfo.as_dict() for nodeinfo in nodeinfos }
+    assert results['node_1'] == node_1
+
+def test_nodeinfo_all_workers():
+    serial, serial_exceptions = core.nodeinfo_all(Uri(uri_config, 'test'))
+    parallel, parallel_exceptions = core.nodeinfo_all(Uri(uri_config, 'test'), workers=2)
+    assert serial_exceptions == parallel_exceptions == []
+    assert [ nodeinfo.name for nodeinfo in parallel ] == [ nodeinfo.name for nodeinfo in serial ]
+    assert [ nodeinfo.as_dict() for nodeinfo in parallel ] == [ nodeinfo.as_dict() for nodeinfo in serial ]
+
+def test_nodeinfo_all_class_load_threads():
+    serial, _ = core.nodeinfo_all(Uri(uri_config, 'test'))
+    with nodeclass_context(Settings({ 'class_load_threads': 4 })):
+        threaded, exceptions = core.nodeinfo_all(Uri(uri_config, 'test'))
+    assert exceptions == []
+    assert [ nodeinfo.as_dict() for nodeinfo in threaded ] == [ nodeinfo.as_dict() for nodeinfo in serial ]
+
+def test_nodeinfo_all_small_caches():
+    unbounded, _ = core.nodeinfo_all(Uri(uri_config, 'test'))
+    sizes = [ 'class_cache_size', 'node_cache_size', 'inventory_cache_size', 'merge_cache_size', 'item_parse_cache_size', 'query_parse_cache_size', 'intern_cache_size' ]
+    with nodeclass_context(Settings({ size: 1 for size in sizes })):
+        bounded, exceptions = core.nodeinfo_all(Uri(uri_config, 'test'))
+    assert exceptions == []
+    assert [ nodeinfo.as_dict() for nodeinfo in bounded ] == [ nodeinfo.as_dict() for nodeinfo in unbounded ]
+
+def test_nodeinfo_all_iter():
+    nodeinfos, _ = core.nodeinfo_all(Uri(uri_config, 'test'))
+    results = core.nodeinfo_all_iter(Uri(uri_config, 'test'))
+    first_name, first = next(results)
+    assert first_name == first.name == nodeinfos[0].name
+    rest = list(results)
+    assert [ first_name ] + [ name for name, _ in rest ] == [ nodeinfo.name for nodeinfo in nodeinfos ]
+    assert [ nodeinfo.as_dict() for _, nodeinfo in rest ] == [ nodeinfo.as_dict() for nodeinfo in nodeinfos[1:] ]
+
+def test_nodeinfo_many():
+    nodeinfos, exceptions = core.nodeinfo_many([ 'node_3', 'node_1', 'no_such_node' ], Uri(uri_config, 'test'))
+    assert [ nodeinfo.name for nodeinfo in nodeinfos ] == [ 'node_3', 'node_1' ]
+    assert nodeinfos[1].as_dict() == node_1
+    assert [ exception.node for exception in exceptions ] == [ 'no_such_node' ]
+
+def test_nodeinfo_many_loads_once(monkeypatch):
+    calls = []
+    original = core.StorageFactory.loaders
+    def loaders(uri):
+        calls.append(uri)
+        return original(uri)
+    monkeypatch.setattr(core.StorageFactory, 'loaders', loaders)
+    nodeinfos, exceptions = core.nodeinfo_many([ 'node_1', 'node_2' ], Uri(uri_config, 'test'))
+    assert len(nodeinfos) == 2 and exceptions == []
+    assert len(calls) == 1
+
+def test_lookup():
+    values = core.lookup('node_1', Uri(uri_config, 'test'), [ 'theta', 'kappa', 'delta' ])
+    assert values == { 'theta': 1, 'kappa': 2, 'delta': { 'one': 1, 'two': 2, 'five': 5 } }
+
+def test_lookup_many(monkeypatch):
+    calls = []
+    original = core.StorageFactory.loaders
+    def loaders(uri):
+        calls.append(uri)
+        return original(uri)
+    monkeypatch.setattr(core.StorageFactory, 'loaders', loaders)
+    results = list(core.lookup_many([ 'node_1', 'no_such_node', 'node_1' ], Uri(uri_config, 'test'), [ 'theta', 'kappa' ]))
+    assert [ name for name, _ in results ] == [ 'node_1', 'no_such_node', 'node_1' ]
+    assert results[0][1] == results[2][1] == { 'theta': 1, 'kappa': 2 }
+    assert results[1][1].node == 'no_such_node'
+    assert len(calls) == 1
+
+def test_lookup_only_required_queries(monkeypatch):
+    nodes = []
+    original = Inventory.node_inventory
+    def node_inventory(self, proto, klass_loader):
+        nodes.append(proto.name)
+        return original(self, proto, klass_loader)
+    monkeypatch.setattr(Inventory, 'node_inventory', node_inventory)
+    assert core.lookup('node_1', Uri(uri_config, 'test'), [ 'iota' ]) == { 'iota': [ 11, 22, 91, 92 ] }
+    assert nodes == []
+    assert core.lookup('node_1', Uri(uri_config, 'test'), [ 'epsilon' ]) == { 'epsilon': node_1['parameters']['epsilon'] }
+    assert len(nodes) > 0
+
+def test_lookup_missing_path():
+    with pytest.raises(NoSuchParameter) as info:
+        core.lookup('node_1', Uri(uri_config, 'test'), [ 'delta:missing' ])
+    assert info.value.node == 'node_1'
+    assert str(info.value.path) == 'delta:missing'
+
+def test_inventory_skips_other_environments(tmp_path):
+    (tmp_path / 'classes').mkdir()
+    (tmp_path / 'nodes').mkdir()
+    (tmp_path / 'nodes' / 'a.yml').write_text('environment: prod\nexports:\n  name: a\nparameters:\n  names: $[ exports:name ]\n')
+    (tmp_path / 'nodes' / 'b.yml').write_text('environment: prod\nexports:\n  name: b\n')
+    # not valid yaml beyond the environment, never parsed for queries from prod
+    (tmp_path / 'nodes' / 'c.yml').write_text('environment: dev\nexports: [ name\n')
+    uri = Uri({ 'classes': 'yaml_fs:{0}'.format(tmp_path / 'classes'), 'nodes': 'yaml_fs:{0}'.format(tmp_path / 'nodes') }, 'test')
+    assert core.nodeinfo('a', uri).as_dict()['parameters']['names'] == { 'a': 'a', 'b': 'b' }
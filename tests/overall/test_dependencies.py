@@ -0,0 +1,81 @@
+import os
+import shutil
+import nodeclass.core as core
+from nodeclass.storage.uri import Uri
+from .node_1 import node_1
+
+directory = os.path.dirname(os.path.realpath(__file__))
+
+
+def make_uri(basedir):
+    shutil.copytree(os.path.join(directory, 'data/001'), basedir)
+    uri_config = {
+        'classes': {
+            'resource': 'yaml_fs',
+            'path': os.path.join(basedir, 'env/prod/classes'),
+            'env_overrides': [
+                {
+                    'dev': {
+                        'resource': 'yaml_fs',
+                        'path': os.path.join(basedir, 'env/dev/classes'),
+                    },
+                },
+            ],
+        },
+        'nodes': 'yaml_fs:{0}'.format(os.path.join(basedir, 'nodes')),
+    }
+    return Uri(uri_config, 'test')
+
+def changed(uri, dependency_map):
+    nodeinfos, exceptions = core.nodeinfo_changed(uri, dependency_map)
+    assert exceptions == []
+    return { nodeinfo.name: nodeinfo.as_dict() for nodeinfo in nodeinfos }
+
+def test_nodeinfo_changed_unchanged(tmp_path):
+    uri = make_uri(str(tmp_path / 'data'))
+    dependency_map = str(tmp_path / 'dependencies.json')
+    results = changed(uri, dependency_map)
+    assert sorted(results) == [ 'node_1', 'node_2', 'node_3', 'node_4' ]
+    assert results['node_1'] == node_1
+    assert changed(uri, dependency_map) == {}
+
+def test_nodeinfo_changed_class(tmp_path):
+    uri = make_uri(str(tmp_path / 'data'))
+    dependency_map = str(tmp_path / 'dependencies.json')
+    changed(uri, dependency_map)
+    (tmp_path / 'data' / 'env' / 'prod' / 'classes' / 'one' / 'a' / 'b.yml').write_text('classes:\n- one.a\n')
+    assert sorted(changed(uri, dependency_map)) == [ 'node_1' ]
+
+def test_nodeinfo_changed_inventory(tmp_path):
+    uri = make_uri(str(tmp_path / 'data'))
+    dependency_map = str(tmp_path / 'dependencies.json')
+    changed(uri, dependency_map)
+    # node_1 queries the exports of the prod nodes
+    (tmp_path / 'data' / 'env' / 'prod' / 'classes' / 'two.yml').write_text('exports:\n  a: 5\n  b: 2\n')
+    results = changed(uri, dependency_map)
+    assert sorted(results) == [ 'node_1', 'node_2' ]
+    assert results['node_1']['parameters']['epsilon'] == { 'node_1': 1, 'node_2': 5 }
+    # node_4 is in the dev environment so does not answer the queries of node_1
+    (tmp_path / 'data' / 'env' / 'dev' / 'classes' / 'four.yml').write_text('exports:\n  a: 4\n')
+    assert sorted(changed(uri, dependency_map)) == [ 'node_4' ]
+
+def test_nodeinfo_changed_new_node(tmp_path):
+    uri = make_uri(str(tmp_path / 'data'))
+    dependency_map = str(tmp_path / 'dependencies.json')
+    changed(uri, dependency_map)
+    (tmp_path / 'data' / 'nodes' / 'node_5.yml').write_text('classes:\n- two\n\nenvironment: prod\n')
+    results = changed(uri, dependency_map)
+    assert sorted(results) == [ 'node_1', 'node_5' ]
+    assert results['node_1']['parameters']['zeta'] == [ 'node_1', 'node_2', 'node_5' ]
+
+def test_nodeinfo_changed_other_environment_node(tmp_path):
+    uri = make_uri(str(tmp_path / 'data'))
+    dependency_map = str(tmp_path / 'dependencies.json')
+    changed(uri, dependency_map)
+    # node_4 is in the dev environment, so editing it does not affect the queries of node_1
+    node_file = tmp_path / 'data' / 'nodes' / 'node_4.yml'
+    node_file.write_text('# a comment\n' + node_file.read_text())
+    assert sorted(changed(uri, dependency_map)) == [ 'node_4' ]
+    # moving node_4 into the prod environment does
+    node_file.write_text('classes:\n- two\n\nenvironment: prod\n')
+    assert sorted(changed(uri, dependency_map)) == [ 'node_1', 'node_4' ]
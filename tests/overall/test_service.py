@@ -0,0 +1,92 @@
+import os
+import shutil
+import threading
+from nodeclass.service import Service
+from nodeclass.settings import Settings
+from nodeclass.storage.uri import Uri
+from .node_1 import node_1
+
+directory = os.path.dirname(os.path.realpath(__file__))
+
+
+def make_service(basedir, settings=None):
+    shutil.copytree(os.path.join(directory, 'data/001'), basedir)
+    uri_config = {
+        'classes': {
+            'resource': 'yaml_fs',
+            'path': os.path.join(basedir, 'env/prod/classes'),
+            'env_overrides': [
+                {
+                    'dev': {
+                        'resource': 'yaml_fs',
+                        'path': os.path.join(basedir, 'env/dev/classes'),
+                    },
+                },
+            ],
+        },
+        'nodes': 'yaml_fs:{0}'.format(os.path.join(basedir, 'nodes')),
+    }
+    return Service(settings or Settings(), Uri(uri_config, 'test'))
+
+def test_service_reuses_loaders(tmp_path):
+    service = make_service(str(tmp_path / 'data'))
+    assert service.nodeinfo('node_1').as_dict() == node_1
+    loaders = service.loaders
+    assert service.nodeinfo('node_1').as_dict() == node_1
+    assert service.node('node_1').applications == node_1['applications']
+    assert service.loaders is loaders
+
+def test_service_invalidated_by_change(tmp_path):
+    service = make_service(str(tmp_path / 'data'), Settings({ 'fingerprint_interval': 0 }))
+    assert service.nodeinfo('node_1').as_dict()['parameters']['alpha'] == 1
+    loaders = service.loaders
+    node_file = tmp_path / 'data' / 'nodes' / 'node_1.yml'
+    node_file.write_text(node_file.read_text().replace('alpha: 1', 'alpha: 2'))
+    stat = os.stat(node_file)
+    os.utime(node_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert service.nodeinfo('node_1').as_dict()['parameters']['alpha'] == 2
+    assert service.loaders is not loaders
+
+def test_service_threads(tmp_path):
+    service = make_service(str(tmp_path / 'data'))
+    results = []
+    def worker():
+        results.append(service.nodeinfo('node_1').as_dict())
+    threads = [ threading.Thread(target=worker) for _ in range(4) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [ node_1 ] * 4
+
+def test_service_cache_stats_and_clear(tmp_path):
+    service = make_service(str(tmp_path / 'data'))
+    service.nodeinfo('node_1')
+    service.nodeinfo('node_1')
+    stats = service.cache_stats()
+    assert stats['nodes']['size'] > 0
+    assert stats['nodes']['hits'] > 0
+    assert stats['classes']['maxsize'] is None
+    service.clear()
+    stats = service.cache_stats()
+    assert stats['nodes']['size'] == stats['classes']['size'] == stats['item_parse']['size'] == 0
+    assert service.nodeinfo('node_1').as_dict() == node_1
+
+def test_service_fingerprint_interval(tmp_path, monkeypatch):
+    service = make_service(str(tmp_path / 'data'))
+    assert service.nodeinfo('node_1').as_dict()['parameters']['alpha'] == 1
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(os, 'walk', lambda path: walks.append(path) or walk(path))
+    node_file = tmp_path / 'data' / 'nodes' / 'node_1.yml'
+    node_file.write_text(node_file.read_text().replace('alpha: 1', 'alpha: 2'))
+    # within the fingerprint interval the file system is not checked again
+    assert service.nodeinfo('node_1').as_dict()['parameters']['alpha'] == 1
+    assert walks == []
+    for storage in service.storage_cache.values():
+        storage.last_fingerprint = (storage.last_fingerprint[0] - 5, storage.last_fingerprint[1])
+    assert service.nodeinfo('node_1').as_dict()['parameters']['alpha'] == 2
+    # the fingerprint taken to find the change is kept for the new loaders, the
+    # nodes directory is walked once more to list the nodes
+    nodes = str(tmp_path / 'data' / 'nodes')
+    assert sorted(walks) == sorted([ storage.basedir for storage in service.storage_cache.values() ] + [ nodes ])
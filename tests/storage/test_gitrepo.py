@@ -0,0 +1,172 @@
+import pytest
+import os
+from nodeclass.service import Service
+from nodeclass.settings import Settings
+from nodeclass.storage.exceptions import ClassNotFound, DuplicateClass, InvalidUriOptionValue
+from nodeclass.storage.gitrepo import GitRepo, GitRepoClasses, GitRepoNodes, NoSuchBranch
+from nodeclass.storage.uri import Uri
+from nodeclass.storage.yaml import Yaml
+
+pygit2 = pytest.importorskip('pygit2')
+
+
+def tree(repo, files):
+    builder = repo.TreeBuilder()
+    for name, data in files.items():
+        if isinstance(data, dict):
+            builder.insert(name, tree(repo, data), pygit2.GIT_FILEMODE_TREE)
+        else:
+            builder.insert(name, repo.create_blob(data.encode('utf-8')), pygit2.GIT_FILEMODE_BLOB)
+    return builder.write()
+
+def commit(repo, branch, files):
+    signature = pygit2.Signature('test', 'test@example.com')
+    reference = 'refs/heads/{0}'.format(branch)
+    parents = [ repo.references[reference].target ] if reference in repo.references else []
+    return repo.create_commit(reference, signature, signature, 'commit', tree(repo, files), parents)
+
+@pytest.fixture
+def remote(tmp_path):
+    repo = pygit2.init_repository(str(tmp_path / 'remote.git'), bare=True)
+    commit(repo, 'master', { 'a.yml': 'a: 1\n' })
+    commit(repo, 'other', { 'b.yml': 'b: 1\n' })
+    return repo
+
+def git_repo(tmp_path, remote, **options):
+    uri = { 'resource': 'yaml_git', 'repo': 'file://{0}'.format(remote.path.rstrip('/')),
+            'cache_dir': str(tmp_path / 'cache'), 'lock_dir': str(tmp_path / 'lock') }
+    uri.update(options)
+    return GitRepo.from_uri(uri, None)
+
+def head(git_repo, branch):
+    return git_repo.repo.lookup_branch(branch).target
+
+def test_git_repo_fetch_always(tmp_path, remote):
+    repo = git_repo(tmp_path, remote)
+    assert sorted(repo.branches) == [ 'master', 'other' ]
+    new_head = commit(remote, 'master', { 'a.yml': 'a: 2\n' })
+    assert head(git_repo(tmp_path, remote), 'master') == new_head
+
+def test_git_repo_fetch_never(tmp_path, remote):
+    # a new cache is always populated
+    repo = git_repo(tmp_path, remote, fetch='never')
+    old_head = head(repo, 'master')
+    commit(remote, 'master', { 'a.yml': 'a: 2\n' })
+    assert head(git_repo(tmp_path, remote, fetch='never'), 'master') == old_head
+    repo = git_repo(tmp_path, remote, fetch='never')
+    repo.fingerprint()
+    assert head(repo, 'master') == old_head
+
+def test_git_repo_fetch_interval(tmp_path, remote):
+    repo = git_repo(tmp_path, remote, fetch='interval', fetch_interval=3600)
+    old_head = head(repo, 'master')
+    new_head = commit(remote, 'master', { 'a.yml': 'a: 2\n' })
+    assert head(git_repo(tmp_path, remote, fetch='interval', fetch_interval=3600), 'master') == old_head
+    assert head(git_repo(tmp_path, remote, fetch='interval', fetch_interval=0), 'master') == new_head
+
+def test_git_repo_single_branch(tmp_path, remote):
+    repo = git_repo(tmp_path, remote, single_branch=True, branch='other')
+    assert repo.branches == [ 'other' ]
+    # a single branch fetch does not count as a fetch of all the branches
+    repo = git_repo(tmp_path, remote, fetch='interval', fetch_interval=3600)
+    assert sorted(repo.branches) == [ 'master', 'other' ]
+
+def test_git_repo_fingerprint_fetch_interval(tmp_path, remote):
+    # fingerprints fetch at most once every fetch_interval, even with fetch always
+    repo = git_repo(tmp_path, remote, fetch_interval=3600)
+    fingerprint = repo.fingerprint()
+    commit(remote, 'master', { 'a.yml': 'a: 2\n' })
+    assert repo.fingerprint() == fingerprint
+    repo = git_repo(tmp_path, remote, fetch='never')
+    repo.fetch_interval = 0
+    assert repo.fingerprint() == fingerprint
+    repo = git_repo(tmp_path, remote, fetch_interval=0)
+    assert repo.fingerprint() != fingerprint
+
+def test_git_repo_invalid_fetch(tmp_path, remote):
+    with pytest.raises(InvalidUriOptionValue):
+        git_repo(tmp_path, remote, fetch='sometimes')
+    with pytest.raises(InvalidUriOptionValue):
+        git_repo(tmp_path, remote, fetch_interval='soon')
+
+classes_files = {
+    'classes': {
+        'one.yml': 'parameters:\n  a: 1\n',
+        'two': { 'init.yml': 'parameters:\n  b: 2\n', 'three.yml': 'parameters:\n  c: 3\n' },
+        'four.yml': 'a: 1\n',
+        'four': { 'init.yml': 'b: 1\n' },
+        'five.yml': { 'x.yml': 'a: 1\n' },
+    },
+    'nodes': { 'alpha.yml': 'environment: master\n', 'prod': { 'beta.yml': 'environment: prod\n' } },
+}
+
+def storage_uri(tmp_path, remote, **options):
+    uri = { 'resource': 'yaml_git', 'repo': 'file://{0}'.format(remote.path.rstrip('/')),
+            'cache_dir': str(tmp_path / 'cache'), 'lock_dir': str(tmp_path / 'lock') }
+    uri.update(options)
+    return uri
+
+def test_git_repo_classes(tmp_path, remote):
+    commit(remote, 'master', classes_files)
+    classes = GitRepoClasses(storage_uri(tmp_path, remote, path='classes'), Yaml)
+    assert classes.get('one', None)[0] == { 'parameters': { 'a': 1 } }
+    assert classes.get('two', None)[0] == { 'parameters': { 'b': 2 } }
+    assert classes.get('two.three', None)[0] == { 'parameters': { 'c': 3 } }
+    with pytest.raises(DuplicateClass):
+        classes.get('four', None)
+    with pytest.raises(ClassNotFound):
+        classes.get('five', None)
+    with pytest.raises(ClassNotFound):
+        classes.get('six', None)
+
+def test_git_repo_classes_env_branch(tmp_path, remote):
+    commit(remote, 'prod', { 'classes': { 'one.yml': 'parameters:\n  a: prod\n' } })
+    commit(remote, 'master', classes_files)
+    classes = GitRepoClasses(storage_uri(tmp_path, remote, path='classes', branch='__env__'), Yaml)
+    assert classes.get('one', 'prod')[0] == { 'parameters': { 'a': 'prod' } }
+    assert classes.get('one', 'master')[0] == { 'parameters': { 'a': 1 } }
+
+def test_git_repo_tree_index(tmp_path, remote, monkeypatch):
+    commit(remote, 'master', classes_files)
+    nodes = GitRepoNodes(storage_uri(tmp_path, remote, path='nodes'), Yaml)
+    assert sorted(nodes.node_map) == [ 'alpha', 'beta' ]
+    tree_id = str(nodes.git_repo.repo.revparse_single('master').tree.id)
+    index_file = os.path.join(nodes.git_repo.cache_dir, GitRepo.tree_index_dir, tree_id[:2], tree_id[2:])
+    assert os.path.exists(index_file)
+    # the persisted index is used instead of walking the tree again
+    monkeypatch.setattr(GitRepo, '_files_in_tree', lambda self, tree, path: pytest.fail('tree walked'))
+    nodes = GitRepoNodes(storage_uri(tmp_path, remote, path='nodes'), Yaml)
+    assert sorted(nodes.node_map) == [ 'alpha', 'beta' ]
+    assert nodes.get('beta')[0] == { 'environment': 'prod' }
+
+def test_git_repo_missing_objects(tmp_path, remote):
+    repo = git_repo(tmp_path, remote)
+    blob_id = str(repo.file_in_commit(repo.branch_commit('master'), 'a.yml').id)
+    assert repo.get(blob_id).data == b'a: 1\n'
+    # commits and trees are not blobs
+    assert repo.get(repo.branch_commit('master')) is None
+    assert repo.get('0' * 40) is None
+    with pytest.raises(NoSuchBranch):
+        repo.file_in_commit(blob_id, 'a.yml')
+    with pytest.raises(NoSuchBranch):
+        repo.files_in_branch(blob_id)
+
+def test_git_repo_service_fetches_once(tmp_path, remote, monkeypatch):
+    commit(remote, 'master', classes_files)
+    uri = { 'classes': storage_uri(tmp_path, remote, path='classes'), 'nodes': storage_uri(tmp_path, remote, path='nodes') }
+    service = Service(Settings(), Uri(uri, 'test'))
+    assert service.nodeinfo('alpha').as_dict()['environment'] == 'master'
+    fetches = []
+    fetch = GitRepo._fetch
+    monkeypatch.setattr(GitRepo, '_fetch', lambda self: fetches.append(self) or fetch(self))
+    service.nodeinfo('alpha')
+    assert fetches == []
+    # once the fetch interval has passed the classes and nodes share one fetch, and
+    # a change found by it is not fetched again for the new loaders
+    commit(remote, 'master', dict(classes_files, nodes={ 'alpha.yml': 'environment: prod\n' }))
+    [ repo ] = [ storage for storage in service.storage_cache.values() if isinstance(storage, GitRepo) ]
+    repo._record_fetch_time(0)
+    loaders = service.loaders
+    assert service.nodeinfo('alpha').as_dict()['environment'] == 'prod'
+    assert service.loaders is not loaders
+    assert len(fetches) == 1
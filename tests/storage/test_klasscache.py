@@ -0,0 +1,53 @@
+import os
+from nodeclass.context import nodeclass_context
+from nodeclass.settings import Settings
+from nodeclass.storage.factory import Factory as StorageFactory
+from nodeclass.storage.uri import Uri
+
+def write_class(classes, text):
+    with open(os.path.join(classes, 'one.yml'), 'w') as file:
+        file.write(text)
+
+def make_uri(basedir):
+    return Uri({ 'classes': 'yaml_fs:{0}'.format(os.path.join(basedir, 'classes')),
+                 'nodes': 'yaml_fs:{0}'.format(os.path.join(basedir, 'nodes')) }, 'test')
+
+def test_klass_cache(tmp_path):
+    classes = tmp_path / 'data' / 'classes'
+    classes.mkdir(parents=True)
+    (tmp_path / 'data' / 'nodes').mkdir()
+    write_class(classes, 'parameters:\n  a: [ x, y ]\n  b: 1\n')
+    uri = make_uri(tmp_path / 'data')
+    with nodeclass_context(Settings({ 'class_cache_dir': str(tmp_path / 'cache') })):
+        klass_loader = StorageFactory.klass_loader(uri.classes_uri)
+        klass = klass_loader[('one', None)]
+        assert len(list((tmp_path / 'cache').glob('*/*'))) == 1
+
+        # a fresh loader must not parse the class file again
+        klass_loader = StorageFactory.klass_loader(uri.classes_uri)
+        storage = klass_loader.storages[-1][1]
+        def no_get(name, environment):
+            raise AssertionError('class file parsed again')
+        storage.get = no_get
+        cached = klass_loader[('one', None)]
+        assert cached.parameters.render_all() == klass.parameters.render_all()
+        assert str(cached.url) == str(klass.url)
+
+        # changing the file contents invalidates the cached entry
+        write_class(classes, 'parameters:\n  a: 2\n')
+        klass_loader = StorageFactory.klass_loader(uri.classes_uri)
+        assert klass_loader[('one', None)].parameters.render_all() == { 'a': 2 }
+        assert len(list((tmp_path / 'cache').glob('*/*'))) == 2
+
+def test_klass_cache_corrupt_entry(tmp_path):
+    classes = tmp_path / 'data' / 'classes'
+    classes.mkdir(parents=True)
+    (tmp_path / 'data' / 'nodes').mkdir()
+    write_class(classes, 'parameters:\n  a: 1\n')
+    uri = make_uri(tmp_path / 'data')
+    with nodeclass_context(Settings({ 'class_cache_dir': str(tmp_path / 'cache') })):
+        StorageFactory.klass_loader(uri.classes_uri)[('one', None)]
+        for entry in (tmp_path / 'cache').glob('*/*'):
+            entry.write_bytes(b'not a pickle')
+        klass = StorageFactory.klass_loader(uri.classes_uri)[('one', None)]
+        assert klass.parameters.render_all() == { 'a': 1 }
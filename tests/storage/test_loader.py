@@ -1,4 +1,9 @@
 import os
+import pytest
+from nodeclass.context import nodeclass_context
+from nodeclass.node.klass import KlassID
+from nodeclass.settings import Settings
+from nodeclass.storage.exceptions import ClassNotFound
 from nodeclass.storage.factory import Factory as StorageFactory
 from nodeclass.storage.uri import Uri
 
@@ -17,3 +22,39 @@ def test_node_loader():
     node_loader = StorageFactory.node_loader(uri.nodes_uri)
     assert(node_loader['alpha'].name == 'alpha')
     assert(len([ n for n in node_loader.nodes() ]) == 1)
+
+def test_node_loader_environment():
+    uri = Uri(uri_config, 'test')
+    node_loader = StorageFactory.node_loader(uri.nodes_uri)
+    assert(node_loader.environment('alpha') == 'test')
+    assert(node_loader.cache == {})
+    assert(node_loader['alpha'].inv_query_env == node_loader.environment('alpha'))
+
+def test_klass_loader_prefetch(tmp_path):
+    (tmp_path / 'classes').mkdir()
+    (tmp_path / 'nodes').mkdir()
+    (tmp_path / 'classes' / 'a.yml').write_text('classes:\n- b\n- missing\nparameters:\n  a: ${b}\n')
+    (tmp_path / 'classes' / 'b.yml').write_text('classes:\n- c\nparameters:\n  b: 1\n')
+    (tmp_path / 'classes' / 'c.yml').write_text('parameters:\n  c: 1\n')
+    uri = Uri({ 'classes': 'yaml_fs:{0}'.format(tmp_path / 'classes'), 'nodes': 'yaml_fs:{0}'.format(tmp_path / 'nodes') }, 'test')
+    klass_loader = StorageFactory.klass_loader(uri.classes_uri)
+    klass_loader.prefetch([ KlassID('a', 'prod') ], threads=2)
+    assert(sorted(klass_loader.cache) == [ KlassID('a', 'prod'), KlassID('b', 'prod'), KlassID('c', 'prod') ])
+    with pytest.raises(ClassNotFound):
+        klass_loader[KlassID('missing', 'prod')]
+
+def test_klass_loader_cache_size(tmp_path):
+    (tmp_path / 'classes').mkdir()
+    (tmp_path / 'nodes').mkdir()
+    for name in [ 'a', 'b', 'c' ]:
+        (tmp_path / 'classes' / '{0}.yml'.format(name)).write_text('parameters:\n  {0}: 1\n'.format(name))
+    uri = Uri({ 'classes': 'yaml_fs:{0}'.format(tmp_path / 'classes'), 'nodes': 'yaml_fs:{0}'.format(tmp_path / 'nodes') }, 'test')
+    with nodeclass_context(Settings({ 'class_cache_size': 2 })):
+        klass_loader = StorageFactory.klass_loader(uri.classes_uri)
+        for name in [ 'a', 'b', 'a', 'c' ]:
+            assert(klass_loader[KlassID(name, 'prod')].name == name)
+    assert(list(klass_loader.cache) == [ KlassID('a', 'prod'), KlassID('c', 'prod') ])
+    assert(klass_loader.cache.stats() == { 'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 3, 'evictions': 1 })
+    assert(klass_loader[KlassID('b', 'prod')].name == 'b')
+    klass_loader.clear()
+    assert(len(klass_loader.cache) == 0)
@@ -0,0 +1,33 @@
+import pytest
+from nodeclass.storage.yaml import Yaml
+
+node_files = [
+    'environment: prod\n',
+    'classes:\n- one\nenvironment: prod  # comment\nparameters:\n  environment: test\n',
+    'parameters:\n  a: 1\n',
+    'environment: "prod"\n',
+    'environment: yes\n',
+    'environment: 1.2\n',
+    'environment: &env prod\n',
+    'environment:\n  - prod\n',
+    'environment: prod\nenvironment: test\n',
+    '---\nenvironment: prod\n',
+    '{ environment: prod }\n',
+    '"environment": prod\n',
+    'environment_name: test\nenvironment: prod.eu-west\n',
+    'parameters:\n  a: |\n    environment: test\nenvironment: prod\n',
+    'classes:\n- environment: test\nenvironment: prod\n',
+    '',
+]
+
+@pytest.mark.parametrize('data', node_files)
+def test_yaml_environment(data):
+    assert Yaml.environment(data) == Yaml.process(data).get('environment', None)
+    assert Yaml.environment(data.encode('utf-8')) == Yaml.process(data).get('environment', None)
+
+def test_yaml_environment_scan(monkeypatch):
+    def fail(string):
+        raise AssertionError('full load')
+    monkeypatch.setattr(Yaml, 'process', fail)
+    assert Yaml.environment('classes:\n- one\nenvironment: prod\nparameters:\n  environment: test\n') == 'prod'
+    assert Yaml.environment('parameters:\n  a: 1\n') is None
@@ -0,0 +1,29 @@
+import json
+import pytest
+import yaml
+import nodeclass.utils.dump
+from nodeclass.exceptions import OutputFormatUnavailable
+from nodeclass.interpolator.interpolatednode import InterpolatedNode
+from nodeclass.utils.dump import dump
+
+data = { 'a': 1, 'b': [ 'x', 'y' ], 'c': { 'd': None, 'e': 1.5, 'f': True } }
+
+def test_dump_yaml():
+    assert yaml.safe_load(dump(data, 'yaml')) == data
+
+def test_dump_json():
+    assert json.loads(dump(data, 'json')) == data
+
+def test_dump_msgpack():
+    msgpack = pytest.importorskip('msgpack')
+    assert msgpack.unpackb(dump(data, 'msgpack'), raw=False) == data
+
+def test_dump_msgpack_unavailable(monkeypatch):
+    monkeypatch.setattr(nodeclass.utils.dump, 'msgpack', None)
+    with pytest.raises(OutputFormatUnavailable):
+        dump(data, 'msgpack')
+
+def test_interpolated_node_dump():
+    node = InterpolatedNode('n', [ 'app' ], [ 'one' ], 'prod', { 'x': 1 }, data)
+    assert json.loads(node.dump('json')) == node.as_dict()
+    assert yaml.safe_load(node.dump()) == node.as_dict()
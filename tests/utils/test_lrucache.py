@@ -0,0 +1,64 @@
+import pickle
+import threading
+from nodeclass.utils.lrucache import LRUCache
+
+
+def test_lrucache_unbounded():
+    cache = LRUCache()
+    for i in range(100):
+        cache[i] = i
+    assert len(cache) == 100
+    assert cache.evictions == 0
+
+def test_lrucache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache['a'] == 1
+    cache['c'] = 3
+    assert list(cache) == [ 'a', 'c' ]
+    assert cache.get('b', None) is None
+    assert cache.stats() == { 'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1 }
+
+def test_lrucache_membership_is_not_counted():
+    cache = LRUCache(2)
+    cache['a'] = 1
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.hits == 0 and cache.misses == 0
+
+def test_lrucache_clear():
+    cache = LRUCache(2)
+    cache['a'] = 1
+    cache.get('a')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 1
+    cache.reset_stats()
+    assert cache.stats() == { 'size': 0, 'maxsize': 2, 'hits': 0, 'misses': 0, 'evictions': 0 }
+
+def test_lrucache_pickle():
+    cache = LRUCache(3)
+    cache['a'] = 1
+    cache['b'] = 2
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.maxsize == 3
+    assert list(copy.items()) == [ ('a', 1), ('b', 2) ]
+
+def test_lrucache_threads():
+    cache = LRUCache(4)
+    errors = []
+    def use(offset):
+        try:
+            for i in range(2000):
+                cache[(offset + i) % 8] = i
+                cache.get((offset + i + 1) % 8)
+        except Exception as exception:
+            errors.append(exception)
+    threads = [ threading.Thread(target=use, args=(offset,)) for offset in range(4) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(cache) == 4
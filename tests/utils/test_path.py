@@ -0,0 +1,35 @@
+import pickle
+from nodeclass.context import nodeclass_context
+from nodeclass.settings import Settings
+from nodeclass.utils.path import Path
+
+def test_path_interned():
+    path = Path.fromstring('a:b:c')
+    assert Path.fromlist([ 'a', 'b', 'c' ]) is path
+    assert Path.fromstring('a:b').subpath('c') is path
+    assert path.parent() is Path.fromlist([ 'a', 'b' ])
+    assert Path.fromstring('a') + Path.fromstring('b:c') is path
+    assert Path.fromlist([ 'a', 1 ]) is Path.fromstring('a:1')
+    assert Path.empty() is Path.fromlist([])
+
+def test_path_keys():
+    path = Path.fromstring('a:b')
+    assert path.keys == ('a', 'b')
+    assert path.last == 1
+    assert path[0] == 'a'
+    assert str(path) == 'a:b'
+    assert hash(path) == hash(Path.fromlist([ 'a', 'b' ]))
+
+def test_path_pickle():
+    path = Path.fromstring('a:b')
+    assert pickle.loads(pickle.dumps(path)) is path
+
+def test_path_context():
+    path = Path.fromstring('a:b')
+    with nodeclass_context(Settings({ 'delimiter': '.' })):
+        other = Path.fromstring('a.b')
+        assert other is not path
+        assert other == path
+        assert hash(other) == hash(path)
+        assert str(other) == 'a.b'
+    assert Path.fromstring('a:b') is path
@@ -131,6 +131,26 @@ def test_merge_immutable_prefix():
             {'=one': 1},
             {'one': 2})
 
+def test_merge_immutable_prefix_declared_in_merge():
+    # the class declaring a key immutable sets its value, regardless of key order
+    result = merge_dicts(
+        {'one': 1, 'two': 2},
+        {'two': 3, '=one': 4})
+    assert result.render_all() == {'one': 4, 'two': 3}
+    with pytest.raises(MergeOverImmutable):
+        merge_dicts(
+            {'one': 1},
+            {'two': 3, '=one': 4},
+            {'one': 5})
+
+def test_merge_immutable_prefix_not_shared():
+    # merging must not change the immutable keys of the merged hierarchies
+    first = Hierarchy.from_dict({'a': {'one': 1}}, '', '')
+    second = Hierarchy.from_dict({'a': {'=two': 2}}, '', '')
+    third = Hierarchy.from_dict({'a': {'two': 3}}, '', '')
+    merge_top_dicts(first, second)
+    assert merge_top_dicts(first, third).render_all() == {'a': {'one': 1, 'two': 3}}
+
 def test_merge_freeze():
     with pytest.raises(FrozenHierarchy):
         a = Hierarchy.from_dict({'a': 1}, '', '')